@@ -1,70 +1,29 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+# Atalho para uma saída do relatório em lote (app/relatorio.py), que usa as
+# mesmas funções do app. Para gerar todas as análises lendo o CSV uma vez:
+#     python app/relatorio.py curitiba_apartment_real_estate_data.csv
+import os
+import sys
 
-def analisar_correlacao_preco(caminho_arquivo):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app'))
+
+from relatorio import gera_relatorio  # noqa: E402
+
+
+def analisar_correlacao_preco(caminho_arquivo, streaming=False):
     """
-    Carrega o dataset, trata valores nulos, calcula a correlação de atributos
-    numéricos com o preço e gera um gráfico de barras.
+    Gera o gráfico de correlação dos atributos numéricos com o preço
+    (Análise 1 do app).
 
     Args:
         caminho_arquivo (str): O caminho para o arquivo CSV do dataset.
+        streaming (bool): Lê o CSV em blocos (modo streaming, memória limitada).
     """
-    # 1. Carregar o dataset
-    df = pd.read_csv(caminho_arquivo)
-
-    # 2. Selecionar colunas e criar uma cópia explícita para evitar o warning
-    colunas_numericas = [
-        'price', 'usableAreas', 'suites', 'bathrooms',
-        'bedrooms', 'parkingSpaces', 'monthlyCondoFee', 'yearlyIptu'
-    ]
-    # ALTERAÇÃO 1: Adicionado .copy() para criar um DataFrame independente
-    df_analise = df[colunas_numericas].copy()
-
-    # 3. Tratamento de dados nulos (preenchendo com a mediana)
-    for coluna in df_analise.columns:
-        if df_analise[coluna].isnull().any():
-            mediana = df_analise[coluna].median()
-            df_analise[coluna].fillna(mediana, inplace=True)
-
-    # 4. Calcular a matriz de correlação (Pearson)
-    matriz_correlacao = df_analise.corr()
-
-    # 5. Isolar a correlação de todos os atributos com a coluna 'price'
-    correlacao_com_preco = matriz_correlacao['price'].sort_values(ascending=False)
-    correlacao_com_preco = correlacao_com_preco.drop('price')
-
-    # 6. Gerar o gráfico
-    plt.style.use('seaborn-v0_8-whitegrid')
-    plt.figure(figsize=(10, 7))
-
-    # ALTERAÇÃO 2: Código do gráfico atualizado para o novo padrão do Seaborn
-    ax = sns.barplot(
-        x=correlacao_com_preco.index,
-        y=correlacao_com_preco.values,
-        palette='viridis',
-        hue=correlacao_com_preco.index, # Adicionado para o novo padrão
-        legend=False # Adicionado para não mostrar a legenda
+    gera_relatorio(
+        caminho_arquivo, saida='.', analises=['001'], nomes={'001': '01_correlation_chart.png'}, indice=False,
+        streaming=streaming,
     )
 
-    # Adicionar os valores nas barras
-    for p in ax.patches:
-        ax.annotate(f'{p.get_height():.2f}',
-                    (p.get_x() + p.get_width() / 2., p.get_height()),
-                    ha='center', va='center',
-                    xytext=(0, 9),
-                    textcoords='offset points')
-
-    plt.title('Força da Correlação dos Atributos com o Preço do Imóvel', fontsize=16)
-    plt.xlabel('Atributos do Imóvel', fontsize=12)
-    plt.ylabel('Coeficiente de Correlação de Pearson', fontsize=12)
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-
-    plt.savefig('01_correlation_chart.png')
-    print("Gráfico '01_correlation_chart.png' salvo com sucesso!")
-
 
 if __name__ == '__main__':
     arquivo_dataset = 'curitiba_apartment_real_estate_data.csv'
-    analisar_correlacao_preco(arquivo_dataset)
\ No newline at end of file
+    analisar_correlacao_preco(arquivo_dataset, streaming='--streaming' in sys.argv[1:])
@@ -1,66 +1,29 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
+# Atalho para uma saída do relatório em lote (app/relatorio.py), que usa as
+# mesmas funções do app. Para gerar todas as análises lendo o CSV uma vez:
+#     python app/relatorio.py curitiba_apartment_real_estate_data.csv
+import os
+import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app'))
 
-def analisar_preco_por_bairro(caminho_arquivo):
+from relatorio import gera_relatorio  # noqa: E402
+
+
+def analisar_preco_por_bairro(caminho_arquivo, streaming=False):
     """
-    Carrega o dataset, identifica os bairros com mais anúncios e cria um
-    boxplot para visualizar a distribuição de preços em cada um deles.
+    Gera o boxplot de preços dos 10 bairros com mais anúncios
+    (Análise 2 do app).
 
     Args:
         caminho_arquivo (str): O caminho para o arquivo CSV do dataset.
+        streaming (bool): Lê o CSV em blocos (modo streaming, memória limitada).
     """
-    # 1. Carregar o dataset
-    df = pd.read_csv(caminho_arquivo)
-
-    # 2. Tratamento de dados: remover linhas sem informação de preço ou bairro
-    df.dropna(subset=['price', 'neighborhood'], inplace=True)
-
-    # 3. Filtrar outliers de preço para uma melhor visualização do boxplot
-    # Removemos valores que estão a mais de 3 desvios padrão da média
-    df = df[np.abs(df.price - df.price.mean()) <= (3 * df.price.std())]
-
-    # 4. Identificar os 10 bairros com mais anúncios
-    top_10_bairros = df['neighborhood'].value_counts().nlargest(10).index
-
-    # 5. Filtrar o DataFrame para conter apenas os dados desses 10 bairros
-    df_top_10 = df[df['neighborhood'].isin(top_10_bairros)]
-
-    # 6. Calcular a mediana de preço para cada bairro e ordenar
-    ordem_bairros = df_top_10.groupby('neighborhood')['price'].median().sort_values(ascending=False).index
-
-    # 7. Gerar o gráfico
-    plt.style.use('seaborn-v0_8-whitegrid')
-    plt.figure(figsize=(14, 8))
-
-    sns.boxplot(
-        x='neighborhood',
-        y='price',
-        data=df_top_10,
-        order=ordem_bairros,  # Ordena as caixas pela mediana do preço
-        palette='plasma'
+    gera_relatorio(
+        caminho_arquivo, saida='.', analises=['002'], nomes={'002': '02_distribution_by_neighborhood.png'}, indice=False,
+        streaming=streaming,
     )
 
-    plt.title('Distribuição de Preços de Apartamentos por Bairro (Top 10)', fontsize=18)
-    plt.xlabel('Bairro', fontsize=12)
-    plt.ylabel('Preço (R$)', fontsize=12)
-    plt.xticks(rotation=45, ha='right')  # Rotaciona os nomes dos bairros para melhor leitura
-
-    # Formatar o eixo Y para exibir os preços de forma mais legível
-    ax = plt.gca()
-    ax.get_yaxis().set_major_formatter(
-        plt.FuncFormatter(lambda x, p: format(int(x), ','))
-    )
-
-    plt.tight_layout()
-
-    # Salvar o gráfico em um arquivo
-    plt.savefig('02_distribution_by_neighborhood.png')
-    print("Gráfico '02_distribution_by_neighborhood.png' salvo com sucesso!")
-
 
 if __name__ == '__main__':
     arquivo_dataset = 'curitiba_apartment_real_estate_data.csv'
-    analisar_preco_por_bairro(arquivo_dataset)
\ No newline at end of file
+    analisar_preco_por_bairro(arquivo_dataset, streaming='--streaming' in sys.argv[1:])
@@ -1,74 +1,29 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+# Atalho para uma saída do relatório em lote (app/relatorio.py), que usa as
+# mesmas funções do app. Para gerar todas as análises lendo o CSV uma vez:
+#     python app/relatorio.py curitiba_apartment_real_estate_data.csv
+import os
+import sys
 
-def analisar_preco_m2_por_bairro(caminho_arquivo):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app'))
+
+from relatorio import gera_relatorio  # noqa: E402
+
+
+def analisar_preco_m2_por_bairro(caminho_arquivo, streaming=False):
     """
-    Carrega o dataset, calcula o preço por metro quadrado (m²) e gera um
-    gráfico de barras comparando a mediana do m² nos principais bairros.
+    Gera o ranking dos 10 bairros com o m² mediano mais caro
+    (Análise 4 do app).
 
     Args:
         caminho_arquivo (str): O caminho para o arquivo CSV do dataset.
+        streaming (bool): Lê o CSV em blocos (modo streaming, memória limitada).
     """
-    # 1. Carregar o dataset
-    df = pd.read_csv(caminho_arquivo)
-
-    # 2. Tratamento de dados
-    df.dropna(subset=['price', 'usableAreas', 'neighborhood'], inplace=True)
-    # Garantir que a área útil não seja zero para evitar divisão por zero
-    df = df[df['usableAreas'] > 0]
-
-    # 3. Engenharia de Feature: Criar a coluna 'preco_m2'
-    df['preco_m2'] = df['price'] / df['usableAreas']
-
-    # 4. Filtrar outliers de preço/m² para uma análise mais justa
-    limite_superior = df['preco_m2'].quantile(0.99)
-    df_filtrado = df[df['preco_m2'] < limite_superior]
-
-    # 5. Selecionar os 15 bairros com mais anúncios para o gráfico
-    top_15_bairros = df_filtrado['neighborhood'].value_counts().nlargest(15).index
-
-    df_top_15 = df_filtrado[df_filtrado['neighborhood'].isin(top_15_bairros)]
-
-    # 6. Calcular a mediana do preço/m² e ordenar
-    preco_m2_mediano = df_top_15.groupby('neighborhood')['preco_m2'].median().sort_values(ascending=False)
-
-    # 7. Gerar o gráfico de barras
-    plt.style.use('seaborn-v0_8-whitegrid')
-    plt.figure(figsize=(12, 8))
-
-    ax = sns.barplot(
-        x=preco_m2_mediano.index,
-        y=preco_m2_mediano.values,
-        palette='rocket',
-        hue=preco_m2_mediano.index,
-        legend=False
-    )
-
-    plt.title('Preço Mediano por Metro Quadrado (m²) por Bairro (Top 15)', fontsize=18)
-    plt.xlabel('Bairro', fontsize=12)
-    plt.ylabel('Preço Mediano por m² (R$)', fontsize=12)
-    plt.xticks(rotation=45, ha='right')
-
-    # Formatar o eixo Y
-    ax.get_yaxis().set_major_formatter(
-        plt.FuncFormatter(lambda y, p: f'R$ {y:,.2f}'.replace(',', '.'))
+    gera_relatorio(
+        caminho_arquivo, saida='.', analises=['004'], nomes={'004': '06_price_per_sqm_by_neighborhood.png'}, indice=False,
+        streaming=streaming,
     )
 
-    # Adicionar valores no topo das barras
-    for p in ax.patches:
-        ax.annotate(f'R$ {p.get_height():,.2f}'.replace(',', '.'),
-                    (p.get_x() + p.get_width() / 2., p.get_height()),
-                    ha='center', va='center',
-                    xytext=(0, 9),
-                    textcoords='offset points',
-                    fontsize=10)
-
-    plt.tight_layout()
-    plt.savefig('06_price_per_sqm_by_neighborhood.png')
-    print("Gráfico '06_price_per_sqm_by_neighborhood.png' salvo com sucesso!")
-
 
 if __name__ == '__main__':
     arquivo_dataset = 'curitiba_apartment_real_estate_data.csv'
-    analisar_preco_m2_por_bairro(arquivo_dataset)
\ No newline at end of file
+    analisar_preco_m2_por_bairro(arquivo_dataset, streaming='--streaming' in sys.argv[1:])
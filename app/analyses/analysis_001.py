@@ -2,40 +2,75 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from core.correlation import CorrelationStats
 
-def run_analysis_001(df):
+# Colunas usadas por esta análise (o app carrega apenas estas)
+COLUMNS = [
+    'price', 'usableAreas', 'suites', 'bathrooms',
+    'bedrooms', 'parkingSpaces', 'monthlyCondoFee', 'yearlyIptu'
+]
+
+
+def run_analysis_001(df, correlacao=None, medianas=None):
     """
     Recebe um DataFrame, trata dados nulos, calcula correlação com o preço
     e retorna um gráfico de barras (figura matplotlib).
+
+    Args:
+        df (pd.DataFrame): O dataset (ignorado se `correlacao` for passada).
+        correlacao (CorrelationStats, opcional): Estatísticas suficientes já
+            calculadas para o dataset (core.correlation).
+        medianas (pd.Series | dict, opcional): Mediana de cada coluna, usada
+            no lugar dos nulos. Calculada a partir de `df` se omitida.
     """
+    correlacao_com_preco = prepara_dados_001(df, correlacao, medianas)
+
+    # 6. Gerar o gráfico
+    return gera_grafico_001(correlacao_com_preco)
+
 
-    # 2. Selecionar colunas e criar uma cópia explícita para evitar o warning
-    colunas_numericas = [
-        'price', 'usableAreas', 'suites', 'bathrooms',
-        'bedrooms', 'parkingSpaces', 'monthlyCondoFee', 'yearlyIptu'
-    ]
+def prepara_dados_001(df, correlacao=None, medianas=None):
+    """
+    Calcula a correlação de cada atributo com o preço (nulos preenchidos
+    com a mediana).
+
+    Returns:
+        pd.Series: A correlação de cada atributo, em ordem decrescente.
+    """
+
+    # 2. Selecionar colunas
+    colunas_numericas = COLUMNS
 
     # Verificar se todas as colunas necessárias existem
-    colunas_faltando = [col for col in colunas_numericas if col not in df.columns]
+    colunas_disponiveis = df.columns if correlacao is None else correlacao.columns
+    colunas_faltando = [col for col in colunas_numericas if col not in colunas_disponiveis]
     if colunas_faltando:
         raise ValueError(f"Colunas necessárias não encontradas no dataset: {', '.join(colunas_faltando)}")
 
-    df_analise = df[colunas_numericas].copy()
+    if correlacao is None:
+        correlacao = CorrelationStats.from_frame(df, colunas_numericas)
 
-    # 3. Tratamento de dados nulos (preenchendo com a mediana)
-    for coluna in df_analise.columns:
-        if df_analise[coluna].isnull().any():
-            mediana = df_analise[coluna].median()
-            df_analise[coluna].fillna(mediana, inplace=True)
+    # 3. Tratamento de dados nulos (preenchendo com a mediana): o preenchimento
+    # é feito sobre as somas da correlação, sem copiar o DataFrame
+    if medianas is None:
+        medianas = df[colunas_numericas].median()
 
-    # 4. Calcular a matriz de correlação (Pearson)
-    matriz_correlacao = df_analise.corr()
+    # 4 e 5. Correlação de todos os atributos com a coluna 'price' (apenas a
+    # linha do preço da matriz, já em ordem decrescente)
+    return correlacao.price_row(colunas_numericas, fill=medianas)
 
-    # 5. Isolar a correlação de todos os atributos com a coluna 'price'
-    correlacao_com_preco = matriz_correlacao['price'].sort_values(ascending=False)
-    correlacao_com_preco = correlacao_com_preco.drop('price')
 
-    # 6. Gerar o gráfico
+def gera_grafico_001(correlacao_com_preco):
+    """
+    Gera o gráfico de barras a partir da correlação (já calculada) de cada
+    atributo com o preço.
+
+    Args:
+        correlacao_com_preco (pd.Series): Correlação indexada pelo atributo.
+
+    Returns:
+        matplotlib.figure.Figure: A figura do gráfico de barras.
+    """
     plt.style.use('seaborn-v0_8-whitegrid')
 
     # Criar a figura e os eixos (ax)
@@ -4,49 +4,76 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 
+from core.aggregates import CUBE_COLUMNS, build_neighborhood_cube
 
-def run_analysis_002(df):
+# Colunas usadas por esta análise (o app carrega apenas estas)
+COLUMNS = CUBE_COLUMNS
+
+
+def run_analysis_002(df, cube=None):
     """
     Carrega o dataset, identifica os bairros com mais anúncios e cria um
     boxplot para visualizar a distribuição de preços em cada um deles.
 
     Args:
         df (pd.DataFrame): O DataFrame carregado pelo Streamlit.
+        cube (NeighborhoodCube, opcional): As estatísticas por bairro já
+            calculadas para o dataset (core.aggregates).
 
     Returns:
         matplotlib.figure.Figure: A figura do gráfico boxplot.
     """
 
-    # 2. Tratamento de dados: remover linhas sem informação de preço ou bairro
-    # Usamos .copy() para evitar o SettingWithCopyWarning
-    df_clean = df.dropna(subset=['price', 'neighborhood']).copy()
+    # 2-6. Estatísticas das caixas dos 10 bairros com mais anúncios
+    estatisticas = prepara_dados_002(df, cube)
+
+    # 7. Gerar o gráfico (a partir das estatísticas, sem reprocessar as linhas)
+    return gera_grafico_002(estatisticas)
+
 
-    # 3. Filtrar outliers de preço para uma melhor visualização do boxplot
-    # Usaremos o método de Z-score para remover valores muito extremos
-    df_clean = df_clean[np.abs(df_clean.price - df_clean.price.mean()) <= (3 * df_clean.price.std())]
+def prepara_dados_002(df, cube=None):
+    """
+    Calcula as estatísticas do boxplot (quartis, bigodes e outliers) dos 10
+    bairros com mais anúncios, ordenados pela mediana de preço.
+
+    Returns:
+        list: Um dicionário por bairro, no formato de `Axes.bxp`.
+    """
+    # 2-3. Estatísticas por bairro: o cubo já remove linhas sem preço ou
+    # bairro e os outliers de preço (Z-score de 3 desvios padrão)
+    if cube is None:
+        cube = build_neighborhood_cube(df)
 
     # 4. Identificar os 10 bairros com mais anúncios
-    top_10_bairros = df_clean['neighborhood'].value_counts().nlargest(10).index
+    top_10_bairros = cube.top_by_count(10)
 
-    # 5. Filtrar o DataFrame para conter apenas os dados desses 10 bairros
-    df_top_10 = df_clean[df_clean['neighborhood'].isin(top_10_bairros)]
+    # 5-6. Ordenar esses bairros pela mediana de preço
+    ordem_bairros = cube.stats.loc[top_10_bairros, 'price_median'].sort_values(ascending=False).index
+    return cube.boxplot_stats(ordem_bairros)
 
-    # 6. Calcular a mediana de preço para cada bairro e ordenar
-    ordem_bairros = df_top_10.groupby('neighborhood')['price'].median().sort_values(ascending=False).index
 
-    # 7. Gerar o gráfico
+def gera_grafico_002(estatisticas):
+    """
+    Gera o boxplot a partir das estatísticas já calculadas de cada bairro.
+
+    Args:
+        estatisticas (list): As caixas, no formato de `Axes.bxp`.
+
+    Returns:
+        matplotlib.figure.Figure: A figura do gráfico boxplot.
+    """
     plt.style.use('seaborn-v0_8-whitegrid')
     # Criamos fig e ax
     fig, ax = plt.subplots(figsize=(14, 8))
 
-    sns.boxplot(
-        x='neighborhood',
-        y='price',
-        data=df_top_10,
-        order=ordem_bairros,  # Ordena as caixas pela mediana do preço
-        palette='plasma',
-        ax=ax  # Informamos ao seaborn para usar o 'ax' que criamos
+    caixas = ax.bxp(
+        estatisticas,
+        patch_artist=True,
+        medianprops={'color': '#3f3f3f'},
+        flierprops={'marker': 'd', 'markerfacecolor': '#3f3f3f', 'markersize': 4}
     )
+    for caixa, cor in zip(caixas['boxes'], sns.color_palette('plasma', len(estatisticas))):
+        caixa.set_facecolor(cor)
 
     ax.set_title('Distribuição de Preços de Apartamentos por Bairro (Top 10)', fontsize=18)
     ax.set_xlabel('Bairro', fontsize=12)
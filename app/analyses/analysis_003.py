@@ -1,14 +1,56 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from matplotlib.colors import LogNorm
 from matplotlib.ticker import FuncFormatter
 
+# Colunas usadas por esta análise (o app carrega apenas estas)
+COLUMNS = ['price', 'usableAreas']
 
-def run_analysis_003(df):
+# Acima deste número de pontos, o gráfico vira um mapa de densidade (com a
+# reta de mínimos quadrados e uma amostra dos pontos por cima)
+LIMITE_PONTOS = 20_000
+
+# Resolução da densidade (células por eixo) e da estratificação da amostra
+CELULAS_DENSIDADE = 200
+CELULAS_AMOSTRA = 40
+TAMANHO_AMOSTRA = 3_000
+
+# Valor crítico da faixa de confiança de 95% (normal: com milhares de
+# pontos, o t de Student é praticamente igual)
+Z_95 = 1.96
+
+
+def run_analysis_003(df, quantis=None, modo='auto'):
     """
     Recebe um DataFrame, trata nulos, filtra outliers e gera um
     gráfico de dispersão (regplot) entre preço e área útil.
     Retorna uma figura matplotlib.
+
+    Com mais de LIMITE_PONTOS pontos (ou `modo='densidade'`), o gráfico
+    mostra a densidade dos pontos em vez de cada um deles (ver
+    `prepara_densidade_003`), com custo de desenho constante.
+    """
+    df_filtrado = prepara_dados_003(df, quantis)
+    if modo == 'densidade' or (modo == 'auto' and len(df_filtrado) > LIMITE_PONTOS):
+        return gera_grafico_003_densidade(**prepara_densidade_003(df_filtrado))
+    return gera_grafico_003(df_filtrado)
+
+
+def prepara_dados_003(df, quantis=None):
+    """
+    Seleciona preço e área útil, remove nulos e os outliers extremos (1% de
+    cada ponta).
+
+    Args:
+        df (pd.DataFrame): O DataFrame com 'price' e 'usableAreas'.
+        quantis (QuantileSketches, opcional): Esboços de quantis do dataset
+            (core.quantiles); com eles, os cortes de 1% são aproximados e
+            saem dos esboços, sem ordenar as colunas.
+
+    Returns:
+        pd.DataFrame: Os pontos do gráfico ('price' e 'usableAreas').
     """
 
     # 2. Selecionar colunas e tratar nulos
@@ -22,11 +64,17 @@ def run_analysis_003(df):
 
     # 3. Filtrar outliers extremos para melhor visualização
     # Usamos o método do quantil para pegar os 98% centrais dos dados
-    q_low_price = df_analise['price'].quantile(0.01)
-    q_high_price = df_analise['price'].quantile(0.99)
+    if quantis is not None:
+        # Os esboços são das colunas inteiras (não só das linhas com as duas
+        # colunas preenchidas): a diferença fica dentro do erro dos esboços
+        q_low_price, q_high_price = quantis.quantile('price', [0.01, 0.99])
+        q_low_area, q_high_area = quantis.quantile('usableAreas', [0.01, 0.99])
+    else:
+        q_low_price = df_analise['price'].quantile(0.01)
+        q_high_price = df_analise['price'].quantile(0.99)
 
-    q_low_area = df_analise['usableAreas'].quantile(0.01)
-    q_high_area = df_analise['usableAreas'].quantile(0.99)
+        q_low_area = df_analise['usableAreas'].quantile(0.01)
+        q_high_area = df_analise['usableAreas'].quantile(0.99)
 
     df_filtrado = df_analise[
         (df_analise['price'] >= q_low_price) &
@@ -37,6 +85,20 @@ def run_analysis_003(df):
 
     if df_filtrado.empty:
         raise ValueError("Não há dados suficientes após a remoção de outliers.")
+    return df_filtrado
+
+
+def gera_grafico_003(df_filtrado):
+    """
+    Gera o gráfico de dispersão (com a linha de tendência) a partir dos
+    pontos já filtrados.
+
+    Args:
+        df_filtrado (pd.DataFrame): Os pontos ('price' e 'usableAreas').
+
+    Returns:
+        matplotlib.figure.Figure: A figura do gráfico.
+    """
 
     # 4. Gerar o gráfico (regplot para mostrar a linha de tendência)
     plt.style.use('seaborn-v0_8-whitegrid')
@@ -66,4 +128,146 @@ def run_analysis_003(df):
 
     fig.tight_layout()
 
-    return fig
\ No newline at end of file
+    return fig
+
+
+def ajuste_linear(x, y):
+    """
+    Reta de mínimos quadrados (forma fechada) e o erro padrão da reta em
+    cada ponto, para a faixa de confiança analítica.
+
+    Returns:
+        dict: 'n', 'intercepto', 'inclinacao', 'x_medio', 'sxx' e
+        'desvio_residual' (tudo o que a faixa precisa).
+    """
+    n = len(x)
+    if n < 3:
+        raise ValueError("São necessários pelo menos 3 pontos para a reta de tendência.")
+    x_medio, y_medio = x.mean(), y.mean()
+    dx, dy = x - x_medio, y - y_medio
+    sxx, sxy, syy = dx @ dx, dx @ dy, dy @ dy
+    if sxx == 0:
+        raise ValueError("A reta de tendência precisa de pelo menos duas áreas diferentes.")
+    inclinacao = sxy / sxx
+    residuos = max(syy - inclinacao * sxy, 0.0)
+    return {
+        'n': n,
+        'intercepto': y_medio - inclinacao * x_medio,
+        'inclinacao': inclinacao,
+        'x_medio': x_medio,
+        'sxx': sxx,
+        'desvio_residual': np.sqrt(residuos / (n - 2)),
+    }
+
+
+def _grade(valores, celulas):
+    """
+    Divide um eixo em até `celulas` células de mesma largura e devolve a
+    célula de cada valor e as bordas. Com valores inteiros (ex: a área em
+    m²), a largura também é inteira, senão algumas células ficariam sem
+    nenhum valor possível e o gráfico sairia listrado.
+    """
+    minimo, maximo = valores.min(), valores.max()
+    largura = (maximo - minimo) / celulas or 1.0
+    if np.array_equal(valores, np.round(valores)):
+        largura = float(np.ceil(largura))
+    n = min(int((maximo - minimo) // largura) + 1, celulas)
+    indices = np.minimum(((valores - minimo) / largura).astype('int64'), n - 1)
+    return indices, minimo + largura * np.arange(n + 1)
+
+
+def prepara_densidade_003(df_filtrado, celulas=CELULAS_DENSIDADE, tamanho_amostra=TAMANHO_AMOSTRA, seed=0):
+    """
+    Resume os pontos para o gráfico de densidade, em uma passada e sem
+    ordenar: a contagem de pontos em uma grade regular (índice da célula
+    calculado direto e somado com `np.bincount`), a reta de mínimos
+    quadrados e uma amostra estratificada pela grade (em média a mesma
+    quantidade de pontos por célula, sorteados com a probabilidade inversa
+    à contagem da célula, então as regiões esparsas também aparecem). O
+    tamanho do resultado não depende do número de pontos.
+
+    Args:
+        df_filtrado (pd.DataFrame): Os pontos ('price' e 'usableAreas').
+        celulas (int): Células por eixo da densidade.
+        tamanho_amostra (int): Pontos aproximados da amostra (0 = sem amostra).
+        seed (int): Semente da amostra (o gráfico sai sempre igual).
+
+    Returns:
+        dict: Os argumentos de `gera_grafico_003_densidade`.
+    """
+    x = df_filtrado['usableAreas'].to_numpy(dtype='float64')
+    y = df_filtrado['price'].to_numpy(dtype='float64')
+
+    # 1. Contagem por célula da grade
+    ix, bordas_x = _grade(x, celulas)
+    iy, bordas_y = _grade(y, celulas)
+    nx, ny = len(bordas_x) - 1, len(bordas_y) - 1
+    contagens = np.bincount(iy * nx + ix, minlength=nx * ny).reshape(ny, nx)
+
+    # 2. Amostra estratificada: cada ponto entra com probabilidade
+    # `por_celula` / (pontos da sua célula grossa), sem ordenar os pontos
+    amostra = None
+    if tamanho_amostra:
+        fator = max(celulas // CELULAS_AMOSTRA, 1)
+        grossas = (iy // fator) * nx + ix // fator
+        por_grossa = np.bincount(grossas)
+        por_celula = max(tamanho_amostra // np.count_nonzero(por_grossa), 1)
+        sorteio = np.random.default_rng(seed).random(len(x)) * por_grossa[grossas]
+        escolhidos = np.flatnonzero(sorteio < por_celula)
+        amostra = (x[escolhidos], y[escolhidos])
+
+    return {
+        'contagens': contagens,
+        'bordas_x': bordas_x,
+        'bordas_y': bordas_y,
+        'ajuste': ajuste_linear(x, y),
+        'amostra': amostra,
+    }
+
+
+def gera_grafico_003_densidade(contagens, bordas_x, bordas_y, ajuste, amostra=None):
+    """
+    Gera o gráfico de densidade (anúncios por célula, em escala log) com a
+    reta de mínimos quadrados, a faixa de confiança de 95% da reta e,
+    opcionalmente, a amostra dos pontos por cima.
+
+    Args:
+        contagens (np.ndarray): Anúncios por célula (linhas = preço).
+        bordas_x, bordas_y (np.ndarray): As bordas das células.
+        ajuste (dict): A reta (ver `ajuste_linear`).
+        amostra (tuple, opcional): (áreas, preços) dos pontos sobrepostos.
+
+    Returns:
+        matplotlib.figure.Figure: A figura do gráfico.
+    """
+    plt.style.use('seaborn-v0_8-whitegrid')
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    # 1. Densidade (células vazias ficam transparentes)
+    mascarada = np.ma.masked_equal(contagens, 0)
+    malha = ax.pcolormesh(bordas_x, bordas_y, mascarada, cmap='Blues', norm=LogNorm(vmin=1, vmax=max(contagens.max(), 1)))
+    fig.colorbar(malha, ax=ax, label='Anúncios por célula')
+
+    # 2. Amostra estratificada dos pontos
+    if amostra is not None:
+        ax.scatter(amostra[0], amostra[1], s=4, alpha=0.3, color='#1f4e79', linewidths=0)
+
+    # 3. Reta de tendência e faixa de confiança da média (analítica)
+    xs = np.linspace(bordas_x[0], bordas_x[-1], 100)
+    reta = ajuste['intercepto'] + ajuste['inclinacao'] * xs
+    erro = ajuste['desvio_residual'] * np.sqrt(1 / ajuste['n'] + (xs - ajuste['x_medio']) ** 2 / ajuste['sxx'])
+    ax.plot(xs, reta, color='red')
+    ax.fill_between(xs, reta - Z_95 * erro, reta + Z_95 * erro, color='red', alpha=0.2, linewidth=0)
+
+    # 4. Formatação e títulos
+    ax.set_title(f"Relação entre Preço e Área Útil (densidade de {ajuste['n']:,} anúncios)", fontsize=16)
+    ax.set_xlabel('Área Útil (m²)', fontsize=12)
+    ax.set_ylabel('Preço (R$)', fontsize=12)
+    ax.get_yaxis().set_major_formatter(FuncFormatter(lambda x, p: f'R$ {x:,.0f}'))
+    ax.get_xaxis().set_major_formatter(FuncFormatter(lambda x, p: f'{x:,.0f} m²'))
+    ax.set_xlim(bordas_x[0], bordas_x[-1])
+    ax.set_ylim(bordas_y[0], bordas_y[-1])
+
+    fig.tight_layout()
+
+    return fig
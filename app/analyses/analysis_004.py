@@ -3,43 +3,65 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.ticker import FuncFormatter
 
+from core.aggregates import build_neighborhood_cube
 
-def run_analysis_004(df):
+# Colunas usadas por esta análise (o app carrega apenas estas)
+COLUMNS = ['price', 'usableAreas', 'neighborhood']
+
+
+def run_analysis_004(df, cube=None):
     """
     Recebe um DataFrame, calcula o preço por m², filtra outliers,
     e gera um gráfico de barras com o preço/m² mediano para os
     10 bairros mais caros.
+    Se `cube` (estatísticas por bairro de core.aggregates) for informado,
+    as medianas já calculadas para o dataset são reaproveitadas.
     Retorna uma figura matplotlib.
     """
+    top_10_caros = prepara_dados_004(df, cube)
+    return gera_grafico_004(top_10_caros)
 
-    # 2. Selecionar colunas e tratar nulos
-    colunas_analise = ['price', 'usableAreas', 'neighborhood']
 
-    colunas_faltando = [col for col in colunas_analise if col not in df.columns]
-    if colunas_faltando:
-        raise ValueError(f"Colunas necessárias não encontradas: {', '.join(colunas_faltando)}")
+def prepara_dados_004(df, cube=None):
+    """
+    Calcula o preço/m² mediano dos 10 bairros mais caros.
 
-    df_clean = df[colunas_analise].dropna().copy()
+    Returns:
+        pd.Series: A mediana do m², indexada pelo bairro, em ordem decrescente.
+    """
 
-    # 3. Filtrar outliers para um cálculo de m² mais justo
-    # (Ex: áreas muito pequenas ou preços muito baixos podem distorcer)
-    df_clean = df_clean[
-        (df_clean['usableAreas'] > 10) &  # Remover áreas 'zero' ou muito pequenas
-        (df_clean['price'] > 1000)  # Remover preços 'zero' ou simbólicos
-        ]
+    # 2-5. Preço por m², filtro de outliers (áreas muito pequenas, preços
+    # simbólicos e os 1% maiores valores de m²) e mediana por bairro,
+    # calculados uma única vez no cubo de estatísticas por bairro
+    # A mediana é usada para ser menos sensível a mansões/outliers
+    if cube is None:
+        colunas_analise = ['price', 'usableAreas', 'neighborhood']
 
-    # 4. Engenharia de Atributo: Calcular o preço por m²
-    df_clean['price_per_m2'] = df_clean['price'] / df_clean['usableAreas']
+        colunas_faltando = [col for col in colunas_analise if col not in df.columns]
+        if colunas_faltando:
+            raise ValueError(f"Colunas necessárias não encontradas: {', '.join(colunas_faltando)}")
 
-    # 5. Calcular a mediana do preço/m² por bairro
-    # A mediana é usada para ser menos sensível a mansões/outliers
-    bairro_m2_median = df_clean.groupby('neighborhood')['price_per_m2'].median()
+        cube = build_neighborhood_cube(df)
+    bairro_m2_median = cube.stats['m2_median'].dropna()
 
     # 6. Identificar os 10 bairros com maior mediana de preço/m²
     top_10_caros = bairro_m2_median.sort_values(ascending=False).head(10)
 
     if top_10_caros.empty:
         raise ValueError("Não foi possível calcular o m² por bairro (sem dados suficientes).")
+    return top_10_caros
+
+
+def gera_grafico_004(top_10_caros):
+    """
+    Gera o gráfico de barras a partir do preço/m² mediano já calculado.
+
+    Args:
+        top_10_caros (pd.Series): A mediana do m², indexada pelo bairro.
+
+    Returns:
+        matplotlib.figure.Figure: A figura do gráfico de barras.
+    """
 
     # 7. Gerar o gráfico
     plt.style.use('seaborn-v0_8-whitegrid')
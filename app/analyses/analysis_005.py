@@ -3,6 +3,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# Colunas usadas por esta análise (o app carrega apenas estas)
+COLUMNS = ['price', 'parkingSpaces']
+
 
 def run_analysis_005(df):
     """
@@ -16,6 +19,21 @@ def run_analysis_005(df):
         matplotlib.figure.Figure: A figura do gráfico de barras.
     """
 
+    # 2-4. Preço médio por número de vagas
+    preco_medio_por_vaga = prepara_dados_005(df)
+
+    # 5. Gerar o gráfico de barras
+    return gera_grafico_005(preco_medio_por_vaga)
+
+
+def prepara_dados_005(df):
+    """
+    Calcula o preço médio por número de vagas (0 a 5 vagas).
+
+    Returns:
+        pd.Series: Preço médio indexado pelo número de vagas.
+    """
+
     # 2. Tratamento de dados: remover linhas sem info de preço ou vagas
     df_clean = df.dropna(subset=['price', 'parkingSpaces']).copy()
     df_clean['parkingSpaces'] = df_clean['parkingSpaces'].astype(int)
@@ -26,7 +44,19 @@ def run_analysis_005(df):
     # 4. Agrupar por número de vagas e calcular o preço médio
     preco_medio_por_vaga = df_filtrado.groupby('parkingSpaces')['price'].mean().sort_index()
 
-    # 5. Gerar o gráfico de barras
+    return preco_medio_por_vaga
+
+
+def gera_grafico_005(preco_medio_por_vaga):
+    """
+    Gera o gráfico de barras a partir do preço médio já agrupado.
+
+    Args:
+        preco_medio_por_vaga (pd.Series): Preço médio indexado pelo número de vagas.
+
+    Returns:
+        matplotlib.figure.Figure: A figura do gráfico de barras.
+    """
     plt.style.use('seaborn-v0_8-whitegrid')
     fig, ax = plt.subplots(figsize=(10, 7))
 
@@ -3,6 +3,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# Colunas usadas por esta análise (o app carrega apenas estas)
+COLUMNS = ['price', 'bedrooms']
+
 
 def run_analysis_006(df):
     """
@@ -16,6 +19,21 @@ def run_analysis_006(df):
         matplotlib.figure.Figure: A figura do gráfico de barras.
     """
 
+    # 2-4. Preço médio por número de quartos
+    preco_medio_por_quarto = prepara_dados_006(df)
+
+    # 5. Gerar o gráfico de barras
+    return gera_grafico_006(preco_medio_por_quarto)
+
+
+def prepara_dados_006(df):
+    """
+    Calcula o preço médio por número de quartos (1 a 6 quartos).
+
+    Returns:
+        pd.Series: Preço médio indexado pelo número de quartos.
+    """
+
     # 2. Tratamento de dados: remover linhas sem info de preço ou quartos
     df_clean = df.dropna(subset=['price', 'bedrooms']).copy()
     df_clean['bedrooms'] = df_clean['bedrooms'].astype(int)
@@ -26,7 +44,19 @@ def run_analysis_006(df):
     # 4. Agrupar por número de quartos e calcular o preço médio
     preco_medio_por_quarto = df_filtrado.groupby('bedrooms')['price'].mean().sort_index()
 
-    # 5. Gerar o gráfico de barras
+    return preco_medio_por_quarto
+
+
+def gera_grafico_006(preco_medio_por_quarto):
+    """
+    Gera o gráfico de barras a partir do preço médio já agrupado.
+
+    Args:
+        preco_medio_por_quarto (pd.Series): Preço médio indexado pelo número de quartos.
+
+    Returns:
+        matplotlib.figure.Figure: A figura do gráfico de barras.
+    """
     plt.style.use('seaborn-v0_8-whitegrid')
     fig, ax = plt.subplots(figsize=(10, 7))
 
@@ -1,80 +1,135 @@
 # analyses/analysis_007.py
 import pandas as pd
 import folium
-import json
+from branca.colormap import linear
+
+from core.aggregates import build_neighborhood_cube
+from core.geometry import ZOOM_PADRAO, load_geometry
+from core.spatial import assign_neighborhoods, load_polygon_index
+
+# Colunas usadas por esta análise (o app carrega apenas estas)
+COLUMNS = ['price', 'usableAreas', 'neighborhood', 'lat', 'lon']
 
 
 # --- FUNÇÃO 1 (HELPER) ---
 # Colocada no topo do arquivo (nível principal)
-def prepara_dados_preco_m2(df):
-    """Prepara o DataFrame calculando o preço mediano por m² para cada bairro."""
-    df_clean = df.dropna(subset=['price', 'usableAreas', 'neighborhood']).copy()
-    df_clean = df_clean[df_clean['usableAreas'] > 0]
+def prepara_bairros_mapa(df, geojson_path):
+    """
+    Troca a coluna 'neighborhood' pelo bairro do mapa (propriedade NOME do
+    GeoJSON): o polígono onde caem as coordenadas do anúncio ou, sem
+    coordenadas, o nome do bairro escrito sem diferenciar acentos e
+    maiúsculas. Assim os anúncios com o bairro escrito de outra forma não
+    somem do mapa.
+    """
+    return df.assign(neighborhood=assign_neighborhoods(df, load_polygon_index(geojson_path)))
 
-    df_clean['preco_m2'] = df_clean['price'] / df_clean['usableAreas']
 
-    limite_superior = df_clean['preco_m2'].quantile(0.99)
-    df_filtrado = df_clean[df_clean['preco_m2'] < limite_superior]
+def prepara_dados_preco_m2(df, cube=None, geojson_path=None):
+    """
+    Prepara o DataFrame com o preço mediano por m² de cada bairro.
+    Usa o cubo de estatísticas por bairro (`cube`) do dataset, se informado;
+    senão monta o cubo, com os bairros do mapa se `geojson_path` for dado.
+    """
+    if cube is None:
+        if geojson_path is not None:
+            df = prepara_bairros_mapa(df, geojson_path)
+        cube = build_neighborhood_cube(df)
 
-    preco_m2_mediano = df_filtrado.groupby('neighborhood')['preco_m2'].median()
+    preco_m2_mediano = cube.stats['m2_median'].dropna().rename('preco_m2')
     return preco_m2_mediano.reset_index()
 
 
 # --- FUNÇÃO 2 (PRINCIPAL) ---
 # Também no topo do arquivo (nível principal)
-def run_analysis_007(df, geojson_path):
+def run_analysis_007(df, geojson_path, cube=None, zoom=ZOOM_PADRAO):
     """
     Gera um mapa coroplético interativo do preço por m² nos bairros.
     (Esta é a função que o app.py vai chamar)
+
+    Os polígonos são lidos uma única vez (core.geometry) e simplificados
+    para o nível de zoom; a cor, o tooltip e o popup vão em uma única
+    camada GeoJson.
     """
 
-    # 1. Preparar os dados de preço
-    df_precos = prepara_dados_preco_m2(df)
+    # 1. Preparar os dados de preço (por bairro do mapa)
+    df_precos = prepara_dados_preco_m2(df, cube, geojson_path)
+    return gera_mapa_007(df_precos, geojson_path, zoom)
 
-    # 2. Criar o mapa base
-    mapa = folium.Map(location=[-25.45, -49.27], zoom_start=11)
 
-    # 3. Ler o GeoJSON
-    try:
-        with open(geojson_path, 'r', encoding='utf-8') as f:
-            geojson_data = json.load(f)
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Arquivo GeoJSON não encontrado em: {geojson_path}")
-    except Exception as e:
-        raise Exception(f"Erro ao ler o arquivo GeoJSON: {e}")
-
-    # 4. Adicionar a camada de cor (Choropleth)
-    folium.Choropleth(
-        geo_data=geojson_data,
-        name='choropleth',
-        data=df_precos,
-        columns=['neighborhood', 'preco_m2'],
-        key_on='feature.properties.NOME',
-        fill_color='YlOrRd',
-        fill_opacity=0.7,
-        line_opacity=0.2,
-        legend_name='Preço Mediano por m² (R$)'
-    ).add_to(mapa)
+def prepara_propriedades(preco_dict, nomes):
+    """
+    Escala de cores (6 faixas, como o Choropleth padrão) e as propriedades
+    de cada bairro do mapa: cor e texto do preço/m².
 
-    # 5. Adicionar camada de interatividade (tooltips/popups)
-    preco_dict = df_precos.set_index('neighborhood')['preco_m2']
+    Args:
+        preco_dict (pd.Series): O preço/m² mediano, indexado pelo bairro.
+        nomes (list): Os bairros do GeoJSON.
 
-    for feature in geojson_data['features']:
-        nome_bairro = feature['properties']['NOME']
-        preco_m2 = preco_dict.get(nome_bairro)
+    Returns:
+        tuple: (escala de cores, {bairro: propriedades}).
+    """
+    # Sem nenhum preço (ex: o filtro não deixou anúncios em bairros do mapa) não há escala
+    if preco_dict.dropna().empty:
+        raise ValueError("nenhum bairro do recorte tem preço por m² para colorir o mapa.")
+
+    escala = linear.YlOrRd_09.scale(preco_dict.min(), preco_dict.max()).to_step(6)
+    escala.caption = 'Preço Mediano por m² (R$)'
 
+    propriedades = {}
+    for nome_bairro in nomes:
+        preco_m2 = preco_dict.get(nome_bairro)
         if pd.notna(preco_m2):
-            popup_text = f"<b>{nome_bairro}</b><br>R$ {preco_m2:,.2f} / m²"
+            propriedades[nome_bairro] = {
+                'cor': escala(preco_m2),
+                'preco_m2': f"R$ {preco_m2:,.2f} / m²",
+            }
+        else:
+            propriedades[nome_bairro] = {'cor': 'black', 'preco_m2': 'Sem anúncios'}
+    return escala, propriedades
+
+
+def gera_mapa_007(df_precos, geojson_path, zoom=ZOOM_PADRAO):
+    """
+    Gera o mapa coroplético a partir do preço/m² mediano já calculado.
+
+    Args:
+        df_precos (pd.DataFrame): 'neighborhood' e 'preco_m2' (ver
+            `prepara_dados_preco_m2`).
+        geojson_path (str): O GeoJSON dos bairros.
+        zoom (int): O nível de zoom da simplificação dos polígonos.
+
+    Returns:
+        folium.Map: O mapa.
+    """
+    preco_dict = df_precos.set_index('neighborhood')['preco_m2']
 
-            folium.GeoJson(
-                feature,
-                style_function=lambda x: {'fillOpacity': 0, 'color': 'transparent'},
-                tooltip=nome_bairro,
-                popup=folium.Popup(popup_text, max_width=300),
-                highlight_function=lambda x: {'weight': 2, 'color': 'black', 'fillOpacity': 0.1},
-            ).add_to(mapa)
+    # 2. Criar o mapa base
+    mapa = folium.Map(location=[-25.45, -49.27], zoom_start=11)
+
+    # 3. Ler o GeoJSON (em cache, já simplificado)
+    geometria = load_geometry(geojson_path)
+
+    # 4. Escala de cores e as propriedades de cada bairro
+    escala, propriedades = prepara_propriedades(preco_dict, geometria.names)
+
+    # 5. Uma única camada com o preenchimento e a interatividade (tooltips/popups)
+    folium.GeoJson(
+        geometria.feature_collection(zoom, propriedades),
+        name='choropleth',
+        style_function=lambda feature: {
+            'fillColor': feature['properties']['cor'],
+            'fillOpacity': 0.7,
+            'color': 'black',
+            'weight': 1,
+            'opacity': 0.2,
+        },
+        highlight_function=lambda x: {'weight': 2, 'color': 'black', 'opacity': 1, 'fillOpacity': 0.8},
+        tooltip=folium.GeoJsonTooltip(fields=['NOME'], labels=False),
+        popup=folium.GeoJsonPopup(fields=['NOME', 'preco_m2'], labels=False, max_width=300),
+    ).add_to(mapa)
+    escala.add_to(mapa)
 
     folium.LayerControl().add_to(mapa)
 
     # 6. Retornar o objeto do mapa
-    return mapa
\ No newline at end of file
+    return mapa
@@ -2,58 +2,155 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 from wordcloud import WordCloud, STOPWORDS
-import re
-from collections import Counter
 
+from core.text_index import STOPWORDS_PT, build_text_index
 
-def run_analysis_008(df):
+# Colunas usadas por esta análise (o app carrega apenas estas)
+COLUMNS = ['price', 'description', 'neighborhood']
+
+# Stopwords (inglês do WordCloud + português + termos imobiliários)
+STOPWORDS_008 = frozenset(STOPWORDS) | STOPWORDS_PT
+
+
+def prepara_indice_textos(df):
+    """
+    Tokeniza as descrições uma única vez (sem HTML e sem stopwords) e
+    monta o índice de contagens de palavras por anúncio.
+
+    Args:
+        df (pd.DataFrame): O DataFrame com a coluna 'description'.
+
+    Returns:
+        core.text_index.TextIndex: O índice, com um anúncio por linha de `df`.
+    """
+    return build_text_index(df['description'], STOPWORDS_008)
+
+
+def prepara_recorte(df, faixa=(0.90, 1.0), bairros=None, quantis=None):
     """
-    Gera uma nuvem de palavras com as descrições dos 10% de imóveis mais caros.
+    Máscaras (um booleano por linha de `df`) da faixa de preço escolhida e
+    do restante dos anúncios, para comparação.
+
+    Args:
+        df (pd.DataFrame): O DataFrame com 'price' e 'description'.
+        faixa (tuple): Percentis (entre 0 e 1) inicial e final do preço.
+        bairros (list, opcional): Considera apenas estes bairros.
+        quantis (QuantileSketches, opcional): Esboços de quantis do dataset
+            (core.quantiles); com eles, os limites da faixa saem dos esboços
+            (do preço ou dos bairros escolhidos), sem ordenar os preços.
+
+    Returns:
+        tuple: (na_faixa, resto) como arrays booleanos.
+    """
+    validos = df["price"].notna() & df["description"].notna()
+    if bairros:
+        if "neighborhood" not in df.columns:
+            raise ValueError("O filtro por bairro precisa da coluna 'neighborhood'.")
+        validos &= df["neighborhood"].isin(bairros)
+
+    if quantis is not None:
+        limite_inf, limite_sup = quantis.quantile('price', list(faixa), bairros or None)
+    else:
+        limite_inf, limite_sup = df.loc[validos, "price"].quantile(list(faixa))
+    na_faixa = validos & (df["price"] >= limite_inf) & (df["price"] <= limite_sup)
+    return na_faixa.to_numpy(dtype=bool), (validos & ~na_faixa).to_numpy(dtype=bool)
+
+
+def ranking_termos(df, text_index, faixa=(0.90, 1.0), bairros=None, n=20, min_ocorrencias=5, quantis=None):
+    """
+    As palavras mais características da faixa de preço em relação ao resto
+    (log-odds), com as ocorrências em cada grupo.
+
+    Returns:
+        pd.DataFrame: Colunas 'z', 'na_faixa' e 'resto', indexado pela palavra.
+    """
+    na_faixa, resto = prepara_recorte(df, faixa, bairros, quantis)
+    if not na_faixa.any() or not resto.any():
+        raise ValueError("A faixa escolhida precisa deixar anúncios dentro e fora dela para a comparação.")
+
+    ranking = pd.DataFrame({
+        'z': text_index.log_odds(na_faixa, resto),
+        'na_faixa': text_index.term_counts(na_faixa),
+        'resto': text_index.term_counts(resto),
+    })
+    ranking = ranking[(ranking['na_faixa'] >= min_ocorrencias) & (ranking['z'] > 0)]
+    return ranking.nlargest(n, 'z')
+
+
+def run_analysis_008(df, text_index=None, faixa=(0.90, 1.0), bairros=None, modo='frequencia', quantis=None):
+    """
+    Gera uma nuvem de palavras com as descrições de uma faixa de preço
+    (por padrão, os 10% de imóveis mais caros).
 
     Args:
         df (pd.DataFrame): O DataFrame carregado.
+        text_index (TextIndex, opcional): O índice de palavras já montado
+            para `df` (ver `prepara_indice_textos`).
+        faixa (tuple): Percentis (entre 0 e 1) inicial e final do preço.
+        bairros (list, opcional): Considera apenas estes bairros.
+        modo (str): 'frequencia' (palavras mais usadas na faixa) ou
+            'destaque' (palavras super-representadas na faixa em relação
+            ao resto, pelo log-odds).
+        quantis (QuantileSketches, opcional): Esboços de quantis para os
+            limites da faixa (ver `prepara_recorte`).
 
     Returns:
         matplotlib.figure.Figure: A figura da nuvem de palavras.
     """
 
+    # 1 a 5. Peso de cada palavra na faixa de preço escolhida
+    frequencias = prepara_frequencias(df, text_index, faixa, bairros, modo, quantis)
+
+    # 6 e 7. Nuvem e figura
+    return gera_grafico_008(frequencias)
+
+
+def prepara_frequencias(df, text_index=None, faixa=(0.90, 1.0), bairros=None, modo='frequencia', quantis=None):
+    """
+    Calcula o peso de cada palavra na faixa de preço: a frequência, ou o
+    Z-score do log-odds no modo 'destaque' (ver `run_analysis_008`).
+
+    Returns:
+        dict: {palavra: peso}, pronto para `WordCloud.generate_from_frequencies`.
+    """
     # 1. Verificação das colunas
     if "price" not in df.columns or "description" not in df.columns:
         raise ValueError("O arquivo precisa conter as colunas 'price' e 'description'.")
 
-    # 2. Selecionar os 10% imóveis mais caros
-    df_clean = df.dropna(subset=["price", "description"]).copy()
-    limite_top_10 = df_clean["price"].quantile(0.90)
-    df_top10 = df_clean[df_clean["price"] >= limite_top_10]
-
-    # 3. Juntar todas as descrições em um único texto
-    texto_completo = " ".join(df_top10["description"].astype(str).tolist())
-
-    # 4. Limpeza básica do texto
-    texto_completo = re.sub(r'<[^>]+>', ' ', texto_completo)  # Remove tags HTML (ex: <br>)
-    texto_completo = texto_completo.lower()  # Converte para minúsculas
-
-    # 5. Stopwords (português + termos imobiliários)
-    stopwords_pt = set(STOPWORDS)
-    stopwords_pt.update([
-        "de", "da", "do", "das", "dos", "em", "no", "na", "nos", "nas", "que", "e", "com", "para", "por",
-        "um", "uma", "uns", "umas", "ao", "à", "a", "os", "as", "se", "nao", "não", "ou", "mais", "também",
-        "apartamento", "apto", "imovel", "imóvel", "condominio", "condomínio", "m2", "m²", "area", "área",
-        "quartos", "quarto", "dormitórios", "dormitório", "suite", "suíte", "banheiro", "banheiros",
-        "vaga", "vagas", "andar", "sala", "cozinha", "metragem", "valor", "novo", "completamente",
-        "m", "x", "r$", "ser", "localizado", "proximo", "próximo", "regiao", "região", "curitiba"
-    ])
+    # 2. Índice de palavras (montado uma única vez por dataset no app)
+    if text_index is None:
+        text_index = prepara_indice_textos(df)
+
+    # 3 a 5. Peso de cada palavra na faixa de preço escolhida (o índice já
+    # tem os textos sem HTML, em minúsculas e sem stopwords)
+    if modo == 'destaque':
+        ranking = ranking_termos(df, text_index, faixa, bairros, n=100, quantis=quantis)
+        frequencias = ranking['z'].to_dict()
+    else:
+        na_faixa, _ = prepara_recorte(df, faixa, bairros, quantis)
+        frequencias = text_index.frequencies(na_faixa)
+    return frequencias
+
+
+def gera_grafico_008(frequencias):
+    """
+    Gera a nuvem de palavras a partir do peso de cada palavra.
+
+    Args:
+        frequencias (dict): {palavra: peso}.
 
+    Returns:
+        matplotlib.figure.Figure: A figura da nuvem de palavras.
+    """
     # 6. Geração da nuvem
     nuvem = WordCloud(
         width=1200,
         height=700,
         background_color="white",
-        stopwords=stopwords_pt,
         colormap="viridis",
         min_font_size=10,
         max_words=100
-    ).generate(texto_completo)
+    ).generate_from_frequencies(frequencias)
 
     # 7. Geração da Figura
     fig, ax = plt.subplots(figsize=(14, 8))
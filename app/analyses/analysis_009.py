@@ -0,0 +1,100 @@
+# analyses/analysis_009.py
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from core.amenities import LIST_COLUMNS, build_bitset, amenity_premiums
+from core.features import FEATURE_COLUMNS, build_features
+
+# Colunas usadas por esta análise (o app carrega apenas estas)
+COLUMNS = FEATURE_COLUMNS + ['amenities', 'poisList']
+
+# Nome de cada coluna de listas nos gráficos
+ROTULOS = {'amenities': 'Comodidade', 'poisList': 'Tipo de Ponto de Interesse'}
+
+
+def prepara_bitset(df, coluna='amenities'):
+    """
+    Lê a coluna de listas ('amenities' ou 'poisList') uma única vez e a
+    converte em bits de presença por anúncio.
+    """
+    if coluna not in df.columns:
+        raise ValueError(f"Coluna necessária não encontrada no dataset: {coluna}")
+    return build_bitset(df[coluna], LIST_COLUMNS[coluna])
+
+
+def prepara_dados_009(df, bitset=None, features=None, coluna='amenities'):
+    """
+    Calcula o prêmio de cada item: a mediana do preço e do preço/m² dos
+    anúncios com o item contra os anúncios sem ele (sem outliers).
+
+    Args:
+        df (pd.DataFrame): O DataFrame carregado.
+        bitset (FeatureBitset, opcional): Os bits da coluna já montados.
+        features (pd.DataFrame, opcional): A tabela de core.features.
+        coluna (str): 'amenities' ou 'poisList'.
+
+    Returns:
+        pd.DataFrame: A tabela de core.amenities.amenity_premiums.
+    """
+    if bitset is None:
+        bitset = prepara_bitset(df, coluna)
+    if features is None:
+        features = build_features(df)
+
+    # Mesmas regras de outliers das outras análises de preço e preço/m²
+    preco = features['price'].where(features['preco_sem_outlier']).to_numpy()
+    preco_m2 = features['price_per_m2'].where(features['m2_sem_outlier']).to_numpy()
+    return amenity_premiums(preco, preco_m2, bitset)
+
+
+def run_analysis_009(df, bitset=None, features=None, coluna='amenities'):
+    """
+    Gera o gráfico do prêmio de preço por comodidade (ou tipo de ponto de
+    interesse próximo).
+
+    Returns:
+        matplotlib.figure.Figure: A figura do gráfico de barras.
+    """
+    tabela = prepara_dados_009(df, bitset, features, coluna)
+    if tabela.empty:
+        raise ValueError("Nenhum item tem anúncios suficientes (com e sem ele) para a comparação.")
+    return gera_grafico_009(tabela, ROTULOS[coluna])
+
+
+def gera_grafico_009(tabela, rotulo='Comodidade'):
+    """
+    Gera o gráfico de barras horizontais com o prêmio (%) no preço e no
+    preço/m² de cada item.
+
+    Args:
+        tabela (pd.DataFrame): A tabela de `prepara_dados_009`.
+        rotulo (str): O nome dos itens no eixo.
+
+    Returns:
+        matplotlib.figure.Figure: A figura do gráfico de barras.
+    """
+    dados = (
+        tabela[['premio_m2', 'premio_preco']]
+        .rename(columns={'premio_m2': 'Preço/m²', 'premio_preco': 'Preço'})
+        .rename_axis(rotulo)
+        .reset_index()
+        .melt(id_vars=rotulo, var_name='Medida', value_name='Prêmio (%)')
+    )
+
+    plt.style.use('seaborn-v0_8-whitegrid')
+    fig, ax = plt.subplots(figsize=(12, max(5, 0.6 * len(tabela) + 2)))
+
+    sns.barplot(data=dados, y=rotulo, x='Prêmio (%)', hue='Medida', palette='crest', ax=ax)
+    ax.axvline(0, color='black', linewidth=0.8)
+
+    # Adicionar os valores no fim das barras
+    for container in ax.containers:
+        ax.bar_label(container, fmt='%+.1f%%', padding=3, fontsize=9)
+
+    ax.set_title(f'Prêmio na Mediana de Preço por {rotulo} (com vs. sem)', fontsize=16)
+    ax.set_xlabel('Diferença da Mediana (%)', fontsize=12)
+    ax.set_ylabel(rotulo, fontsize=12)
+    fig.tight_layout()
+
+    return fig
@@ -0,0 +1,195 @@
+# analyses/analysis_010.py
+import numpy as np
+import folium
+from folium.plugins import HeatMap
+from branca.colormap import linear
+
+from core.features import FEATURE_COLUMNS, build_features
+from core.grid import build_price_grid
+
+# Colunas usadas por esta análise (o app carrega apenas estas)
+COLUMNS = FEATURE_COLUMNS + ['lat', 'lon']
+
+# Nível de zoom das células por padrão (células de ~280 m)
+ZOOM_GRADE = 13
+
+# Mapa de calor: zoom inicial e nível da grade. Células de 16 px no zoom 14
+# têm 4 px no zoom 12, menos que a célula interna do Leaflet.heat (metade do
+# raio), que soma os pesos dos pontos de qualquer forma
+ZOOM_CALOR = 12
+ZOOM_GRADE_CALOR = 14
+
+
+def prepara_grade(df, features=None):
+    """
+    Agrega os anúncios em células quadradas, em vários níveis de zoom, com
+    a contagem, a soma do preço e a mediana do preço/m² (sem outliers).
+    """
+    colunas_faltando = [col for col in COLUMNS if col not in df.columns]
+    if colunas_faltando:
+        raise ValueError(f"Colunas necessárias não encontradas no dataset: {', '.join(colunas_faltando)}")
+
+    if features is None:
+        features = build_features(df)
+
+    return build_price_grid(
+        df['lon'].to_numpy(dtype='float64', na_value=np.nan),
+        df['lat'].to_numpy(dtype='float64', na_value=np.nan),
+        features['price'].where(features['preco_sem_outlier']).to_numpy(dtype='float64', na_value=np.nan),
+        features['price_per_m2'].where(features['m2_sem_outlier']).to_numpy(dtype='float64', na_value=np.nan),
+    )
+
+
+def run_analysis_010(df, grid=None, features=None, zoom=ZOOM_GRADE, min_anuncios=3):
+    """
+    Gera o mapa em grade do preço por m²: cada célula é colorida pela
+    mediana do preço/m² dos seus anúncios.
+    (Esta é a função que o app.py vai chamar)
+
+    Só os agregados de cada célula vão para o mapa, em uma única camada
+    GeoJson; o tamanho do HTML não cresce com o número de anúncios.
+
+    Args:
+        df (pd.DataFrame): O DataFrame carregado (pode ser None com `grid`).
+        grid (PriceGrid, opcional): A grade já agregada do dataset.
+        features (pd.DataFrame, opcional): A tabela de core.features.
+        zoom (int): O nível de detalhe das células.
+        min_anuncios (int): Mínimo de anúncios para a célula aparecer.
+
+    Returns:
+        folium.Map: O mapa.
+    """
+    # 1. Células do nível pedido
+    celulas = prepara_celulas(df, grid, features, zoom, min_anuncios)
+    return gera_mapa_010(celulas)
+
+
+def prepara_celulas(df, grid=None, features=None, zoom=ZOOM_GRADE, min_anuncios=3):
+    """
+    As células de um nível da grade com a mediana do preço/m² e os cantos
+    de cada uma (só o que o mapa usa).
+
+    Returns:
+        pd.DataFrame: 'lon0', 'lat0', 'lon1', 'lat1', 'm2_mediano' e 'anuncios'.
+    """
+    if grid is None:
+        grid = prepara_grade(df, features)
+    celulas = grid.cells(zoom, min_anuncios).dropna(subset=['m2_mediano'])
+    if celulas.empty:
+        raise ValueError("Nenhuma célula tem anúncios suficientes para o mapa.")
+    return celulas[['lon0', 'lat0', 'lon1', 'lat1', 'm2_mediano', 'anuncios']]
+
+
+def gera_mapa_010(celulas):
+    """
+    Gera o mapa em grade a partir das células já agregadas.
+
+    Args:
+        celulas (pd.DataFrame): As células (ver `prepara_celulas`).
+
+    Returns:
+        folium.Map: O mapa.
+    """
+
+    # 2. Escala de cores sem deixar poucas células extremas dominarem
+    minimo, maximo = np.percentile(celulas['m2_mediano'], [5, 95])
+    escala = linear.YlOrRd_09.scale(minimo, max(maximo, minimo + 1)).to_step(6)
+    escala.caption = 'Preço Mediano por m² (R$)'
+
+    # 3. Um retângulo por célula, com as propriedades do tooltip
+    features_geo = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Polygon', 'coordinates': [[
+                [lon0, lat0], [lon1, lat0], [lon1, lat1], [lon0, lat1], [lon0, lat0]
+            ]]},
+            'properties': {
+                'cor': escala(min(max(m2, minimo), maximo)),
+                'preco_m2': f"R$ {m2:,.0f} / m²",
+                'anuncios': f"{anuncios:,} anúncios",
+            },
+        }
+        for lon0, lat0, lon1, lat1, m2, anuncios in zip(
+            celulas['lon0'].round(5), celulas['lat0'].round(5),
+            celulas['lon1'].round(5), celulas['lat1'].round(5),
+            celulas['m2_mediano'], celulas['anuncios'],
+        )
+    ]
+
+    # 4. Mapa base e uma única camada com todas as células
+    mapa = folium.Map(location=[-25.45, -49.27], zoom_start=12)
+    folium.GeoJson(
+        {'type': 'FeatureCollection', 'features': features_geo},
+        name='grade',
+        style_function=lambda feature: {
+            'fillColor': feature['properties']['cor'],
+            'fillOpacity': 0.7,
+            'weight': 0,
+        },
+        tooltip=folium.GeoJsonTooltip(fields=['preco_m2', 'anuncios'], labels=False),
+    ).add_to(mapa)
+    escala.add_to(mapa)
+
+    return mapa
+
+
+def run_mapa_calor(df, agregado=True):
+    """
+    Gera o mapa de calor dos preços (imóveis abaixo do quantil 95%).
+
+    Args:
+        df (pd.DataFrame): O DataFrame com 'price', 'lat' e 'lon'.
+        agregado (bool): Envia ao mapa um ponto por célula da grade, com a
+            soma dos preços da célula, em vez de um ponto por anúncio; o
+            HTML não cresce com o número de anúncios.
+
+    Returns:
+        folium.Map: O mapa.
+    """
+    return gera_mapa_calor(prepara_dados_calor(df, agregado))
+
+
+def prepara_dados_calor(df, agregado=True):
+    """
+    Os pontos do mapa de calor: [[latitude, longitude, peso]], com o preço
+    como peso (um ponto por célula da grade se `agregado`).
+    """
+    colunas_faltando = [col for col in ['price', 'lat', 'lon'] if col not in df.columns]
+    if colunas_faltando:
+        raise ValueError(f"Colunas necessárias não encontradas no dataset: {', '.join(colunas_faltando)}")
+
+    # 1. Remover linhas sem lat, lon ou preço e focar na maioria do mercado
+    df_analise = df[['price', 'lat', 'lon']].dropna()
+    df_filtrado = df_analise[df_analise['price'] <= df_analise['price'].quantile(0.95)]
+
+    # 2. Pontos do mapa de calor: [[latitude, longitude, peso]], com o preço
+    # como peso (a 'intensidade' do calor)
+    if agregado:
+        grade = build_price_grid(
+            df_filtrado['lon'], df_filtrado['lat'], df_filtrado['price'], zooms=(ZOOM_GRADE_CALOR,)
+        )
+        dados_heatmap = grade.cells(ZOOM_GRADE_CALOR)[['lat', 'lon', 'preco_soma']].round(5).values.tolist()
+    else:
+        dados_heatmap = df_filtrado[['lat', 'lon', 'price']].values.tolist()
+    return dados_heatmap
+
+
+def gera_mapa_calor(dados_heatmap):
+    """
+    Gera o mapa de calor a partir dos pontos já preparados.
+
+    Args:
+        dados_heatmap (list): [[latitude, longitude, peso], ...].
+
+    Returns:
+        folium.Map: O mapa.
+    """
+    # 3. Mapa base centrado em Curitiba com a camada de calor
+    mapa = folium.Map(location=[-25.4284, -49.2733], zoom_start=ZOOM_CALOR)
+    HeatMap(dados_heatmap,
+            radius=15,
+            blur=20,
+            gradient={0.2: 'blue', 0.4: 'green', 0.6: 'yellow', 1: 'red'}
+            ).add_to(mapa)
+
+    return mapa
@@ -0,0 +1,158 @@
+# analyses/analysis_011.py
+import html
+import json
+
+import folium
+from folium.utilities import JsCode
+from matplotlib.ticker import MaxNLocator
+
+from core.geometry import ZOOM_PADRAO, load_geometry
+from analyses.analysis_007 import COLUMNS, prepara_dados_preco_m2, prepara_propriedades  # noqa: F401
+
+# Cores das barras do ranking (as mesmas do gráfico do popup original)
+COR_BARRA = '#d3d3d3'
+COR_DESTAQUE = '#ff4500'
+
+
+def prepara_ranking(df_precos):
+    """
+    Ordena os bairros pelo preço/m² mediano uma única vez.
+
+    Returns:
+        pd.DataFrame: 'neighborhood' e 'preco_m2', do mais caro ao mais barato.
+    """
+    return df_precos.sort_values('preco_m2', ascending=False).reset_index(drop=True)
+
+
+def gera_svg_ranking(ranking, largura=600, altura_barra=11, margem_rotulos=150):
+    """
+    Desenha o gráfico de barras horizontais de todos os bairros em SVG,
+    uma única vez. Cada barra tem `data-i` com a posição no ranking, para
+    o popup de cada bairro destacar a sua sem desenhar outro gráfico.
+
+    Args:
+        ranking (pd.DataFrame): A saída de `prepara_ranking`.
+        largura (int): Largura do SVG, em pixels.
+        altura_barra (int): Altura de cada linha, em pixels.
+        margem_rotulos (int): Espaço à esquerda para os nomes dos bairros.
+
+    Returns:
+        str: O SVG.
+    """
+    topo, base = 6, 34
+    area = largura - margem_rotulos - 20
+    altura = topo + altura_barra * len(ranking) + base
+    maximo = float(ranking['preco_m2'].max()) if len(ranking) else 1.0
+    escala_x = area / maximo if maximo > 0 else 0.0
+
+    partes = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{largura}" height="{altura}" '
+        f'font-family="sans-serif" font-size="8">'
+    ]
+
+    # Linhas de grade e valores do eixo x
+    fundo_barras = topo + altura_barra * len(ranking)
+    for valor in MaxNLocator(nbins=5).tick_values(0, maximo):
+        if valor > maximo:
+            continue
+        x = margem_rotulos + valor * escala_x
+        partes.append(
+            f'<line x1="{x:.1f}" y1="{topo}" x2="{x:.1f}" y2="{fundo_barras}" stroke="#eee"/>'
+            f'<text x="{x:.1f}" y="{fundo_barras + 10}" text-anchor="middle">{valor:,.0f}</text>'
+        )
+
+    # Uma barra por bairro, na ordem do ranking
+    for posicao, (bairro, preco_m2) in enumerate(zip(ranking['neighborhood'], ranking['preco_m2'])):
+        y = topo + posicao * altura_barra
+        partes.append(
+            f'<text x="{margem_rotulos - 4}" y="{y + altura_barra - 3}" text-anchor="end">{html.escape(str(bairro))}</text>'
+            f'<rect data-i="{posicao}" fill="{COR_BARRA}" x="{margem_rotulos}" y="{y + 1}" '
+            f'width="{preco_m2 * escala_x:.1f}" height="{altura_barra - 2}"/>'
+        )
+
+    partes.append(
+        f'<text x="{margem_rotulos + area / 2:.0f}" y="{altura - 6}" text-anchor="middle" font-size="10">'
+        f'Preço Mediano por m² (R$)</text></svg>'
+    )
+    return ''.join(partes)
+
+
+def run_analysis_011(df, geojson_path, cube=None, zoom=ZOOM_PADRAO):
+    """
+    Gera o mapa coroplético do preço por m² com o ranking de todos os
+    bairros no popup de cada um (o bairro clicado em destaque).
+    (Esta é a função que o app.py vai chamar)
+    """
+    # 1. Preparar os dados de preço (por bairro do mapa)
+    df_precos = prepara_dados_preco_m2(df, cube, geojson_path)
+    return gera_mapa_011(df_precos, geojson_path, zoom)
+
+
+def gera_mapa_011(df_precos, geojson_path, zoom=ZOOM_PADRAO):
+    """
+    Gera o mapa a partir do preço/m² mediano já calculado.
+
+    O gráfico do ranking vai uma única vez para o HTML, em SVG; o popup de
+    cada bairro é montado no navegador, trocando a cor da barra do bairro.
+    Nenhuma figura do matplotlib é desenhada.
+
+    Args:
+        df_precos (pd.DataFrame): 'neighborhood' e 'preco_m2'.
+        geojson_path (str): O GeoJSON dos bairros.
+        zoom (int): O nível de zoom da simplificação dos polígonos.
+
+    Returns:
+        folium.Map: O mapa.
+    """
+    # 2. Ordenar uma vez e indexar a posição de cada bairro por nome
+    ranking = prepara_ranking(df_precos)
+    posicoes = dict(zip(ranking['neighborhood'], range(len(ranking))))
+    preco_dict = ranking.set_index('neighborhood')['preco_m2']
+
+    # 3. Cores e propriedades de cada bairro, com a posição e o título do popup
+    geometria = load_geometry(geojson_path)
+    escala, propriedades = prepara_propriedades(preco_dict, geometria.names)
+    for nome_bairro, props in propriedades.items():
+        props['posicao'] = posicoes.get(nome_bairro, -1)
+        if props['posicao'] >= 0:
+            titulo = f"Preço/m² em {nome_bairro}: R$ {preco_dict[nome_bairro]:,.2f}"
+        else:
+            titulo = f"{nome_bairro}: sem anúncios"
+        props['titulo'] = html.escape(titulo)
+
+    # 4. O popup: o SVG compartilhado com a barra do bairro em destaque
+    svg = json.dumps(gera_svg_ranking(ranking)).replace('</', '<\\/')
+    popup = JsCode(f"""
+        function(feature, layer) {{
+            const props = feature.properties;
+            layer.bindPopup(function() {{
+                const barra = 'data-i="' + props.posicao + '" fill="{COR_BARRA}"';
+                const destaque = 'data-i="' + props.posicao + '" fill="{COR_DESTAQUE}"';
+                return '<b>' + props.titulo + '</b>' +
+                    '<div style="max-height: 400px; overflow-y: auto">' +
+                    {svg}.replace(barra, destaque) + '</div>';
+            }}, {{maxWidth: 650}});
+        }}
+    """)
+
+    # 5. Uma única camada com o preenchimento, o tooltip e os popups
+    mapa = folium.Map(location=[-25.45, -49.27], zoom_start=11)
+    folium.GeoJson(
+        geometria.feature_collection(zoom, propriedades),
+        name='choropleth',
+        style_function=lambda feature: {
+            'fillColor': feature['properties']['cor'],
+            'fillOpacity': 0.7,
+            'color': 'black',
+            'weight': 1,
+            'opacity': 0.2,
+        },
+        highlight_function=lambda x: {'weight': 2, 'color': 'black', 'opacity': 1, 'fillOpacity': 0.8},
+        tooltip=folium.GeoJsonTooltip(fields=['NOME', 'preco_m2'], labels=False),
+        on_each_feature=popup,
+    ).add_to(mapa)
+    escala.add_to(mapa)
+
+    folium.LayerControl().add_to(mapa)
+
+    return mapa
@@ -0,0 +1,147 @@
+# analyses/analysis_012.py
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.ticker import FuncFormatter
+
+from core.hedonic import HEDONIC_COLUMNS, fit_hedonic
+
+# Colunas usadas por esta análise (o app carrega apenas estas)
+COLUMNS = HEDONIC_COLUMNS + ['title', 'street']
+
+# Desvio (%) do preço em relação ao estimado a partir do qual o anúncio é destacado
+LIMITE_DESVIO = 25
+
+# Faixa do histograma dos desvios (log do preço / estimado): de -78% a +350%
+FAIXA_HISTOGRAMA = (-1.5, 1.5)
+
+# Nome de cada atributo no gráfico
+ROTULOS = {
+    'usableAreas': '+10% de área útil',
+    'bedrooms': '+1 quarto',
+    'parkingSpaces': '+1 vaga de garagem',
+    'suites': '+1 suíte',
+}
+
+
+def prepara_modelo_012(df, features=None):
+    """Ajusta o modelo hedônico (core.hedonic) sobre o dataset."""
+    return fit_hedonic(df, features)
+
+
+def prepara_desvios_012(df, modelo):
+    """O preço estimado e o desvio de cada anúncio (ver `HedonicModel.score`)."""
+    return modelo.score(df)
+
+
+def prepara_dados_012(df, modelo=None, desvios=None, limite=LIMITE_DESVIO, bins=60):
+    """
+    Resume o modelo e os desvios para o gráfico: o efeito de cada atributo
+    e o histograma dos desvios, com quantos anúncios ficam abaixo ou acima
+    do preço estimado além do `limite`.
+
+    Args:
+        df (pd.DataFrame): O DataFrame carregado (COLUMNS).
+        modelo (HedonicModel, opcional): O modelo já ajustado.
+        desvios (pd.DataFrame, opcional): A saída de `prepara_desvios_012`.
+        limite (float): O desvio (%) que destaca um anúncio.
+        bins (int): Barras do histograma.
+
+    Returns:
+        dict: Os argumentos de `gera_grafico_012`.
+    """
+    if modelo is None:
+        modelo = prepara_modelo_012(df)
+    if desvios is None:
+        desvios = prepara_desvios_012(df, modelo)
+
+    desvio = desvios['desvio'].dropna().to_numpy()
+    contagens, bordas = np.histogram(np.clip(desvio, *FAIXA_HISTOGRAMA), bins=bins, range=FAIXA_HISTOGRAMA)
+    return {
+        'efeitos': modelo.attribute_effects().rename(ROTULOS),
+        'contagens': contagens,
+        'bordas': bordas,
+        'limite': limite,
+        'abaixo': int((desvios['desvio_pct'] <= -limite).sum()),
+        'acima': int((desvios['desvio_pct'] >= limite).sum()),
+        'r2': modelo.r2,
+    }
+
+
+def ranking_anuncios(df, desvios, lado='abaixo', limite=LIMITE_DESVIO, n=50):
+    """
+    Os anúncios mais abaixo (ou acima) do preço estimado, além do `limite`.
+
+    Returns:
+        pd.DataFrame: Título, rua, bairro, área, preço, preço estimado e
+        desvio (%), do maior desvio para o menor.
+    """
+    if lado == 'abaixo':
+        selecionados = desvios['desvio_pct'] <= -limite
+        ordem = desvios.loc[selecionados, 'desvio'].nsmallest(n).index
+    else:
+        selecionados = desvios['desvio_pct'] >= limite
+        ordem = desvios.loc[selecionados, 'desvio'].nlargest(n).index
+    colunas = [col for col in ['title', 'street', 'neighborhood', 'usableAreas', 'price'] if col in df.columns]
+    return df.loc[ordem, colunas].join(desvios.loc[ordem, ['preco_estimado', 'desvio_pct']])
+
+
+def run_analysis_012(df, modelo=None, desvios=None, features=None, limite=LIMITE_DESVIO):
+    """
+    Ajusta o modelo de preços (efeitos fixos por bairro) e gera o gráfico
+    do efeito de cada atributo e da distribuição dos desvios.
+
+    Returns:
+        matplotlib.figure.Figure: A figura com os dois gráficos.
+    """
+    if modelo is None:
+        modelo = prepara_modelo_012(df, features)
+    return gera_grafico_012(**prepara_dados_012(df, modelo, desvios, limite))
+
+
+def gera_grafico_012(efeitos, contagens, bordas, limite, abaixo, acima, r2):
+    """
+    Gera as barras do efeito de cada atributo no preço e o histograma dos
+    desvios, com as faixas de anúncios abaixo e acima do preço destacadas.
+
+    Args:
+        efeitos (pd.Series): Rótulo do atributo -> variação do preço (%).
+        contagens, bordas (np.ndarray): O histograma dos desvios (log).
+        limite (float): O desvio (%) que destaca um anúncio.
+        abaixo, acima (int): Anúncios destacados de cada lado.
+        r2 (float): O R² do modelo.
+
+    Returns:
+        matplotlib.figure.Figure: A figura com os dois gráficos.
+    """
+    plt.style.use('seaborn-v0_8-whitegrid')
+    fig, (ax_efeitos, ax_desvios) = plt.subplots(1, 2, figsize=(14, 6), gridspec_kw={'width_ratios': [2, 3]})
+
+    # 1. Efeito de cada atributo (mesmo bairro, demais atributos fixos)
+    cores = ['#2a9d8f' if valor >= 0 else '#e76f51' for valor in efeitos]
+    barras = ax_efeitos.barh(efeitos.index, efeitos.to_numpy(), color=cores)
+    ax_efeitos.bar_label(barras, fmt='%+.1f%%', padding=3, fontsize=10)
+    ax_efeitos.axvline(0, color='black', linewidth=0.8)
+    ax_efeitos.invert_yaxis()
+    ax_efeitos.set_title('Efeito no Preço (mesmo bairro)', fontsize=14)
+    ax_efeitos.set_xlabel('Variação do Preço (%)', fontsize=12)
+    ax_efeitos.margins(x=0.25)
+
+    # 2. Histograma dos desvios, com as faixas destacadas
+    corte_abaixo, corte_acima = np.log1p(-limite / 100), np.log1p(limite / 100)
+    centros = (bordas[:-1] + bordas[1:]) / 2
+    cores = np.where(centros <= corte_abaixo, '#2a9d8f', np.where(centros >= corte_acima, '#e76f51', '#adb5bd'))
+    ax_desvios.bar(centros, contagens, width=np.diff(bordas), color=cores, edgecolor='white', linewidth=0.5)
+    ax_desvios.axvline(corte_abaixo, color='#2a9d8f', linestyle='--')
+    ax_desvios.axvline(corte_acima, color='#e76f51', linestyle='--')
+    ax_desvios.set_title(
+        f'Preço vs. Estimado: {abaixo:,} abaixo e {acima:,} acima (±{limite:.0f}%)', fontsize=14
+    )
+    ax_desvios.set_xlabel('Preço em relação ao estimado', fontsize=12)
+    ax_desvios.set_ylabel('Número de anúncios', fontsize=12)
+    ax_desvios.get_xaxis().set_major_formatter(FuncFormatter(lambda x, p: f'{np.expm1(x):+.0%}'))
+
+    fig.suptitle(f'Modelo Hedônico de Preços (efeitos fixos por bairro, R² = {r2:.2f})', fontsize=16)
+    fig.tight_layout()
+
+    return fig
@@ -2,20 +2,44 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from core.correlation import CorrelationStats
 
-def run_heatmap(df):
+# Colunas usadas por esta análise: todas as numéricas do arquivo enviado
+# (None: o app usa as colunas numéricas do dataset, descobertas no carregamento)
+COLUMNS = None
+
+
+def run_heatmap(df, correlacao=None):
     """
     Recebe um DataFrame, seleciona colunas numéricas, calcula a correlação
     e retorna uma figura (heatmap) do matplotlib.
-    """
 
-    # 1. Selecionar apenas colunas numéricas para a correlação
-    df_numeric = df.select_dtypes(include=['number'])
+    Args:
+        df (pd.DataFrame): O dataset (ignorado se `correlacao` for passada).
+        correlacao (CorrelationStats, opcional): Estatísticas suficientes já
+            calculadas para o dataset (core.correlation).
+    """
 
-    # 2. Calcular a matriz de correlação
-    matriz_correlacao = df_numeric.corr()
+    # 1 e 2. Calcular a matriz de correlação das colunas numéricas (a partir
+    # das somas, sem materializar uma cópia float64 do dataset)
+    if correlacao is None:
+        correlacao = CorrelationStats.from_frame(df)
+    matriz_correlacao = correlacao.corr()
 
     # 3. Gerar o gráfico (Heatmap)
+    return gera_grafico_heatmap(matriz_correlacao)
+
+
+def gera_grafico_heatmap(matriz_correlacao):
+    """
+    Gera o heatmap a partir de uma matriz de correlação já calculada.
+
+    Args:
+        matriz_correlacao (pd.DataFrame): A matriz de correlação.
+
+    Returns:
+        matplotlib.figure.Figure: A figura do heatmap.
+    """
     plt.style.use('seaborn-v0_8-whitegrid')
     fig, ax = plt.subplots(figsize=(12, 9))  # Dando um pouco mais de espaço
 
@@ -1,31 +1,628 @@
 # app/app.py
+import io
+import uuid
+from concurrent.futures import CancelledError
+
 import streamlit as st
 import pandas as pd
 from streamlit_folium import st_folium
 
-# Importar as análises
-from analyses.analysis_001 import run_analysis_001
+from core.aggregates import CUBE_COLUMNS, build_neighborhood_cube
+from core.cache import DatasetCache, DatasetEntry, LRUCache, content_hash
+from core.correlation import CorrelationStats
+from core.features import FEATURE_COLUMNS, build_features
+from core.filters import FILTER_COLUMNS, build_filter_index, filter_key, filtered_view
+from core.figure_cache import FigureCache
+from core.geometry import load_geometry
+from core.incremental import append_listings, dataset_version, maintained_summary, version_key
+from core.instrumentation import get_recorder, measure
+from core.loader import read_listings
+from core.quantiles import QUANTILE_COLUMNS, build_quantile_sketches
+from core.scheduler import BackgroundScheduler, PRIORIDADE_FUNDO, PRIORIDADE_SELECIONADA
+from core.spatial import PointIndex
+from core.store import ColumnarStore
+from core.streaming import summarize_csv
+
+# Importar as análises (e as colunas que cada uma precisa)
+from analyses.analysis_001 import run_analysis_001, COLUMNS as COLUMNS_001
 from analyses.analysis_heatmap import run_heatmap
-from analyses.analysis_002 import run_analysis_002
-from analyses.analysis_003 import run_analysis_003
-from analyses.analysis_004 import run_analysis_004
-from analyses.analysis_005 import run_analysis_005
-from analyses.analysis_006 import run_analysis_006
-from analyses.analysis_007 import run_analysis_007
-from analyses.analysis_008 import run_analysis_008
+from analyses.analysis_002 import run_analysis_002, COLUMNS as COLUMNS_002
+from analyses.analysis_003 import run_analysis_003, LIMITE_PONTOS as LIMITE_PONTOS_003, COLUMNS as COLUMNS_003
+from analyses.analysis_004 import run_analysis_004, COLUMNS as COLUMNS_004
+from analyses.analysis_005 import run_analysis_005, gera_grafico_005, COLUMNS as COLUMNS_005
+from analyses.analysis_006 import run_analysis_006, gera_grafico_006, COLUMNS as COLUMNS_006
+from analyses.analysis_007 import run_analysis_007, prepara_bairros_mapa
+from analyses.analysis_008 import run_analysis_008, prepara_indice_textos, ranking_termos, COLUMNS as COLUMNS_008
+from analyses.analysis_009 import run_analysis_009, prepara_bitset, prepara_dados_009
+from analyses.analysis_010 import run_analysis_010, prepara_grade, ZOOM_GRADE, COLUMNS as COLUMNS_010
+from analyses.analysis_011 import run_analysis_011
+from analyses.analysis_012 import (
+    run_analysis_012, prepara_modelo_012, prepara_desvios_012, ranking_anuncios, LIMITE_DESVIO, COLUMNS as COLUMNS_012
+)
+
+# O DataFrame em cache é compartilhado entre as execuções do script:
+# com Copy-on-Write, nenhuma análise consegue alterá-lo por engano
+# (já é o comportamento padrão a partir do pandas 3.0)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# Conforme sua instrução, o geojson está na raiz, junto com o app.py
+GEOJSON_PATH = 'curitiba_bairros.geojson'
+
+# Identificador de cada análise do menu (gráficos em cache e tarefas em segundo plano)
+ANALYSIS_IDS = {
+    "Matriz de Correlação": 'heatmap',
+    "Análise 1: Correlação com Preço": '001',
+    "Análise 2: Preço por Bairro": '002',
+    "Análise 3: Preço vs. Área Útil": '003',
+    "Análise 4: Preço por m² (Top 10)": '004',
+    "Análise 5: Preço por Vagas de Garagem": '005',
+    "Análise 6: Preço por Número de Quartos": '006',
+    "Análise 7: Mapa de Preços por Bairro": '007',
+    "Análise 8: Nuvem de Palavras (Luxo)": '008',
+    "Análise 9: Prêmio por Comodidade": '009',
+    "Análise 10: Mapa em Grade (Preço/m²)": '010',
+    "Análise 11: Mapa com Ranking por Bairro": '011',
+    "Análise 12: Preço Justo (Modelo Hedônico)": '012',
+}
 
 # Configurar a página para usar o layout "wide"
 st.set_page_config(layout="wide")
 st.title("📊 Análise de Mercado Imobiliário")
 
+
+@st.cache_resource
+def get_dataset_cache():
+    """
+    Cache de datasets compartilhado por todas as sessões (LRU, até 4 arquivos / 2 GB).
+    Com o pyarrow instalado, cada CSV é convertido uma vez para Arrow IPC em disco
+    e as análises leem apenas as suas colunas.
+    """
+    store = ColumnarStore() if ColumnarStore.available() else None
+    return DatasetCache(max_entries=4, max_bytes=2 * 1024 ** 3, store=store)
+
+
+@st.cache_resource
+def get_streaming_cache():
+    """Resumos do modo streaming, compartilhados por todas as sessões (LRU)."""
+    return LRUCache(max_entries=4)
+
+
+@st.cache_resource
+def get_figure_cache():
+    """Gráficos já renderizados (PNG), compartilhados por todas as sessões (LRU, até 64 MB)."""
+    return FigureCache(max_entries=64, max_bytes=64 * 1024 ** 2)
+
+
+@st.cache_resource
+def get_scheduler():
+    """Threads que calculam as análises em segundo plano, compartilhadas por todas as sessões."""
+    return BackgroundScheduler(workers=2)
+
+
+def session_id():
+    """Identificador da sessão (dono das tarefas em segundo plano)."""
+    return st.session_state.setdefault('session_id', uuid.uuid4().hex)
+
+
+# Análises servidas pelo resumo mantido nas atualizações (core.incremental)
+ANALISES_RESUMO_MANTIDO = ['heatmap', '001', '002', '004', '005', '006']
+
+
+def analysis_jobs(dataset, resumo, erro_quantis=None):
+    """
+    Para cada análise: (prepare, builder). `prepare()` calcula os agregados
+    (sem desenhar); `builder()` devolve a figura, ou None para o mapa, que é
+    exibido com o folium. Com `erro_quantis`, os quantis e as medianas saem
+    dos esboços de quantis do dataset (ver `get_quantiles`).
+    """
+    if resumo is not None:
+        return {
+            'heatmap': (None, lambda: run_heatmap(None, correlacao=resumo.correlation)),
+            '001': (None, lambda: run_analysis_001(
+                None, correlacao=resumo.correlation, medianas=resumo.medians(COLUMNS_001)
+            )),
+            '002': (resumo.neighborhood_cube, lambda: run_analysis_002(None, cube=resumo.neighborhood_cube())),
+            '003': (None, lambda: run_analysis_003(resumo.scatter_sample())),
+            '004': (resumo.neighborhood_cube, lambda: run_analysis_004(None, cube=resumo.neighborhood_cube())),
+            '005': (None, lambda: gera_grafico_005(resumo.mean_price_by('parkingSpaces', 0, 5))),
+            '006': (None, lambda: gera_grafico_006(resumo.mean_price_by('bedrooms', 1, 6))),
+            '007': (lambda: (resumo.neighborhood_cube(), load_geometry(GEOJSON_PATH)), None),
+            '011': (lambda: (resumo.neighborhood_cube(), load_geometry(GEOJSON_PATH)), None),
+        }
+
+    erro = erro_quantis
+    jobs = {
+        'heatmap': (lambda: get_correlation(dataset), lambda: run_heatmap(None, correlacao=get_correlation(dataset))),
+        '001': (lambda: (get_correlation(dataset), get_medians(dataset, erro)), lambda: run_analysis_001(
+            None, correlacao=get_correlation(dataset), medianas=get_medians(dataset, erro)
+        )),
+        '002': (lambda: get_cube(dataset, erro), lambda: run_analysis_002(
+            dataset.frame(COLUMNS_002), cube=get_cube(dataset, erro)
+        )),
+        '003': (lambda: (dataset.frame(COLUMNS_003), get_quantiles(dataset, erro)), lambda: run_analysis_003(
+            dataset.frame(COLUMNS_003), quantis=get_quantiles(dataset, erro)
+        )),
+        '004': (lambda: get_cube(dataset, erro), lambda: run_analysis_004(
+            dataset.frame(COLUMNS_004), cube=get_cube(dataset, erro)
+        )),
+        '005': (lambda: dataset.frame(COLUMNS_005), lambda: run_analysis_005(dataset.frame(COLUMNS_005))),
+        '006': (lambda: dataset.frame(COLUMNS_006), lambda: run_analysis_006(dataset.frame(COLUMNS_006))),
+        '007': (lambda: (get_map_cube(dataset, erro), load_geometry(GEOJSON_PATH)), None),
+        '008': (lambda: (get_text_index(dataset), get_quantiles(dataset, erro)), lambda **params: run_analysis_008(
+            dataset.frame(COLUMNS_008), text_index=get_text_index(dataset), quantis=get_quantiles(dataset, erro), **params
+        )),
+        '009': (lambda: (get_features(dataset, erro), get_bitset(dataset)), lambda coluna='amenities': run_analysis_009(
+            None, bitset=get_bitset(dataset, coluna), features=get_features(dataset, erro), coluna=coluna
+        )),
+        '010': (lambda: get_grid(dataset), None),
+        '011': (lambda: (get_map_cube(dataset, erro), load_geometry(GEOJSON_PATH)), None),
+        '012': (lambda: get_price_deviations(dataset, erro), lambda limite=LIMITE_DESVIO: run_analysis_012(
+            None, modelo=get_hedonic_model(dataset, erro), desvios=get_price_deviations(dataset, erro), limite=limite
+        )),
+    }
+
+    # Dataset atualizado: as análises que só usam os agregados saem do resumo
+    # mantido a cada atualização (custo do tamanho da atualização); as que
+    # precisam das linhas são refeitas sobre a nova versão
+    mantido = maintained_summary(dataset)
+    if mantido is not None:
+        jobs.update({
+            analysis_id: job for analysis_id, job in analysis_jobs(None, mantido).items()
+            if analysis_id in ANALISES_RESUMO_MANTIDO
+        })
+    return jobs
+
+
+def sem_resultado(fn):
+    """
+    Envolve `fn` para que o Future da tarefa não guarde o resultado: os
+    agregados ficam nos artefatos do dataset (ou do resumo), de onde cada
+    página os lê.
+    """
+    def executa():
+        fn()
+    return executa
+
+
+def schedule_analyses(jobs, selected):
+    """
+    Agenda todas as análises em segundo plano (a selecionada primeiro) e
+    cancela as pendentes de um arquivo enviado antes.
+
+    Returns:
+        list: As chaves das tarefas, para o acompanhamento do progresso.
+    """
+    scheduler = get_scheduler()
+    cache = get_figure_cache()
+    scheduler.cancel_stale(session_id(), dataset_key)
+
+    chaves = []
+    for analysis_id, (prepare, builder) in jobs.items():
+        chave = cache.make_key(dataset_key, analysis_id)
+        if builder is None:
+            tarefa = instrumented(analysis_id, sem_resultado(prepare), 'preparo')
+        else:
+            # O resultado fica no cache de figuras, não no Future
+            def tarefa(chave=chave, builder=builder, prepare=prepare):
+                cache.get_or_render(chave, builder, prepare)
+            tarefa = instrumented(analysis_id, tarefa)
+        prioridade = PRIORIDADE_SELECIONADA if analysis_id == selected else PRIORIDADE_FUNDO
+        scheduler.submit(chave, tarefa, prioridade, owner=session_id(), generation=dataset_key)
+        chaves.append(chave)
+    return chaves
+
+
+def wait_for(analysis_id):
+    """
+    Aguarda a tarefa da análise (já na frente da fila). Erros da tarefa são
+    relançados aqui, para o tratamento de cada análise.
+    """
+    chave = get_figure_cache().make_key(dataset_key, analysis_id)
+    prepare, _ = jobs[analysis_id]
+    tarefa = instrumented(analysis_id, sem_resultado(prepare), 'preparo') if prepare else (lambda: None)
+    futuro = get_scheduler().submit(chave, tarefa, PRIORIDADE_SELECIONADA, owner=session_id(), generation=dataset_key)
+    with st.spinner("Calculando a análise..."):
+        try:
+            futuro.result()
+        except CancelledError:
+            pass
+    return chave
+
+
+def show_figure(analysis_id, **params):
+    """
+    Exibe o gráfico da análise a partir do cache de imagens; a figura só é
+    desenhada uma vez para o mesmo dataset, modo e parâmetros (sem
+    parâmetros, normalmente em segundo plano, logo após o envio do arquivo).
+    """
+    chave = wait_for(analysis_id)
+    prepare, builder = jobs[analysis_id]
+    if params:
+        chave = get_figure_cache().make_key(dataset_key, analysis_id, **params)
+    png = instrumented(analysis_id, lambda: get_figure_cache().get_or_render(chave, lambda: builder(**params), prepare))()
+    instrumented(analysis_id, lambda: st.image(png), 'exibicao')()
+
+
+def show_map(analysis_id, builder, **kwargs):
+    """
+    Gera o mapa com `builder()` e o exibe com o st_folium, medindo as duas
+    etapas (a serialização do mapa para o navegador conta na exibição).
+
+    Returns:
+        dict: O estado do mapa devolvido pelo st_folium.
+    """
+    mapa = instrumented(analysis_id, builder, 'analise')()
+    return instrumented(analysis_id, lambda: st_folium(mapa, height=600, use_container_width=True, **kwargs), 'exibicao')()
+
+
+def instrumented(analysis_id, fn, etapa=None):
+    """
+    Envolve `fn` para que as etapas medidas durante a execução (ver
+    core.instrumentation) saiam com a análise e o número de linhas do
+    dataset; com `etapa`, a própria chamada também é medida.
+    """
+    # A sessão é lida aqui: `executa` pode rodar numa thread do agendador
+    sessao = session_id()
+
+    def executa():
+        with get_recorder().context(analise=analysis_id, linhas=dataset_rows, sessao=sessao):
+            if etapa is None:
+                return fn()
+            with measure(etapa):
+                return fn()
+    return executa
+
+
+@st.fragment(run_every=1.0)
+def show_progress(chaves):
+    """Barra de progresso das análises em segundo plano (atualizada a cada segundo)."""
+    concluidas, total = get_scheduler().progress(chaves)
+    if total:
+        st.progress(concluidas / total, text=f"Análises prontas: {concluidas}/{total}")
+
+
+def upload_key(uploaded_file):
+    """
+    Hash do conteúdo do arquivo enviado, memorizado por arquivo na sessão
+    para não reprocessar os bytes a cada clique.
+    """
+    hashes = st.session_state.setdefault('dataset_hashes', {})
+    key = hashes.get(uploaded_file.file_id)
+    if key is None:
+        key = hashes[uploaded_file.file_id] = content_hash(uploaded_file.getvalue())
+    return key
+
+
+def load_dataset(uploaded_file):
+    """Retorna o dataset do arquivo enviado, lendo o CSV apenas na primeira vez."""
+    return get_dataset_cache().load(
+        uploaded_file.getvalue(), lambda raw: read_listings(io.BytesIO(raw)), key=upload_key(uploaded_file)
+    )
+
+
+def apply_updates(dataset, arquivos):
+    """
+    Aplica as atualizações enviadas, em ordem: cada uma gera uma versão
+    nova do dataset (core.incremental), calculada a partir da anterior com
+    custo proporcional ao tamanho da atualização.
+    """
+    cache = get_dataset_cache()
+    for arquivo in arquivos:
+        chave = version_key(dataset.key, upload_key(arquivo))
+        versao = cache.get(chave)
+        if versao is None:
+            if cache.store.has(chave):
+                # Versão gravada por outra sessão: o estado é remontado só se preciso
+                versao = DatasetEntry(chave, store=cache.store)
+            else:
+                versao = append_listings(dataset, read_listings(io.BytesIO(arquivo.getvalue())), chave)
+            cache.put(chave, versao)
+        dataset = versao
+    return dataset
+
+
+def load_streaming_summary(uploaded_file):
+    """
+    Modo streaming: lê o CSV em blocos e guarda apenas o resumo mesclável
+    (esboços de quantis, somas e correlações), sem manter o DataFrame.
+
+    O Streamlit já guarda o arquivo enviado em memória, então os blocos são
+    lidos direto dele, sem mais uma cópia dos bytes. Para arquivos que não
+    cabem na memória, use o relatório em lote com `--streaming`, que lê o
+    CSV do disco.
+    """
+    key = upload_key(uploaded_file)
+    cache = get_streaming_cache()
+    resumo = cache.get(key)
+    if resumo is None:
+        uploaded_file.seek(0)
+        resumo = summarize_csv(uploaded_file)
+        cache.put(key, resumo)
+    return resumo
+
+
+def get_quantiles(dataset, erro=None, mapa=False):
+    """
+    Esboços de quantis (core.quantiles) com o erro de rank `erro`, montados
+    numa passada, uma vez por dataset; None sem `erro` (quantis exatos).
+    Com `mapa`, os esboços por bairro usam os bairros do mapa.
+    """
+    if erro is None:
+        return None
+    if mapa:
+        return dataset.artifact(('quantis_mapa', erro), lambda: build_quantile_sketches(
+            prepara_bairros_mapa(dataset.frame(QUANTILE_COLUMNS), GEOJSON_PATH), erro
+        ))
+    return dataset.artifact(('quantis', erro), lambda: build_quantile_sketches(dataset.frame(QUANTILE_COLUMNS), erro))
+
+
+def get_features(dataset, erro=None):
+    """Tabela de atributos derivados (preço/m², máscaras de outliers), calculada uma vez por dataset."""
+    return dataset.artifact('features' if erro is None else ('features', erro), lambda: build_features(
+        dataset.frame(FEATURE_COLUMNS), get_quantiles(dataset, erro)
+    ))
+
+
+def get_cube(dataset, erro=None):
+    """
+    Estatísticas por bairro (preço e preço/m²), calculadas uma vez por
+    dataset; num dataset atualizado, as do resumo mantido nas atualizações.
+    """
+    mantido = maintained_summary(dataset)
+    if mantido is not None:
+        return mantido.neighborhood_cube()
+    return dataset.artifact('cube' if erro is None else ('cube', erro), lambda: build_neighborhood_cube(
+        dataset.frame(CUBE_COLUMNS), get_features(dataset, erro), get_quantiles(dataset, erro)
+    ))
+
+
+def get_map_cube(dataset, erro=None):
+    """
+    Estatísticas por bairro do mapa: cada anúncio entra no polígono onde
+    caem as suas coordenadas (core.spatial), mesmo que o nome do bairro no
+    CSV não bata com o do GeoJSON.
+    """
+    return dataset.artifact('cube_mapa' if erro is None else ('cube_mapa', erro), lambda: build_neighborhood_cube(
+        prepara_bairros_mapa(dataset.frame(CUBE_COLUMNS + ['lat', 'lon']), GEOJSON_PATH),
+        get_features(dataset, erro), get_quantiles(dataset, erro, mapa=True)
+    ))
+
+
+def get_point_index(dataset):
+    """Índice das coordenadas dos anúncios, para as consultas por raio."""
+    def monta():
+        pontos = dataset.frame(['lat', 'lon'])
+        if 'lat' not in pontos.columns or 'lon' not in pontos.columns:
+            raise ValueError("Colunas necessárias não encontradas no dataset: lat, lon")
+        return PointIndex(pontos['lon'], pontos['lat'])
+    return dataset.artifact('pontos', monta)
+
+
+def get_correlation(dataset):
+    """
+    Estatísticas suficientes da correlação (contagens, somas e produtos
+    cruzados), calculadas uma vez por dataset: o heatmap e a Análise 1 saem
+    delas sem recalcular nada. Num dataset atualizado, as do resumo mantido
+    nas atualizações.
+    """
+    mantido = maintained_summary(dataset)
+    if mantido is not None:
+        return mantido.correlation
+    return dataset.artifact(
+        'correlacao', lambda: CorrelationStats.from_frame(dataset.frame(dataset.numeric_columns))
+    )
+
+
+def get_medians(dataset, erro=None):
+    """Mediana de cada coluna numérica (preenchimento de nulos da Análise 1)."""
+    mantido = maintained_summary(dataset)
+    if mantido is not None:
+        return mantido.medians(COLUMNS_001)
+    if erro is not None:
+        return get_quantiles(dataset, erro).medians(COLUMNS_001)
+    return dataset.artifact('medianas', lambda: dataset.frame(COLUMNS_001).median())
+
+
+def get_text_index(dataset):
+    """Contagem de palavras das descrições por anúncio, tokenizada uma vez por dataset."""
+    return dataset.artifact('text_index', lambda: prepara_indice_textos(dataset.frame(COLUMNS_008)))
+
+
+def get_bitset(dataset, coluna='amenities'):
+    """Presença de cada comodidade (ou tipo de ponto de interesse) por anúncio, lida uma vez por dataset."""
+    return dataset.artifact(('bitset', coluna), lambda: prepara_bitset(dataset.frame([coluna]), coluna))
+
+
+def get_filter_index(dataset):
+    """Índices das colunas filtráveis (bitmaps e índice ordenado), montados uma vez por dataset."""
+    return dataset.artifact('indice_filtros', lambda: build_filter_index(dataset.frame(FILTER_COLUMNS)))
+
+
+def get_grid(dataset):
+    """Agregados por célula quadrada (vários níveis de zoom), calculados uma vez por dataset."""
+    return dataset.artifact('grade', lambda: prepara_grade(dataset.frame(COLUMNS_010), get_features(dataset)))
+
+
+def get_hedonic_model(dataset, erro=None):
+    """Modelo hedônico de preços (efeitos fixos por bairro), ajustado uma vez por dataset."""
+    return dataset.artifact('hedonico' if erro is None else ('hedonico', erro), lambda: prepara_modelo_012(
+        dataset.frame(COLUMNS_012), get_features(dataset, erro)
+    ))
+
+
+def get_price_deviations(dataset, erro=None):
+    """Preço estimado e desvio de cada anúncio pelo modelo hedônico, calculados uma vez por dataset."""
+    return dataset.artifact('desvios' if erro is None else ('desvios', erro), lambda: prepara_desvios_012(
+        dataset.frame(COLUMNS_012), get_hedonic_model(dataset, erro)
+    ))
+
+
+def get_price_csv(dataset, erro=None):
+    """Todos os anúncios com o preço estimado em CSV (bytes), gerado uma vez por dataset e modelo."""
+    return dataset.artifact('csv_precos' if erro is None else ('csv_precos', erro), lambda: (
+        dataset.frame(COLUMNS_012).join(get_price_deviations(dataset, erro)).to_csv(index=False).encode('utf-8')
+    ))
+
+
+def show_cache_stats():
+    """Exibe na barra lateral o uso de memória e os acertos/falhas dos caches."""
+    stats = get_dataset_cache().stats()
+    figuras = get_figure_cache().stats()
+    with st.sidebar.expander("Cache de datasets"):
+        st.write(f"**Datasets em memória:** {stats['entries']}")
+        st.write(f"**Memória:** {stats['bytes'] / 1024 ** 2:,.1f} MB")
+        st.write(f"**Acertos / falhas:** {stats['hits']} / {stats['misses']}")
+        st.write(f"**Remoções (LRU):** {stats['evictions']}")
+        st.write(f"**Gráficos em cache:** {figuras['entries']} ({figuras['bytes'] / 1024 ** 2:,.1f} MB)")
+        st.write(f"**Gráficos reaproveitados / desenhados:** {figuras['hits']} / {figuras['misses']}")
+
+
+def show_instrumentation(max_linhas=50):
+    """
+    Exibe na barra lateral as últimas etapas medidas nesta sessão (leitura,
+    agregados, desenho, exibição) e a exportação de todas elas em JSON lines.
+    """
+    registro = get_recorder()
+    registros = registro.snapshot(session_id())
+    with st.sidebar.expander("Tempos por etapa", expanded=True):
+        if not registros:
+            st.caption("Nenhuma etapa medida ainda.")
+            return
+        tabela = pd.DataFrame(registros[::-1][:max_linhas]).reindex(
+            columns=['analise', 'etapa', 'tempo_s', 'cpu_s', 'pico_bytes', 'linhas']
+        )
+        tabela['pico_mb'] = tabela.pop('pico_bytes') / 1024 ** 2
+        st.dataframe(tabela, hide_index=True, column_config={
+            'tempo_s': st.column_config.NumberColumn("Tempo (s)", format="%.3f"),
+            'cpu_s': st.column_config.NumberColumn("CPU (s)", format="%.3f"),
+            'pico_mb': st.column_config.NumberColumn("Pico (MB)", format="%.1f"),
+            'linhas': st.column_config.NumberColumn("Linhas", format="%d"),
+        })
+        st.download_button(
+            "Exportar (JSON lines)", registro.to_jsonl(session_id()), file_name='etapas.jsonl', mime='application/jsonl'
+        )
+        if st.button("Limpar registros"):
+            registro.clear(session_id())
+
+
+def show_filters(dataset):
+    """
+    Controles de filtro na barra lateral: faixa de preço, quartos, vagas,
+    suítes e bairros. Controles na posição inicial (tudo) não filtram.
+
+    Returns:
+        dict: Os filtros ativos, {coluna: (mínimo, máximo) ou lista de valores}.
+    """
+    indice = get_filter_index(dataset)
+    filtros = {}
+    with st.sidebar.expander("Filtros"):
+        # Faixas pelos percentis do preço (os valores extremos não esticam o controle)
+        faixas = [
+            ('price', "Faixa de preço", lambda valor: f"R$ {valor:,.0f}"),
+            ('bedrooms', "Quartos", str),
+            ('parkingSpaces', "Vagas de garagem", str),
+            ('suites', "Suítes", str),
+        ]
+        for coluna, rotulo, formato in faixas:
+            if coluna not in indice or len(indice.options(coluna)) < 2:
+                continue
+            opcoes = indice.options(coluna)
+            faixa = st.select_slider(rotulo, options=opcoes, value=(opcoes[0], opcoes[-1]), format_func=formato)
+            if tuple(faixa) != (opcoes[0], opcoes[-1]):
+                filtros[coluna] = tuple(faixa)
+
+        if 'neighborhood' in indice:
+            bairros = st.multiselect("Bairros", indice.options('neighborhood'))
+            if bairros:
+                filtros['neighborhood'] = bairros
+    return filtros
+
+
 # --- BARRA LATERAL (SIDEBAR) ---
 st.sidebar.header("Configurações")
 uploaded_file = st.sidebar.file_uploader("Envie seu dataset (.csv)", type=["csv"])
+streaming_mode = st.sidebar.toggle(
+    "Modo streaming (arquivos grandes)",
+    help="Lê o CSV em blocos e calcula as análises com resumos aproximados, "
+         "sem carregar o dataset inteiro na memória."
+)
+atualizacoes = st.sidebar.file_uploader(
+    "Atualizações (anúncios novos ou alterados)", type=["csv"], accept_multiple_files=True,
+    help="CSVs no mesmo formato, aplicados em ordem sobre o dataset: anúncios com o mesmo "
+         "título, rua e área útil são substituídos, os demais são acrescentados."
+)
+instrumentacao = st.sidebar.toggle(
+    "Tempos por etapa",
+    help="Mostra o tempo real, o tempo de CPU e as linhas de cada etapa (leitura, "
+         "agregados, desenho, exibição), com exportação em JSON lines."
+)
+# As etapas medidas nesta execução do script saem com a sessão, e o painel
+# mostra só as da sessão
+get_recorder().set_context(sessao=session_id())
+# O tracemalloc vale para o processo inteiro (todas as sessões) e deixa o app
+# mais lento: fica ligado enquanto alguma sessão ativa estiver com a opção
+# marcada (o pedido de uma aba fechada expira, ver core.instrumentation)
+get_recorder().enable_memory(
+    instrumentacao and st.sidebar.checkbox("Medir o pico de memória (tracemalloc)"), owner=session_id()
+)
 
 if uploaded_file:
-    df = pd.read_csv(uploaded_file)
-
-    st.sidebar.success("Dataset carregado!")
+    # Identifica os gráficos em cache: o mesmo arquivo gera resultados
+    # diferentes (aproximados) no modo streaming
+    dataset_key = (upload_key(uploaded_file), 'streaming' if streaming_mode else 'completo')
+
+    # Atualizações: o dataset passa a ser a última versão, e o resumo
+    # mesclável dela (mantido a cada atualização) serve o modo streaming
+    atualizado = None
+    if atualizacoes:
+        if get_dataset_cache().store is None:
+            st.sidebar.warning("As atualizações precisam do armazenamento colunar (instale o pyarrow).")
+        else:
+            atualizado = apply_updates(load_dataset(uploaded_file), atualizacoes)
+            dataset_key = (atualizado.key,) + dataset_key[1:]
+            st.sidebar.info(f"{len(atualizacoes)} atualização(ões) aplicada(s): {atualizado.rows:,} anúncios.")
+
+    # Erro de rank dos quantis aproximados (None: quantis exatos)
+    erro_quantis = None
+
+    if streaming_mode:
+        dataset = None
+        if atualizado is not None:
+            resumo = dataset_version(atualizado).summary
+        else:
+            resumo = load_streaming_summary(uploaded_file)
+        st.sidebar.success(f"Dataset resumido em modo streaming ({resumo.rows:,} linhas).")
+        dataset_rows = resumo.rows
+    else:
+        dataset = atualizado if atualizado is not None else load_dataset(uploaded_file)
+        resumo = None
+        st.sidebar.success("Dataset carregado!")
+        show_cache_stats()
+
+        # Recorte dos filtros: as análises (e os gráficos em cache) passam a
+        # usar só as linhas selecionadas
+        filtros = show_filters(dataset)
+        if filtros:
+            with measure('filtro') as registro:
+                dataset = filtered_view(dataset, get_filter_index(dataset), filtros)
+                registro['linhas'] = dataset.rows
+            dataset_key += (filter_key(filtros),)
+            st.sidebar.info(f"Recorte com {dataset.rows:,} anúncios.")
+        dataset_rows = dataset.rows
+
+        # Quantis e medianas pelos esboços KLL (core.quantiles), montados numa
+        # passada e reaproveitados por todas as análises
+        if st.sidebar.toggle(
+                "Quantis aproximados (esboços)",
+                help="Cortes de outliers, medianas por bairro e faixas de preço calculados com esboços "
+                     "de quantis, sem ordenar as colunas a cada análise."
+        ):
+            erro_quantis = st.sidebar.select_slider(
+                "Erro de rank dos quantis", options=[0.005, 0.01, 0.02, 0.05], value=0.01,
+                format_func=lambda erro: f"{erro:.1%}"
+            )
+            dataset_key += (('quantis', erro_quantis),)
 
     # --- MENU ATUALIZADO ---
     analysis_options = [
@@ -38,11 +635,21 @@ if uploaded_file:
         "Análise 5: Preço por Vagas de Garagem",
         "Análise 6: Preço por Número de Quartos",
         "Análise 7: Mapa de Preços por Bairro",
-        "Análise 8: Nuvem de Palavras (Luxo)"
+        "Análise 8: Nuvem de Palavras (Luxo)",
+        "Análise 9: Prêmio por Comodidade",
+        "Análise 10: Mapa em Grade (Preço/m²)",
+        "Análise 11: Mapa com Ranking por Bairro",
+        "Análise 12: Preço Justo (Modelo Hedônico)"
     ]
 
     choice = st.sidebar.radio("Escolha uma análise:", analysis_options)
 
+    # Todas as análises são calculadas em segundo plano logo após o envio;
+    # a selecionada vai para a frente da fila
+    jobs = analysis_jobs(dataset, resumo, erro_quantis)
+    with st.sidebar:
+        show_progress(schedule_analyses(jobs, ANALYSIS_IDS.get(choice)))
+
     # --- PÁGINA PRINCIPAL ---
 
     if choice == "Visão Geral dos Dados":
@@ -50,7 +657,10 @@ if uploaded_file:
         st.header("Visão Geral dos Dados")
 
         st.write("### Amostra do Dataset (5 primeiras linhas)")
-        st.dataframe(df.head())
+        if resumo is not None:
+            st.dataframe(read_listings(io.BytesIO(uploaded_file.getvalue()), nrows=5))
+        else:
+            st.dataframe(dataset.head())
 
         st.markdown("---")
 
@@ -94,8 +704,7 @@ if uploaded_file:
             "Valores próximos de **1** (azul escuro) indicam forte correlação positiva. Valores próximos de **-1** (vermelho escuro) indicam forte correlação negativa.")
 
         try:
-            fig_heatmap = run_heatmap(df)
-            st.pyplot(fig_heatmap)
+            show_figure('heatmap')
 
         except Exception as e:
             st.error(f"Erro ao gerar o heatmap: {e}")
@@ -108,8 +717,7 @@ if uploaded_file:
         st.write(
             "Este gráfico mostra a correlação de Pearson (um 'zoom' na linha 'price' do heatmap) entre os atributos numéricos e o preço do imóvel.")
         try:
-            fig_barras = run_analysis_001(df)
-            st.pyplot(fig_barras)
+            show_figure('001')
 
         except Exception as e:
             st.error(f"Erro ao gerar a Análise 1: {e}")
@@ -123,8 +731,7 @@ if uploaded_file:
             "Este gráfico (boxplot) mostra a distribuição dos preços dos imóveis nos **10 bairros com o maior volume de anúncios**. Ele é útil para identificar outliers (pontos) e a faixa de preço (caixa) de cada bairro.")
 
         try:
-            fig_boxplot = run_analysis_002(df)
-            st.pyplot(fig_boxplot)
+            show_figure('002')
 
         except Exception as e:
             st.error(f"Erro ao gerar a Análise 2: {e}")
@@ -136,10 +743,13 @@ if uploaded_file:
         st.write(
             "Este gráfico de dispersão (regplot) mostra a relação entre a área útil e o preço do imóvel. A linha vermelha indica a tendência geral (quanto maior a área, maior o preço).")
         st.markdown("*(Nota: Para melhor visualização, os 1% mais extremos de preço e área são filtrados do gráfico)*")
+        st.caption(
+            f"Com mais de {LIMITE_PONTOS_003:,} pontos, o gráfico mostra a densidade de anúncios (com uma amostra "
+            "dos pontos por cima) e a reta de mínimos quadrados com a faixa de confiança de 95%."
+        )
 
         try:
-            fig_regplot = run_analysis_003(df)
-            st.pyplot(fig_regplot)
+            show_figure('003')
 
         except Exception as e:
             st.error(f"Erro ao gerar a Análise 3: {e}")
@@ -153,8 +763,7 @@ if uploaded_file:
         st.write("O gráfico exibe os **10 bairros com a mediana de preço/m² mais cara**.")
 
         try:
-            fig_bar_m2 = run_analysis_004(df)
-            st.pyplot(fig_bar_m2)
+            show_figure('004')
 
         except Exception as e:
             st.error(f"Erro ao gerar a Análise 4: {e}")
@@ -169,8 +778,7 @@ if uploaded_file:
             "Note como o valor salta significativamente a partir da segunda vaga, sendo um forte indicador de um imóvel de alto padrão.")
 
         try:
-            fig_parking = run_analysis_005(df)
-            st.pyplot(fig_parking)
+            show_figure('005')
         except Exception as e:
             st.error(f"Erro ao gerar a Análise 5: {e}")
             st.warning("Verifique se o seu CSV contém as colunas 'price' e 'parkingSpaces'.")
@@ -182,8 +790,7 @@ if uploaded_file:
         st.write("Há uma progressão de valor muito clara a cada quarto adicionado.")
 
         try:
-            fig_bedrooms = run_analysis_006(df)
-            st.pyplot(fig_bedrooms)
+            show_figure('006')
         except Exception as e:
             st.error(f"Erro ao gerar a Análise 6: {e}")
             st.warning("Verifique se o seu CSV contém as colunas 'price' e 'bedrooms'.")
@@ -196,19 +803,44 @@ if uploaded_file:
         st.write(
             "Passe o mouse sobre um bairro para ver o nome e clique para ver o valor exato. Use o zoom para explorar.")
 
-        # Conforme sua instrução, o geojson está na raiz, junto com o app.py
-        geojson_path = 'curitiba_bairros.geojson'
+        geojson_path = GEOJSON_PATH
 
         try:
-            mapa_calor = run_analysis_007(df, geojson_path)
-
-            # Usar st_folium para renderizar o mapa interativo
-            st_folium(mapa_calor, height=600, use_container_width=True)
+            wait_for('007')
+            if resumo is not None:
+                cube = resumo.neighborhood_cube()
+            else:
+                # Anúncios agrupados pelo polígono onde caem as coordenadas
+                cube = get_map_cube(dataset, erro_quantis)
+
+            # Usar st_folium para renderizar o mapa interativo (só o clique volta para o app)
+            estado_mapa = show_map(
+                '007', lambda: run_analysis_007(None, geojson_path, cube=cube), returned_objects=['last_clicked']
+            )
+
+            # Consulta por raio em torno do ponto clicado (índice em grade, core.spatial)
+            if dataset is not None:
+                raio = st.slider("Raio da consulta (metros)", 100, 3000, 500, step=100)
+                clique = (estado_mapa or {}).get('last_clicked')
+                if clique:
+                    posicoes = get_point_index(dataset).within(clique['lng'], clique['lat'], raio)
+                    vizinhos = get_features(dataset).iloc[posicoes]
+                    col_n, col_preco, col_m2 = st.columns(3)
+                    col_n.metric(f"Anúncios a até {raio} m", f"{len(posicoes):,}")
+                    col_preco.metric("Preço mediano", f"R$ {vizinhos['price'].median():,.0f}" if len(posicoes) else "-")
+                    col_m2.metric(
+                        "Preço/m² mediano", f"R$ {vizinhos.loc[vizinhos['m2_valido'], 'price_per_m2'].median():,.2f}" if len(posicoes) else "-"
+                    )
+                else:
+                    st.caption("Clique em um ponto do mapa para ver os anúncios ao redor.")
 
         except FileNotFoundError:
             st.error(f"Erro: Arquivo 'curitiba_bairros.geojson' não encontrado.")
             st.info(
                 "Por favor, certifique-se de que o arquivo 'curitiba_bairros.geojson' está na mesma pasta que o 'app.py'.")
+        except ValueError as ve:
+            st.error(f"Erro ao gerar a Análise 7: {ve}")
+            st.info("Se houver filtros ativos, amplie o recorte.")
         except Exception as e:
             st.error(f"Erro ao gerar a Análise 7: {e}")
             st.warning("Verifique se o seu CSV contém 'price', 'usableAreas' e 'neighborhood'.")
@@ -217,19 +849,166 @@ if uploaded_file:
     elif choice == "Análise 8: Nuvem de Palavras (Luxo)":
         st.header("Análise 8: Nuvem de Palavras (Imóveis de Luxo)")
         st.write(
-            "Esta análise pega as descrições dos **10% de imóveis mais caros** do dataset e gera uma 'nuvem' com as palavras mais frequentes.")
+            "Esta análise pega as descrições de uma faixa de preço (por padrão, os **10% de imóveis mais caros**) e gera uma 'nuvem' com as palavras mais frequentes.")
         st.write(
             "Isso nos ajuda a entender quais termos e características são mais usados para descrever apartamentos de alto padrão (ex: 'cobertura', 'mobiliado', 'design').")
+        st.write(
+            "No modo **mais características**, as palavras são ordenadas pelo quanto aparecem mais na faixa do que no resto dos anúncios (log-odds), o que tira o peso de termos genéricos.")
         st.warning("Esta análise requer a biblioteca `wordcloud`. Se o app quebrar, rode: `pip install wordcloud`")
 
         try:
-            fig_wordcloud = run_analysis_008(df)
-            st.pyplot(fig_wordcloud)
+            if resumo is not None:
+                raise ValueError("a nuvem de palavras precisa das descrições completas e não está disponível no modo streaming.")
+
+            col_faixa, col_bairros, col_modo = st.columns(3)
+            faixa = col_faixa.slider("Faixa de preço (percentis)", 0, 100, (90, 100), step=5)
+            bairros = col_bairros.multiselect("Bairros (todos se vazio)", sorted(get_cube(dataset, erro_quantis).stats.index))
+            modo = col_modo.radio("Palavras", ["Mais frequentes", "Mais características da faixa"])
+
+            # Apenas os parâmetros diferentes do padrão entram na chave do
+            # gráfico (o padrão já foi desenhado em segundo plano)
+            parametros = {}
+            if faixa != (90, 100):
+                parametros['faixa'] = (faixa[0] / 100, faixa[1] / 100)
+            if bairros:
+                parametros['bairros'] = tuple(bairros)
+            if modo == "Mais características da faixa":
+                parametros['modo'] = 'destaque'
+            show_figure('008', **parametros)
+
+            if modo == "Mais características da faixa":
+                st.write("### Palavras mais características da faixa")
+                st.dataframe(ranking_termos(
+                    dataset.frame(COLUMNS_008), get_text_index(dataset),
+                    faixa=parametros.get('faixa', (0.90, 1.0)), bairros=parametros.get('bairros'),
+                    quantis=get_quantiles(dataset, erro_quantis)
+                ))
         except ValueError as ve:
             st.error(f"Erro ao gerar a Análise 8: {ve}")
             st.warning("Verifique se o seu CSV contém as colunas 'price' e 'description'.")
         except Exception as e:
             st.error(f"Erro inesperado ao gerar a Análise 8: {e}")
 
+    elif choice == "Análise 9: Prêmio por Comodidade":
+        st.header("Análise 9: Prêmio de Preço por Comodidade")
+        st.write(
+            "Para cada comodidade do condomínio (piscina, academia, elevador...), compara a **mediana** do preço e do preço/m² dos anúncios que a têm com a dos anúncios que não a têm.")
+        st.write(
+            "Também é possível comparar pelos **tipos de pontos de interesse** próximos (o prefixo de cada item de 'poisList'). Outliers de preço e de preço/m² são removidos como nas demais análises.")
+
+        try:
+            if resumo is not None:
+                raise ValueError("as listas de comodidades não são lidas no modo streaming.")
+
+            itens = st.radio("Comparar por", ["Comodidades", "Pontos de interesse"], horizontal=True)
+            coluna = 'amenities' if itens == "Comodidades" else 'poisList'
+            show_figure('009', **({'coluna': coluna} if coluna != 'amenities' else {}))
+
+            st.write("### Medianas com e sem cada item")
+            tabela = prepara_dados_009(None, get_bitset(dataset, coluna), get_features(dataset, erro_quantis), coluna)
+            st.dataframe(tabela.style.format({
+                'preco_com': 'R$ {:,.0f}', 'preco_sem': 'R$ {:,.0f}',
+                'm2_com': 'R$ {:,.0f}', 'm2_sem': 'R$ {:,.0f}',
+                'premio_preco': '{:+.1f}%', 'premio_m2': '{:+.1f}%',
+            }))
+        except ValueError as ve:
+            st.error(f"Erro ao gerar a Análise 9: {ve}")
+            st.warning("Verifique se o seu CSV contém as colunas 'price', 'usableAreas' e 'amenities' (ou 'poisList').")
+        except Exception as e:
+            st.error(f"Erro inesperado ao gerar a Análise 9: {e}")
+
+    elif choice == "Análise 10: Mapa em Grade (Preço/m²)":
+        st.header("Análise 10: Mapa em Grade do Preço/m²")
+        st.write(
+            "A cidade é dividida em células quadradas e cada célula é colorida pela **mediana** do preço por m² dos anúncios dentro dela (sem outliers).")
+        st.write(
+            "Só os agregados de cada célula vão para o mapa, então ele continua leve com qualquer número de anúncios. Passe o mouse sobre uma célula para ver os valores.")
+
+        try:
+            if resumo is not None:
+                raise ValueError("a grade precisa das coordenadas de cada anúncio e não está disponível no modo streaming.")
+
+            wait_for('010')
+            grade = get_grid(dataset)
+            col_zoom, col_minimo = st.columns([3, 1])
+            zoom = col_zoom.select_slider(
+                "Tamanho das células", options=sorted(grade.levels), value=ZOOM_GRADE,
+                format_func=lambda nivel: f"{grade.cell_meters(nivel):,.0f} m"
+            )
+            min_anuncios = col_minimo.number_input("Mínimo de anúncios por célula", 1, 50, 3)
+
+            show_map('010', lambda: run_analysis_010(None, grid=grade, zoom=zoom, min_anuncios=min_anuncios),
+                     returned_objects=[])
+        except ValueError as ve:
+            st.error(f"Erro ao gerar a Análise 10: {ve}")
+            st.warning("Verifique se o seu CSV contém as colunas 'price', 'usableAreas', 'lat' e 'lon'.")
+        except Exception as e:
+            st.error(f"Erro inesperado ao gerar a Análise 10: {e}")
+
+    elif choice == "Análise 11: Mapa com Ranking por Bairro":
+        st.header("Análise 11: Mapa com Ranking por Bairro (Preço/m²)")
+        st.write(
+            "O mesmo mapa da Análise 7, mas o clique em um bairro abre o ranking de **todos** os bairros pelo preço mediano por m², com o bairro clicado em destaque.")
+        st.write(
+            "O gráfico do ranking é desenhado uma única vez; o destaque de cada bairro é feito no navegador, então o mapa abre rápido mesmo com todos os bairros.")
+
+        try:
+            wait_for('011')
+            cube = resumo.neighborhood_cube() if resumo is not None else get_map_cube(dataset, erro_quantis)
+            show_map('011', lambda: run_analysis_011(None, GEOJSON_PATH, cube=cube), returned_objects=[])
+        except FileNotFoundError:
+            st.error(f"Erro: Arquivo 'curitiba_bairros.geojson' não encontrado.")
+            st.info(
+                "Por favor, certifique-se de que o arquivo 'curitiba_bairros.geojson' está na mesma pasta que o 'app.py'.")
+        except ValueError as ve:
+            st.error(f"Erro ao gerar a Análise 11: {ve}")
+            st.info("Se houver filtros ativos, amplie o recorte.")
+        except Exception as e:
+            st.error(f"Erro ao gerar a Análise 11: {e}")
+            st.warning("Verifique se o seu CSV contém 'price', 'usableAreas' e 'neighborhood'.")
+
+    elif choice == "Análise 12: Preço Justo (Modelo Hedônico)":
+        st.header("Análise 12: Preço Justo (Modelo Hedônico)")
+        st.write(
+            "Estima o preço de cada anúncio a partir da área útil, dos quartos, das vagas, das suítes e do **bairro** (um efeito fixo por bairro), com um modelo linear sobre o log do preço.")
+        st.write(
+            "O gráfico mostra quanto cada atributo soma ao preço dentro do mesmo bairro e a distribuição da diferença entre o preço anunciado e o estimado. As tabelas listam os anúncios mais **abaixo** e mais **acima** do preço estimado.")
+
+        try:
+            if resumo is not None:
+                raise ValueError("o modelo precisa dos anúncios completos e não está disponível no modo streaming.")
+
+            limite = st.slider("Desvio mínimo em relação ao preço estimado (%)", 10, 60, LIMITE_DESVIO, step=5)
+            show_figure('012', **({'limite': limite} if limite != LIMITE_DESVIO else {}))
+
+            modelo = get_hedonic_model(dataset, erro_quantis)
+            desvios = get_price_deviations(dataset, erro_quantis)
+            st.caption(
+                f"Modelo ajustado com {modelo.n:,} anúncios e {len(modelo.effects)} bairros "
+                f"(R² = {modelo.r2:.2f}; desvio típico de {modelo.sigma:.0%} no log do preço)."
+            )
+            formatos = {'usableAreas': '{:,.0f} m²', 'price': 'R$ {:,.0f}', 'preco_estimado': 'R$ {:,.0f}',
+                        'desvio_pct': '{:+.0f}%'}
+            for lado, titulo in [('abaixo', "Mais abaixo do preço estimado"), ('acima', "Mais acima do preço estimado")]:
+                st.write(f"### {titulo}")
+                tabela = ranking_anuncios(dataset.frame(COLUMNS_012), desvios, lado, limite)
+                st.dataframe(tabela.style.format(formatos))
+
+            # O CSV só é gerado no clique (e guardado no dataset), não a cada execução
+            st.download_button(
+                "Baixar todos os anúncios com o preço estimado (CSV)",
+                lambda: get_price_csv(dataset, erro_quantis),
+                file_name='precos_estimados.csv', mime='text/csv'
+            )
+        except ValueError as ve:
+            st.error(f"Erro ao gerar a Análise 12: {ve}")
+            st.warning("Verifique se o seu CSV contém as colunas 'price', 'usableAreas' e 'neighborhood'.")
+        except Exception as e:
+            st.error(f"Erro inesperado ao gerar a Análise 12: {e}")
+
 else:
-    st.info("Por favor, envie um arquivo CSV pela barra lateral para começar as análises.")
\ No newline at end of file
+    st.info("Por favor, envie um arquivo CSV pela barra lateral para começar as análises.")
+
+# Desenhado por último, para incluir as etapas desta execução
+if instrumentacao:
+    show_instrumentation()
\ No newline at end of file
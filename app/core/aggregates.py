@@ -0,0 +1,172 @@
+# core/aggregates.py
+import numpy as np
+import pandas as pd
+
+from .features import FEATURE_COLUMNS, build_features
+
+# Colunas do dataset necessárias para montar o cubo por bairro
+CUBE_COLUMNS = FEATURE_COLUMNS + ['neighborhood', 'bedrooms', 'parkingSpaces']
+
+# Quantis guardados para cada medida (além de contagem, média e mediana)
+QUANTIS = {'p10': 0.10, 'q1': 0.25, 'q3': 0.75, 'p90': 0.90}
+
+
+def _estatisticas(valores, grupos, esbocos=None):
+    """
+    Contagem, média, mediana e quantis de `valores` por grupo, de uma vez.
+
+    Com `esbocos` ({grupo: KLLSketch} de todos os valores do grupo, antes
+    do corte de outliers), a mediana e os quantis saem dos esboços,
+    restritos à faixa dos `valores` (os cortes são sempre faixas de valor).
+    """
+    agrupado = valores.groupby(grupos, observed=True)
+    if esbocos is None:
+        stats = agrupado.agg(['count', 'mean', 'median'])
+        quantis = agrupado.quantile(list(QUANTIS.values())).unstack()
+        quantis.columns = list(QUANTIS.keys())
+        return stats.join(quantis)
+
+    stats = agrupado.agg(['count', 'mean'])
+    low, high = valores.min(), np.nextafter(valores.max(), np.inf)
+    probabilidades = [0.5, *QUANTIS.values()]
+    quantis = pd.DataFrame(
+        [esbocos[str(grupo)].quantile_between(probabilidades, low, high) for grupo in stats.index],
+        index=stats.index, columns=['median', *QUANTIS.keys()],
+    )
+    return stats.join(quantis)
+
+
+def _bigodes(valores, grupos, stats):
+    """
+    Limites dos bigodes do boxplot (regra de 1,5 x IQR) e os outliers de
+    cada grupo, calculados com operações vetorizadas sobre todas as linhas.
+    """
+    iqr = stats['q3'] - stats['q1']
+    limite_inf = (stats['q1'] - 1.5 * iqr).reindex(grupos).to_numpy()
+    limite_sup = (stats['q3'] + 1.5 * iqr).reindex(grupos).to_numpy()
+
+    dentro = (valores.to_numpy() >= limite_inf) & (valores.to_numpy() <= limite_sup)
+    agrupado_dentro = valores[dentro].groupby(grupos[dentro], observed=True)
+    bigodes = pd.DataFrame({
+        'whislo': agrupado_dentro.min(),
+        'whishi': agrupado_dentro.max(),
+    })
+
+    fora = valores[~dentro]
+    outliers = {
+        bairro: serie.to_numpy()
+        for bairro, serie in fora.groupby(grupos[~dentro], observed=True)
+    }
+    return bigodes, outliers
+
+
+class NeighborhoodCube:
+    """
+    Estatísticas pré-calculadas por bairro, montadas uma única vez por
+    dataset. Os gráficos por bairro (boxplot, top 10 do m², mapa) são
+    gerados a partir delas, com custo proporcional ao número de bairros.
+
+    Attributes:
+        stats (pd.DataFrame): Uma linha por bairro, com 'anuncios' e, para o
+            preço ('price_*') e o preço/m² ('m2_*'): count, mean, median,
+            p10, q1, q3, p90, whislo e whishi.
+        bedrooms (pd.DataFrame): Contagem de anúncios por bairro x quartos.
+        parking (pd.DataFrame): Contagem de anúncios por bairro x vagas.
+        fliers (dict): Outliers do boxplot de preço, por bairro.
+    """
+
+    def __init__(self, stats, bedrooms, parking, fliers):
+        self.stats = stats
+        self.bedrooms = bedrooms
+        self.parking = parking
+        self.fliers = fliers
+
+    @property
+    def nbytes(self):
+        return int(
+            self.stats.memory_usage(deep=True).sum() +
+            self.bedrooms.memory_usage(deep=True).sum() +
+            self.parking.memory_usage(deep=True).sum() +
+            sum(valores.nbytes for valores in self.fliers.values())
+        )
+
+    def top_by_count(self, n, medida='price'):
+        """Os `n` bairros com mais anúncios válidos para a medida."""
+        return self.stats[f'{medida}_count'].nlargest(n).index
+
+    def boxplot_stats(self, bairros, medida='price'):
+        """Estatísticas no formato de `Axes.bxp` para os bairros pedidos."""
+        linhas = self.stats.loc[bairros]
+        return [
+            {
+                'label': bairro,
+                'med': linha[f'{medida}_median'],
+                'q1': linha[f'{medida}_q1'],
+                'q3': linha[f'{medida}_q3'],
+                'whislo': linha[f'{medida}_whislo'],
+                'whishi': linha[f'{medida}_whishi'],
+                'fliers': self.fliers.get(bairro, np.array([])) if medida == 'price' else np.array([]),
+            }
+            for bairro, linha in linhas.iterrows()
+        ]
+
+
+def build_neighborhood_cube(df, features=None, quantis=None):
+    """
+    Monta o cubo de estatísticas por bairro.
+
+    Args:
+        df (pd.DataFrame): O dataset, com as colunas de CUBE_COLUMNS.
+        features (pd.DataFrame, opcional): A tabela de core.features já
+            calculada para o dataset.
+        quantis (QuantileSketches, opcional): Esboços por bairro
+            (core.quantiles); com eles, medianas e quantis são aproximados.
+
+    Returns:
+        NeighborhoodCube: As estatísticas por bairro.
+    """
+    colunas_faltando = [col for col in ['price', 'neighborhood'] if col not in df.columns]
+    if colunas_faltando:
+        raise ValueError(f"Colunas necessárias não encontradas: {', '.join(colunas_faltando)}")
+
+    if features is None:
+        features = build_features(df, quantis)
+    esbocos_preco = quantis.by_neighborhood['price'] if quantis is not None else None
+    esbocos_m2 = quantis.by_neighborhood['price_per_m2'] if quantis is not None else None
+
+    bairros = df['neighborhood']
+    com_bairro = bairros.notna()
+
+    # 1. Preço (sem outliers de Z-score), com bigodes e outliers do boxplot
+    mascara = features['preco_sem_outlier'] & com_bairro
+    preco = features.loc[mascara, 'price']
+    stats_preco = _estatisticas(preco, bairros[mascara], esbocos_preco)
+    bigodes, fliers = _bigodes(preco, bairros[mascara], stats_preco)
+    stats_preco = stats_preco.join(bigodes)
+
+    # 2. Preço por m² (sem outliers de m²)
+    mascara = features['m2_sem_outlier'] & com_bairro
+    preco_m2 = features.loc[mascara, 'price_per_m2']
+    stats_m2 = _estatisticas(preco_m2, bairros[mascara], esbocos_m2)
+    bigodes_m2, _ = _bigodes(preco_m2, bairros[mascara], stats_m2)
+    stats_m2 = stats_m2.join(bigodes_m2)
+
+    stats = pd.concat([
+        bairros[com_bairro].value_counts().rename('anuncios'),
+        stats_preco.add_prefix('price_'),
+        stats_m2.add_prefix('m2_'),
+    ], axis=1)
+    stats = stats[stats['anuncios'] > 0]
+    stats.index = stats.index.astype(str)
+    stats.index.name = 'neighborhood'
+
+    # 3. Distribuição de quartos e vagas por bairro
+    def distribuicao(coluna):
+        if coluna not in df.columns:
+            return pd.DataFrame(index=stats.index)
+        validos = com_bairro & df[coluna].notna()
+        tabela = pd.crosstab(bairros[validos].astype(str), df.loc[validos, coluna].astype(int))
+        return tabela.reindex(stats.index, fill_value=0)
+
+    fliers = {str(bairro): valores for bairro, valores in fliers.items()}
+    return NeighborhoodCube(stats, distribuicao('bedrooms'), distribuicao('parkingSpaces'), fliers)
@@ -0,0 +1,320 @@
+# core/cache.py
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+
+def content_hash(data):
+    """
+    Calcula a chave de conteúdo (hash) de um arquivo enviado.
+
+    Args:
+        data (bytes): O conteúdo bruto do arquivo.
+
+    Returns:
+        str: O hash hexadecimal (blake2b, 128 bits) do conteúdo.
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def estimate_bytes(obj):
+    """Estima o tamanho em memória de um objeto guardado no cache."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True, index=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if hasattr(obj, 'nbytes'):
+        return int(obj.nbytes)
+    return sys.getsizeof(obj)
+
+
+# Artefatos que não mudam depois de criados: medidos uma única vez. Os
+# demais (ex: o cache de visões filtradas, que cresce a cada recorte) são
+# medidos de novo sempre que o tamanho do dataset é consultado
+TAMANHO_FIXO = (pd.DataFrame, pd.Series, np.ndarray, bytes, bytearray)
+
+
+class LRUCache:
+    """
+    Cache LRU (least recently used) limitado por número de entradas e,
+    opcionalmente, por bytes. Guarda contadores de acertos, falhas e
+    remoções para exibição no painel.
+
+    É seguro para uso por várias sessões do Streamlit ao mesmo tempo.
+    """
+
+    def __init__(self, max_entries=8, max_bytes=None, sizeof=estimate_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._items = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def get(self, key, default=None):
+        """Retorna o valor e o marca como o mais recente (ou `default`)."""
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Insere (ou substitui) um valor e remove os mais antigos se preciso."""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            self._evict()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._items.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(self._sizeof(value) for value in self._items.values())
+
+    @property
+    def nbytes(self):
+        return self.total_bytes()
+
+    def _evict(self):
+        # Nunca remove a entrada recém-inserida (a última do OrderedDict)
+        while len(self._items) > 1 and (
+                len(self._items) > self.max_entries or
+                (self.max_bytes is not None and self.total_bytes() > self.max_bytes)
+        ):
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """Retorna um dicionário com os contadores e o uso de memória."""
+        with self._lock:
+            return {
+                'entries': len(self._items),
+                'bytes': self.total_bytes(),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+class ArtifactHolder:
+    """
+    Os artefatos derivados de um dataset (ou de uma visão dele): cada um é
+    calculado uma única vez, com `artifact(name, builder)`, e entra no
+    tamanho (`nbytes`) usado pelo limite de bytes do cache.
+    """
+
+    def __init__(self):
+        self.artifacts = {}
+        self._artifact_bytes = {}
+        self._lock = threading.RLock()
+
+    @property
+    def nbytes(self):
+        # Os de TAMANHO_FIXO já foram medidos; os demais são medidos de novo.
+        # Cópia dos itens: outra sessão pode acrescentar artefatos durante a soma
+        return sum(self._artifact_bytes[nome] if nome in self._artifact_bytes else estimate_bytes(valor)
+                   for nome, valor in list(self.artifacts.items()))
+
+    def artifact(self, name, builder):
+        """
+        Retorna o artefato `name`, construindo-o com `builder()` na primeira
+        chamada. Todas as análises recebem o mesmo objeto.
+        """
+        with self._lock:
+            if name not in self.artifacts:
+                value = builder()
+                self.artifacts[name] = value
+                if isinstance(value, TAMANHO_FIXO):
+                    self._artifact_bytes[name] = estimate_bytes(value)
+            return self.artifacts[name]
+
+
+class DatasetEntry(ArtifactHolder):
+    """
+    Um dataset já carregado e os artefatos derivados dele, calculados uma
+    única vez.
+
+    Se houver um `ColumnarStore`, o DataFrame completo não fica em memória:
+    cada análise pede só as suas colunas com `frame(columns)`. Sem o
+    armazenamento, o DataFrame inteiro (tratado como somente leitura) é
+    mantido e as colunas são projetadas a partir dele.
+    """
+
+    def __init__(self, key, df=None, store=None):
+        super().__init__()
+        self.key = key
+        self.store = store
+        self._df = df
+        self._df_bytes = estimate_bytes(df) if df is not None else 0
+
+    @property
+    def nbytes(self):
+        return self._df_bytes + super().nbytes
+
+    @property
+    def df(self):
+        """O DataFrame completo (evite: prefira `frame(columns)`)."""
+        return self.frame()
+
+    @property
+    def columns(self):
+        if self.store is not None:
+            return self.store.columns(self.key)
+        return list(self._df.columns)
+
+    @property
+    def numeric_columns(self):
+        """As colunas numéricas do dataset (ex: para a matriz de correlação)."""
+        if self.store is not None:
+            return self.store.numeric_columns(self.key)
+        return self._df.select_dtypes(include=['number']).columns.tolist()
+
+    @property
+    def rows(self):
+        if self.store is not None:
+            return self.store.rows(self.key)
+        return len(self._df)
+
+    def frame(self, columns=None):
+        """
+        Retorna o dataset com apenas as colunas pedidas (as ausentes são
+        ignoradas; cada análise valida as suas).
+
+        Args:
+            columns (list, opcional): As colunas desejadas (todas se None).
+
+        Returns:
+            pd.DataFrame: O DataFrame projetado, compartilhado entre execuções.
+        """
+        if self.store is None:
+            if columns is None:
+                return self._df
+            return self._df[[col for col in columns if col in self._df.columns]]
+
+        nome = ('frame', None if columns is None else tuple(columns))
+        return self.artifact(nome, lambda: self.store.read(self.key, columns))
+
+    def head(self, n=5):
+        """As primeiras `n` linhas do dataset, sem carregar o resto."""
+        if self.store is None:
+            return self._df.head(n)
+        return self.store.head(self.key, n)
+
+
+class DatasetCache(LRUCache):
+    """
+    Cache de datasets indexado pelo hash do conteúdo do arquivo enviado.
+    Cada arquivo é lido (parse) uma única vez; as próximas execuções do
+    script recebem o mesmo `DatasetEntry`.
+
+    Com um `ColumnarStore`, o CSV lido é gravado em formato colunar e
+    descartado da memória; as análises leem depois apenas as suas colunas.
+
+    A leitura acontece fora do lock do cache: as outras sessões continuam
+    consultando o cache enquanto um arquivo é lido, e quem pede o mesmo
+    arquivo durante a leitura espera por ela em vez de lê-lo de novo.
+
+    Os artefatos de um dataset (e as visões filtradas dele) são criados
+    depois da inserção, então o tamanho das entradas é conferido de novo a
+    cada acerto, e não só no `put`.
+    """
+
+    def __init__(self, max_entries=4, max_bytes=None, store=None):
+        super().__init__(max_entries=max_entries, max_bytes=max_bytes,
+                         sizeof=lambda entry: entry.nbytes)
+        self.store = store
+        self._lendo = {}
+        if store is not None:
+            # Os arquivos dos datasets em cache (e dos que estão sendo lidos)
+            # não podem ser apagados: as colunas são lidas sob demanda
+            store.in_use = self.live_keys
+
+    def live_keys(self):
+        """As chaves dos datasets em cache ou sendo lidos."""
+        with self._lock:
+            return list(self._items) + list(self._lendo)
+
+    def get(self, key, default=None):
+        """Retorna o dataset (ver `LRUCache.get`) e remove os mais antigos se ele cresceu."""
+        with self._lock:
+            entry = super().get(key, default)
+            if entry is not default:
+                self._evict()
+            return entry
+
+    def load(self, data, parser, key=None):
+        """
+        Retorna o dataset do cache ou o lê com `parser(data)`.
+
+        Args:
+            data (bytes): O conteúdo do arquivo.
+            parser (callable): Função que recebe os bytes e retorna um DataFrame.
+            key (str, opcional): Hash já calculado do conteúdo.
+
+        Returns:
+            DatasetEntry: A entrada com o dataset carregado.
+        """
+        key = key or content_hash(data)
+
+        # 1. Já em cache, ou já sendo lido por outra sessão
+        with self._lock:
+            entry = self.get(key)
+            if entry is not None:
+                return entry
+            leitura = self._lendo.get(key)
+            if leitura is None:
+                leitura = self._lendo[key] = Future()
+                dono = True
+            else:
+                dono = False
+        if not dono:
+            return leitura.result()
+
+        # 2. Leitura (e gravação no armazenamento) sem o lock do cache
+        try:
+            if self.store is not None:
+                if not self.store.has(key):
+                    self.store.ingest(key, parser(data))
+                entry = DatasetEntry(key, store=self.store)
+            else:
+                entry = DatasetEntry(key, df=parser(data))
+        except BaseException as e:
+            with self._lock:
+                del self._lendo[key]
+            leitura.set_exception(e)
+            raise
+
+        # 3. Só a inserção volta a usar o lock
+        with self._lock:
+            self.put(key, entry)
+            del self._lendo[key]
+        leitura.set_result(entry)
+        return entry
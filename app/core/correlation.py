@@ -0,0 +1,175 @@
+# core/correlation.py
+import numpy as np
+import pandas as pd
+
+
+class CorrelationStats:
+    """
+    Estatísticas suficientes para a correlação de Pearson entre várias
+    colunas: para cada par (i, j), o número de linhas em que ambas têm
+    valor, as somas de x_i, as somas de x_i² e os produtos cruzados x_i·x_j.
+
+    As somas são acumuladas em blocos (e podem ser mescladas), então a
+    matriz sai igual à de `DataFrame.corr()` (pares completos) sem manter
+    o dataset em memória. Os valores são deslocados pela média do primeiro
+    bloco para evitar perda de precisão com preços na casa dos milhões.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        p = len(self.columns)
+        self.shift = None
+        self.rows = 0
+        self.n = np.zeros((p, p))
+        self.sum_x = np.zeros((p, p))    # sum_x[i, j] = Σ x_i onde i e j existem
+        self.sum_xx = np.zeros((p, p))   # sum_xx[i, j] = Σ x_i² onde i e j existem
+        self.sum_xy = np.zeros((p, p))   # sum_xy[i, j] = Σ x_i·x_j
+
+    @classmethod
+    def from_frame(cls, df, columns=None, block_rows=250_000):
+        """
+        Calcula as estatísticas de um DataFrame inteiro, em blocos de
+        `block_rows` linhas (limita a memória das matrizes temporárias).
+
+        Args:
+            df (pd.DataFrame): O dataset.
+            columns (list, opcional): As colunas (padrão: todas as numéricas).
+
+        Returns:
+            CorrelationStats: As estatísticas prontas para `corr()`.
+        """
+        if columns is None:
+            columns = df.select_dtypes(include=['number']).columns
+        stats = cls(columns)
+        for inicio in range(0, len(df), block_rows):
+            stats.update(df.iloc[inicio:inicio + block_rows])
+        return stats
+
+    def update(self, df):
+        """
+        Acrescenta um bloco de linhas (ex: um pedaço do arquivo ou anúncios
+        novos); colunas ausentes contam como nulas.
+        """
+        self.rows += len(df)
+        valores = df.reindex(columns=self.columns).to_numpy(dtype='float64', na_value=np.nan)
+        if self.shift is None:
+            with np.errstate(invalid='ignore'):
+                self.shift = np.nan_to_num(np.nanmean(valores, axis=0)) if len(valores) else np.zeros(len(self.columns))
+
+        valores = valores - self.shift
+        presentes = (~np.isnan(valores)).astype('float64')
+        zerados = np.nan_to_num(valores)
+
+        self.n += presentes.T @ presentes
+        self.sum_x += zerados.T @ presentes
+        self.sum_xx += (zerados ** 2).T @ presentes
+        self.sum_xy += zerados.T @ zerados
+        return self
+
+    def remove(self, df):
+        """
+        Retira linhas acrescentadas antes (ex: a versão antiga de anúncios
+        atualizados): as somas são subtraídas, sem recalcular o resto.
+        """
+        bloco = CorrelationStats(self.columns)
+        bloco.shift = self.shift
+        bloco.update(df)
+        self.rows -= bloco.rows
+        self.n -= bloco.n
+        self.sum_x -= bloco.sum_x
+        self.sum_xx -= bloco.sum_xx
+        self.sum_xy -= bloco.sum_xy
+        return self
+
+    def merge(self, other):
+        """Combina as estatísticas de outro bloco (mesmas colunas)."""
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+        other = other._reshift(self.shift)
+        self.rows += other.rows
+        self.n += other.n
+        self.sum_x += other.sum_x
+        self.sum_xx += other.sum_xx
+        self.sum_xy += other.sum_xy
+        return self
+
+    def _reshift(self, shift):
+        # Reescreve as somas de (x - s_antigo) em termos de (x - s_novo)
+        d = self.shift - shift
+        novo = CorrelationStats(self.columns)
+        novo.shift = shift.copy()
+        novo.rows = self.rows
+        novo.n = self.n.copy()
+        novo.sum_x = self.sum_x + d[:, None] * self.n
+        novo.sum_xx = self.sum_xx + 2 * d[:, None] * self.sum_x + d[:, None] ** 2 * self.n
+        novo.sum_xy = (
+            self.sum_xy + d[None, :] * self.sum_x + d[:, None] * self.sum_x.T +
+            np.outer(d, d) * self.n
+        )
+        return novo
+
+    def corr(self, fill=None, min_periods=2):
+        """
+        Matriz de correlação de Pearson.
+
+        Args:
+            fill (dict | pd.Series, opcional): Valor usado no lugar dos nulos
+                de cada coluna (ex: a mediana). Sem ele, cada par usa apenas
+                as linhas em que as duas colunas existem, como `DataFrame.corr()`.
+                Com ele, o resultado é o mesmo de `df.fillna(fill).corr()`,
+                sem precisar preencher nem recalcular o dataset.
+            min_periods (int): Mínimo de linhas por par.
+
+        Returns:
+            pd.DataFrame: A matriz, com NaN onde não há dados suficientes.
+        """
+        if fill is None:
+            n, soma_i, soma_j = self.n, self.sum_x, self.sum_x.T
+            quad_i, quad_j, cruz = self.sum_xx, self.sum_xx.T, self.sum_xy
+        else:
+            n, soma_i, soma_j, quad_i, quad_j, cruz = self._somas_preenchidas(fill)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media_i = soma_i / n
+            media_j = soma_j / n
+            cov = cruz - n * media_i * media_j
+            var_i = quad_i - n * media_i ** 2
+            var_j = quad_j - n * media_j ** 2
+            r = cov / np.sqrt(var_i * var_j)
+        r = np.where((n >= min_periods) & (var_i > 0) & (var_j > 0), np.clip(r, -1, 1), np.nan)
+        return pd.DataFrame(r, index=self.columns, columns=self.columns)
+
+    def _somas_preenchidas(self, fill):
+        # Somas como se cada nulo da coluna i valesse f_i (todas as `rows` linhas)
+        f = pd.Series(fill).reindex(self.columns).to_numpy(dtype='float64') - self.shift
+        f = np.nan_to_num(f)
+        total = float(self.rows)
+        n_i = np.diag(self.n)
+        s_i = np.diag(self.sum_x)
+        q_i = np.diag(self.sum_xx)
+        faltam = total - n_i
+
+        soma = s_i + faltam * f
+        quad = q_i + faltam * f ** 2
+        # Σ x̃_i·x̃_j = pares completos + (x_i existe, x_j nulo)·f_j
+        #            + (x_j existe, x_i nulo)·f_i + (ambos nulos)·f_i·f_j
+        so_i = s_i[:, None] - self.sum_x
+        so_j = s_i[None, :] - self.sum_x.T
+        ambos_nulos = total - n_i[:, None] - n_i[None, :] + self.n
+        cruz = self.sum_xy + so_i * f[None, :] + so_j * f[:, None] + ambos_nulos * np.outer(f, f)
+
+        n = np.full(self.n.shape, total)
+        return (n, np.broadcast_to(soma[:, None], n.shape), np.broadcast_to(soma[None, :], n.shape),
+                np.broadcast_to(quad[:, None], n.shape), np.broadcast_to(quad[None, :], n.shape), cruz)
+
+    def price_row(self, columns=None, fill=None):
+        """
+        Correlação de cada atributo com o preço, em ordem decrescente (a
+        linha 'price' da matriz, sem recalcular nada).
+        """
+        linha = self.corr(fill=fill)['price']
+        if columns is not None:
+            linha = linha.reindex(columns)
+        return linha.drop('price', errors='ignore').sort_values(ascending=False)
@@ -0,0 +1,70 @@
+# core/features.py
+import numpy as np
+import pandas as pd
+
+# Colunas do dataset necessárias para montar a tabela de atributos
+FEATURE_COLUMNS = ['price', 'usableAreas']
+
+# Regras de limpeza únicas, compartilhadas por todas as análises de preço/m²
+AREA_MINIMA = 10         # m²: remove áreas 'zero' ou muito pequenas
+PRECO_MINIMO = 1000      # R$: remove preços 'zero' ou simbólicos
+QUANTIL_M2 = 0.99        # corta os 1% maiores valores de preço/m²
+Z_SCORE_PRECO = 3        # desvios padrão aceitos no preço (boxplot por bairro)
+
+
+def build_features(df, quantis=None):
+    """
+    Calcula, uma única vez por dataset, os atributos derivados usados por
+    várias análises: colunas numéricas limpas, preço por m² e as máscaras
+    de outliers.
+
+    Args:
+        df (pd.DataFrame): O dataset com as colunas 'price' e 'usableAreas'.
+        quantis (QuantileSketches, opcional): Esboços do dataset
+            (core.quantiles); com eles, o corte do quantil 99% do preço/m²
+            é aproximado, sem ordenar a coluna.
+
+    Returns:
+        pd.DataFrame: Tabela alinhada ao índice de `df`, com as colunas:
+            - price / usableAreas: float64, NaN onde o valor é inválido (<= 0);
+            - price_per_m2: preço por m², NaN fora de `m2_valido`;
+            - m2_valido: preço > PRECO_MINIMO e área > AREA_MINIMA;
+            - m2_sem_outlier: `m2_valido` e preço/m² abaixo do quantil 99%;
+            - preco_sem_outlier: preço a até 3 desvios padrão da média.
+    """
+    colunas_faltando = [col for col in FEATURE_COLUMNS if col not in df.columns]
+    if colunas_faltando:
+        raise ValueError(f"Colunas necessárias não encontradas: {', '.join(colunas_faltando)}")
+
+    # 1. Colunas numéricas limpas (valores <= 0 viram NaN)
+    price = df['price'].astype('float64')
+    price = price.where(price > 0)
+    area = df['usableAreas'].astype('float64')
+    area = area.where(area > 0)
+
+    # 2. Preço por m² apenas onde preço e área são plausíveis
+    m2_valido = (price > PRECO_MINIMO) & (area > AREA_MINIMA)
+    price_per_m2 = (price / area).where(m2_valido)
+
+    # 3. Máscara de outliers do preço/m² (quantil calculado só sobre os válidos)
+    if m2_valido.any():
+        if quantis is not None:
+            limite_m2 = quantis.quantile('price_per_m2', QUANTIL_M2)
+        else:
+            limite_m2 = price_per_m2.quantile(QUANTIL_M2)
+        m2_sem_outlier = m2_valido & (price_per_m2 < limite_m2)
+    else:
+        m2_sem_outlier = m2_valido
+
+    # 4. Máscara de outliers do preço (Z-score)
+    desvio = np.abs(price - price.mean())
+    preco_sem_outlier = price.notna() & (desvio <= Z_SCORE_PRECO * price.std())
+
+    return pd.DataFrame({
+        'price': price,
+        'usableAreas': area,
+        'price_per_m2': price_per_m2,
+        'm2_valido': m2_valido,
+        'm2_sem_outlier': m2_sem_outlier,
+        'preco_sem_outlier': preco_sem_outlier,
+    }, index=df.index)
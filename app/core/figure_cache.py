@@ -0,0 +1,70 @@
+# core/figure_cache.py
+import io
+import threading
+
+import matplotlib.pyplot as plt
+
+from .cache import LRUCache
+from .instrumentation import measure
+
+# O estado do pyplot (figura atual, estilo) é global e não é seguro entre
+# threads; as sessões do Streamlit rodam em threads do mesmo processo
+RENDER_LOCK = threading.RLock()
+
+
+def render_png(fig, dpi=100):
+    """
+    Rasteriza uma figura do matplotlib e a fecha (libera a memória).
+
+    Args:
+        fig (matplotlib.figure.Figure): A figura já desenhada.
+        dpi (int): Resolução da imagem.
+
+    Returns:
+        bytes: A imagem PNG.
+    """
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format='png', dpi=dpi)
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+class FigureCache(LRUCache):
+    """
+    Cache de gráficos já renderizados, em bytes PNG, indexado por
+    (dataset, análise, parâmetros). Um gráfico em cache é exibido sem
+    executar o seaborn/matplotlib de novo; nenhuma figura fica aberta.
+    """
+
+    def __init__(self, max_entries=64, max_bytes=64 * 1024 ** 2, dpi=100):
+        super().__init__(max_entries=max_entries, max_bytes=max_bytes)
+        self.dpi = dpi
+
+    @staticmethod
+    def make_key(dataset_key, analysis_id, **params):
+        """Chave do gráfico: parâmetros em ordem fixa para serem comparáveis."""
+        return (dataset_key, analysis_id, tuple(sorted(params.items())))
+
+    def get_or_render(self, key, builder, prepare=None):
+        """
+        Retorna os bytes PNG do gráfico `key`, chamando `builder()` (que
+        devolve a figura) apenas se ele ainda não estiver em cache.
+
+        `prepare()`, se informado, calcula antes os dados do gráfico (ex: os
+        agregados do dataset) fora da trava do matplotlib, para que outras
+        threads possam desenhar enquanto isso.
+        """
+        png = self.get(key)
+        if png is None:
+            if prepare is not None:
+                with measure('preparo'):
+                    prepare()
+            with RENDER_LOCK:
+                with measure('analise'):
+                    fig = builder()
+                with measure('render_png'):
+                    png = render_png(fig, dpi=self.dpi)
+            self.put(key, png)
+        return png
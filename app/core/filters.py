@@ -0,0 +1,283 @@
+# core/filters.py
+import numpy as np
+import pandas as pd
+
+from .cache import ArtifactHolder, LRUCache
+
+# Colunas que podem ser filtradas no app
+FILTER_COLUMNS = ['price', 'bedrooms', 'parkingSpaces', 'suites', 'neighborhood']
+
+# Colunas com até este número de valores distintos ganham um bitmap por
+# valor; as demais (ex: o preço) usam o índice ordenado, para faixas
+MAX_BITMAPS = 256
+
+
+def _empacota(mascara):
+    """Máscara booleana -> bitmap (palavras uint64, bit i = linha i)."""
+    bytes_ = np.packbits(mascara, bitorder='little')
+    sobra = -len(bytes_) % 8
+    if sobra:
+        bytes_ = np.concatenate([bytes_, np.zeros(sobra, dtype=np.uint8)])
+    return bytes_.view(np.uint64)
+
+
+def _desempacota(bitmap, n):
+    """Bitmap -> máscara booleana com `n` linhas."""
+    return np.unpackbits(bitmap.view(np.uint8), count=n, bitorder='little').view(bool)
+
+
+class BitmapIndex:
+    """
+    Um bitmap por valor distinto da coluna (categorias, contagens): a
+    seleção de vários valores é um OU entre os bitmaps deles, sem olhar a
+    coluna de novo. As linhas sem valor não entram em nenhum bitmap.
+    """
+
+    def __init__(self, values, bitmaps, n):
+        self.values = list(values)
+        self.bitmaps = bitmaps
+        self.n = n
+
+    @classmethod
+    def from_series(cls, serie):
+        codigos, valores = pd.factorize(serie, sort=True, use_na_sentinel=True)
+        n = len(codigos)
+        bitmaps = np.vstack([_empacota(codigos == codigo) for codigo in range(len(valores))]) \
+            if len(valores) else np.zeros((0, (n + 63) // 64), dtype=np.uint64)
+        return cls(valores.tolist(), bitmaps, n)
+
+    @property
+    def nbytes(self):
+        return int(self.bitmaps.nbytes)
+
+    def select(self, valores):
+        """Bitmap das linhas com qualquer um dos `valores`."""
+        valores = set(valores)
+        posicoes = [i for i, valor in enumerate(self.values) if valor in valores]
+        if not posicoes:
+            return np.zeros(self.bitmaps.shape[1], dtype=np.uint64)
+        return np.bitwise_or.reduce(self.bitmaps[posicoes], axis=0)
+
+    def select_range(self, minimo, maximo):
+        """Bitmap das linhas com valor entre `minimo` e `maximo` (inclusive)."""
+        return self.select([valor for valor in self.values if minimo <= valor <= maximo])
+
+
+class SortedIndex:
+    """
+    As posições das linhas ordenadas pelo valor da coluna (ex: o preço):
+    uma faixa vira duas buscas binárias e a marcação só das linhas dentro
+    dela (ou só das de fora, se forem menos).
+    """
+
+    def __init__(self, order, sorted_values, missing, n):
+        self.order = order
+        self.sorted_values = sorted_values
+        self.missing = missing
+        self.n = n
+
+    @classmethod
+    def from_series(cls, serie):
+        valores = serie.to_numpy(dtype='float64', na_value=np.nan)
+        nulos = np.isnan(valores)
+        validos = np.flatnonzero(~nulos)
+        ordem = validos[np.argsort(valores[validos], kind='stable')]
+        tipo = np.int32 if len(valores) < 2 ** 31 else np.int64
+        return cls(ordem.astype(tipo), valores[ordem], np.flatnonzero(nulos).astype(tipo), len(valores))
+
+    @property
+    def nbytes(self):
+        return int(self.order.nbytes + self.sorted_values.nbytes + self.missing.nbytes)
+
+    def steps(self, n=100):
+        """Os valores nos percentis 0, 1/n, ..., 1 (sem repetição), para os controles de faixa."""
+        if not len(self.sorted_values):
+            return []
+        posicoes = np.linspace(0, len(self.sorted_values) - 1, n + 1).round().astype('int64')
+        return np.unique(self.sorted_values[posicoes]).tolist()
+
+    def select_range(self, minimo, maximo):
+        """Bitmap das linhas com valor entre `minimo` e `maximo` (inclusive)."""
+        inicio = np.searchsorted(self.sorted_values, minimo, side='left')
+        fim = np.searchsorted(self.sorted_values, maximo, side='right')
+        if fim - inicio <= len(self.order) // 2:
+            mascara = np.zeros(self.n, dtype=bool)
+            mascara[self.order[inicio:fim]] = True
+        else:
+            # Mais da metade das linhas na faixa: marca as de fora (e as sem valor)
+            mascara = np.ones(self.n, dtype=bool)
+            mascara[self.order[:inicio]] = False
+            mascara[self.order[fim:]] = False
+            mascara[self.missing] = False
+        return _empacota(mascara)
+
+    def select(self, valores):
+        bitmap = np.zeros((self.n + 63) // 64, dtype=np.uint64)
+        for valor in valores:
+            bitmap |= self.select_range(valor, valor)
+        return bitmap
+
+
+class FilterIndex:
+    """
+    Índices das colunas filtráveis de um dataset, montados uma única vez:
+    cada filtro vira um bitmap e os filtros são combinados com E bit a bit,
+    sem percorrer o DataFrame a cada mudança nos controles.
+
+    Os filtros são um dicionário {coluna: filtro}, em que o filtro é uma
+    faixa `(mínimo, máximo)` (inclusive) ou uma lista de valores. As linhas
+    sem valor numa coluna filtrada ficam de fora.
+    """
+
+    def __init__(self, indices, n):
+        self.indices = indices
+        self.n = n
+
+    def __contains__(self, coluna):
+        return coluna in self.indices
+
+    @property
+    def nbytes(self):
+        return int(sum(indice.nbytes for indice in self.indices.values()))
+
+    def options(self, coluna):
+        """
+        Os valores selecionáveis da coluna: os distintos (bitmaps) ou os
+        percentis (índice ordenado), em ordem crescente.
+        """
+        indice = self.indices[coluna]
+        return indice.values if isinstance(indice, BitmapIndex) else indice.steps()
+
+    def bitmap(self, filtros):
+        """O bitmap das linhas que passam em todos os filtros (None sem filtros)."""
+        resultado = None
+        for coluna, filtro in filtros.items():
+            indice = self.indices[coluna]
+            if isinstance(filtro, tuple):
+                bitmap = indice.select_range(*filtro)
+            else:
+                bitmap = indice.select(filtro)
+            resultado = bitmap if resultado is None else resultado & bitmap
+        return resultado
+
+    def mask(self, filtros):
+        """
+        As linhas que passam em todos os filtros.
+
+        Returns:
+            np.ndarray: Máscara booleana com uma posição por linha, ou None
+            se não houver filtros (todas as linhas).
+        """
+        bitmap = self.bitmap(filtros)
+        return None if bitmap is None else _desempacota(bitmap, self.n)
+
+
+def build_filter_index(df, columns=FILTER_COLUMNS, max_bitmaps=MAX_BITMAPS):
+    """
+    Monta os índices das colunas filtráveis presentes em `df`: bitmaps para
+    as colunas com poucos valores distintos, índice ordenado para as demais.
+
+    Args:
+        df (pd.DataFrame): O dataset.
+        columns (list): As colunas a indexar (as ausentes são ignoradas).
+        max_bitmaps (int): Máximo de valores distintos para usar bitmaps.
+
+    Returns:
+        FilterIndex: Os índices.
+    """
+    indices = {}
+    for coluna in columns:
+        if coluna not in df.columns:
+            continue
+        serie = df[coluna]
+        numerica = pd.api.types.is_numeric_dtype(serie.dtype)
+        if not numerica or serie.nunique() <= max_bitmaps:
+            indices[coluna] = BitmapIndex.from_series(serie)
+        else:
+            indices[coluna] = SortedIndex.from_series(serie)
+    return FilterIndex(indices, len(df))
+
+
+def filter_key(filtros):
+    """Chave comparável (e hashable) de um conjunto de filtros."""
+    return tuple(sorted(
+        (coluna, filtro if isinstance(filtro, tuple) else tuple(sorted(filtro, key=str)))
+        for coluna, filtro in filtros.items()
+    ))
+
+
+class DatasetView(ArtifactHolder):
+    """
+    As linhas de um `DatasetEntry` selecionadas por uma máscara, com a
+    mesma interface (`frame`, `artifact`, `head`...): as análises e os
+    artefatos (cubo por bairro, correlação, índices) funcionam sobre a
+    visão como se o arquivo enviado tivesse só essas linhas.
+
+    Cada conjunto de colunas pedido é copiado através da máscara uma única
+    vez, na primeira vez que alguma análise o pede (e entra no tamanho da
+    visão), e o índice é refeito (0..n-1): as análises recebem um DataFrame
+    comum, não uma visão sem cópia.
+    """
+
+    def __init__(self, parent, mask, key):
+        super().__init__()
+        self.parent = parent
+        self.mask = mask
+        self.key = key
+        self.store = None
+
+    @property
+    def rows(self):
+        return int(np.count_nonzero(self.mask))
+
+    @property
+    def columns(self):
+        return self.parent.columns
+
+    @property
+    def numeric_columns(self):
+        return self.parent.numeric_columns
+
+    @property
+    def df(self):
+        return self.frame()
+
+    def frame(self, columns=None):
+        """O dataset filtrado, só com as colunas pedidas (ver `DatasetEntry.frame`)."""
+        nome = ('frame', None if columns is None else tuple(columns))
+        return self.artifact(nome, lambda: self.parent.frame(columns)[self.mask].reset_index(drop=True))
+
+    def head(self, n=5):
+        """As primeiras `n` linhas da visão (lidas só do começo do dataset, se possível)."""
+        posicoes = np.flatnonzero(self.mask)[:n]
+        if len(posicoes) and posicoes[-1] < 100_000:
+            return self.parent.head(int(posicoes[-1]) + 1).iloc[posicoes].reset_index(drop=True)
+        return self.frame().head(n)
+
+
+def filtered_view(dataset, filter_index, filtros, max_views=8):
+    """
+    A visão do dataset com as linhas que passam nos filtros; sem filtros,
+    o próprio dataset. As visões recentes ficam guardadas no dataset (LRU),
+    então voltar a um recorte anterior não refaz os artefatos dele; os
+    bytes delas (colunas projetadas e artefatos) entram no tamanho do
+    dataset, limitado pelo `max_bytes` do DatasetCache.
+
+    Args:
+        dataset (DatasetEntry): O dataset completo.
+        filter_index (FilterIndex): Os índices do dataset.
+        filtros (dict): {coluna: (mínimo, máximo) ou lista de valores}.
+        max_views (int): Quantas visões manter por dataset.
+
+    Returns:
+        DatasetEntry | DatasetView: O dataset ou a visão filtrada.
+    """
+    if not filtros:
+        return dataset
+    visoes = dataset.artifact('visoes', lambda: LRUCache(max_entries=max_views))
+    chave = filter_key(filtros)
+    visao = visoes.get(chave)
+    if visao is None:
+        visao = DatasetView(dataset, filter_index.mask(filtros), f'{dataset.key}:{abs(hash(chave)):x}')
+        visoes.put(chave, visao)
+    return visao
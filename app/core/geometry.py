@@ -0,0 +1,175 @@
+# core/geometry.py
+import json
+import math
+import os
+
+import numpy as np
+
+from .cache import LRUCache
+
+# Nível de zoom (Web Mercator) usado no mapa por padrão: a geometria é
+# simplificada para meio pixel neste nível
+ZOOM_PADRAO = 13
+
+# Geometrias já lidas, por (caminho, data de modificação)
+_GEOMETRIAS = LRUCache(max_entries=4)
+
+
+def tamanho_pixel(zoom):
+    """Largura aproximada de um pixel, em graus de longitude, no nível `zoom`."""
+    return 360.0 / (256 * 2 ** zoom)
+
+
+def simplifica_anel(pontos, tolerancia):
+    """
+    Simplifica uma linha/anel com o algoritmo de Douglas-Peucker.
+
+    Args:
+        pontos (np.ndarray): Coordenadas (n x 2).
+        tolerancia (float): Distância máxima (em graus) entre a linha
+            original e a simplificada.
+
+    Returns:
+        np.ndarray: Os pontos mantidos (o primeiro e o último sempre ficam).
+    """
+    n = len(pontos)
+    if n <= 4 or tolerancia <= 0:
+        return pontos
+
+    manter = np.zeros(n, dtype=bool)
+    manter[[0, n - 1]] = True
+    pilha = [(0, n - 1)]
+    while pilha:
+        inicio, fim = pilha.pop()
+        if fim - inicio < 2:
+            continue
+        a, b = pontos[inicio], pontos[fim]
+        meio = pontos[inicio + 1:fim]
+        segmento = b - a
+        comprimento = math.hypot(*segmento)
+        if comprimento == 0:
+            distancias = np.hypot(*(meio - a).T)
+        else:
+            distancias = np.abs(segmento[0] * (meio[:, 1] - a[1]) - segmento[1] * (meio[:, 0] - a[0])) / comprimento
+        maior = int(np.argmax(distancias))
+        if distancias[maior] > tolerancia:
+            indice = inicio + 1 + maior
+            manter[indice] = True
+            pilha.extend([(inicio, indice), (indice, fim)])
+
+    simplificado = pontos[manter]
+    # Um anel precisa de pelo menos 4 pontos (3 vértices + o fechamento)
+    return simplificado if len(simplificado) >= 4 else pontos
+
+
+class NeighborhoodGeometry:
+    """
+    Polígonos dos bairros lidos uma única vez, com versões simplificadas e
+    quantizadas por nível de zoom (calculadas na primeira vez que cada
+    nível é pedido).
+
+    Attributes:
+        names (list): O nome de cada bairro (propriedade NOME do GeoJSON).
+        polygons (list): Para cada bairro, a lista de polígonos; cada
+            polígono é uma lista de anéis (o externo e os buracos) em arrays
+            (n x 2) de longitude/latitude.
+    """
+
+    def __init__(self, names, polygons, name_property='NOME'):
+        self.names = names
+        self.polygons = polygons
+        self.name_property = name_property
+        self._por_zoom = {}
+
+    @classmethod
+    def from_geojson(cls, geojson_data, name_property='NOME'):
+        names, polygons = [], []
+        for feature in geojson_data['features']:
+            geometria = feature.get('geometry') or {}
+            if geometria.get('type') == 'Polygon':
+                partes = [geometria['coordinates']]
+            elif geometria.get('type') == 'MultiPolygon':
+                partes = geometria['coordinates']
+            else:
+                continue
+            names.append(feature['properties'][name_property])
+            polygons.append([
+                [np.asarray(anel, dtype='float64')[:, :2] for anel in poligono]
+                for poligono in partes
+            ])
+        return cls(names, polygons, name_property)
+
+    @property
+    def bounds(self):
+        """(lon_min, lat_min, lon_max, lat_max) de todos os bairros."""
+        pontos = np.vstack([anel for poligonos in self.polygons for poligono in poligonos for anel in poligono])
+        return (*pontos.min(axis=0), *pontos.max(axis=0))
+
+    def _geometrias(self, zoom):
+        # Geometrias GeoJSON simplificadas (meio pixel) e arredondadas para a
+        # menor casa decimal que ainda distingue um pixel neste zoom
+        if zoom not in self._por_zoom:
+            pixel = tamanho_pixel(zoom)
+            casas = max(0, int(math.ceil(-math.log10(pixel / 2))))
+            geometrias = []
+            for poligonos in self.polygons:
+                coordenadas = [
+                    [np.round(simplifica_anel(anel, pixel / 2), casas).tolist() for anel in poligono]
+                    for poligono in poligonos
+                ]
+                if len(coordenadas) == 1:
+                    geometrias.append({'type': 'Polygon', 'coordinates': coordenadas[0]})
+                else:
+                    geometrias.append({'type': 'MultiPolygon', 'coordinates': coordenadas})
+            self._por_zoom[zoom] = geometrias
+        return self._por_zoom[zoom]
+
+    def feature_collection(self, zoom=ZOOM_PADRAO, properties=None):
+        """
+        Monta o GeoJSON simplificado para o nível de zoom, com as
+        propriedades de cada bairro (ex: preço, cor, texto do popup) junto
+        da geometria, para uma única camada no mapa.
+
+        Args:
+            zoom (int): O nível de zoom de referência.
+            properties (dict, opcional): Propriedades extras por nome do bairro.
+
+        Returns:
+            dict: Um FeatureCollection GeoJSON.
+        """
+        properties = properties or {}
+        return {
+            'type': 'FeatureCollection',
+            'features': [
+                {
+                    'type': 'Feature',
+                    'properties': {self.name_property: nome, **properties.get(nome, {})},
+                    'geometry': geometria,
+                }
+                for nome, geometria in zip(self.names, self._geometrias(zoom))
+            ],
+        }
+
+
+def load_geometry(geojson_path, name_property='NOME'):
+    """
+    Lê o GeoJSON dos bairros uma única vez (enquanto o arquivo não mudar).
+
+    Args:
+        geojson_path (str): Caminho do arquivo GeoJSON.
+        name_property (str): A propriedade com o nome do bairro.
+
+    Returns:
+        NeighborhoodGeometry: Os polígonos dos bairros.
+    """
+    try:
+        chave = (os.path.realpath(geojson_path), os.stat(geojson_path).st_mtime_ns, name_property)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Arquivo GeoJSON não encontrado em: {geojson_path}")
+
+    geometria = _GEOMETRIAS.get(chave)
+    if geometria is None:
+        with open(geojson_path, 'r', encoding='utf-8') as f:
+            geometria = NeighborhoodGeometry.from_geojson(json.load(f), name_property)
+        _GEOMETRIAS.put(chave, geometria)
+    return geometria
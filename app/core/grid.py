@@ -0,0 +1,148 @@
+# core/grid.py
+import math
+
+import numpy as np
+import pandas as pd
+
+from .geometry import tamanho_pixel
+
+# Níveis de zoom com agregados pré-calculados (do mais grosso ao mais fino)
+ZOOM_NIVEIS = (11, 12, 13, 14, 15)
+
+# Lado de cada célula, em pixels da tela, no seu nível de zoom
+PIXELS_CELULA = 16
+
+
+def _medianas(codigos, valores):
+    """Mediana de `valores` por código de célula, com uma única ordenação."""
+    ordem = np.lexsort((valores, codigos))
+    codigos, valores = codigos[ordem], valores[ordem]
+    unicos, inicios, n = np.unique(codigos, return_index=True, return_counts=True)
+    medianas = (valores[inicios + (n - 1) // 2] + valores[inicios + n // 2]) / 2
+    return pd.DataFrame({'m2_mediano': medianas, 'm2_anuncios': n}, index=unicos)
+
+
+class PriceGrid:
+    """
+    Agregados de preço por célula quadrada, em vários níveis de zoom.
+
+    As células de um nível são exatamente 4 células do nível seguinte (a
+    origem é a mesma e o lado dobra a cada nível), então o mapa fica
+    coerente ao trocar de nível. O tamanho do que vai para o mapa depende
+    só do número de células, não do número de anúncios.
+
+    Attributes:
+        x0, y0 (float): Canto sudoeste da grade (lon, lat).
+        levels (dict): {zoom: pd.DataFrame}, uma linha por célula ocupada,
+            com 'ix', 'iy', 'anuncios', 'preco_soma', 'preco_anuncios',
+            'm2_mediano' e 'm2_anuncios'.
+        sizes (dict): {zoom: (lado em graus de longitude, em latitude)}.
+    """
+
+    def __init__(self, x0, y0, levels, sizes):
+        self.x0 = x0
+        self.y0 = y0
+        self.levels = levels
+        self.sizes = sizes
+
+    @property
+    def nbytes(self):
+        return int(sum(celulas.memory_usage(deep=True).sum() for celulas in self.levels.values()))
+
+    def nearest_zoom(self, zoom):
+        """O nível pré-calculado mais próximo de `zoom`."""
+        return min(self.levels, key=lambda nivel: abs(nivel - zoom))
+
+    def cell_meters(self, zoom):
+        """Lado aproximado das células do nível, em metros."""
+        return self.sizes[self.nearest_zoom(zoom)][1] * 111_320.0
+
+    def cells(self, zoom, min_anuncios=1):
+        """
+        As células do nível, com o centro e os cantos de cada uma.
+
+        Args:
+            zoom (int): O nível de zoom (usa o pré-calculado mais próximo).
+            min_anuncios (int): Mínimo de anúncios na célula.
+
+        Returns:
+            pd.DataFrame: Os agregados mais 'lon', 'lat' (centro) e
+            'lon0', 'lat0', 'lon1', 'lat1' (cantos).
+        """
+        zoom = self.nearest_zoom(zoom)
+        lado_lon, lado_lat = self.sizes[zoom]
+        celulas = self.levels[zoom]
+        celulas = celulas[celulas['anuncios'] >= min_anuncios]
+
+        lon0 = self.x0 + celulas['ix'] * lado_lon
+        lat0 = self.y0 + celulas['iy'] * lado_lat
+        return celulas.assign(
+            lon=lon0 + lado_lon / 2, lat=lat0 + lado_lat / 2,
+            lon0=lon0, lat0=lat0, lon1=lon0 + lado_lon, lat1=lat0 + lado_lat,
+        )
+
+
+def build_price_grid(lon, lat, preco, preco_m2=None, zooms=ZOOM_NIVEIS, pixels=PIXELS_CELULA):
+    """
+    Agrega os anúncios em células quadradas (binning com NumPy) para cada
+    nível de zoom.
+
+    Args:
+        lon, lat (array): As coordenadas (NaN = sem localização).
+        preco (array): Preço de cada anúncio (NaN = fora da soma).
+        preco_m2 (array, opcional): Preço/m² de cada anúncio (NaN = fora
+            da mediana); sem ele, a mediana não é calculada.
+        zooms (tuple): Os níveis de zoom a calcular.
+        pixels (int): Lado da célula, em pixels, no seu nível de zoom.
+
+    Returns:
+        PriceGrid: Os agregados de cada nível.
+    """
+    lon = np.asarray(lon, dtype='float64')
+    lat = np.asarray(lat, dtype='float64')
+    preco = np.asarray(preco, dtype='float64')
+    preco_m2 = np.full(len(lon), np.nan) if preco_m2 is None else np.asarray(preco_m2, dtype='float64')
+
+    validos = np.isfinite(lon) & np.isfinite(lat)
+    lon, lat, preco, preco_m2 = lon[validos], lat[validos], preco[validos], preco_m2[validos]
+    if lon.size == 0:
+        raise ValueError("Nenhum anúncio com coordenadas ('lat' e 'lon') válidas.")
+
+    # 1. Células quadradas (em metros) do nível mais fino; as dos outros
+    # níveis saem por divisão inteira (cada nível acima tem o dobro do lado)
+    zooms = sorted(zooms)
+    fino = zooms[-1]
+    lado_lon = tamanho_pixel(fino) * pixels
+    lado_lat = lado_lon * math.cos(math.radians(float(np.mean(lat))))
+    x0 = math.floor(lon.min() / lado_lon) * lado_lon
+    y0 = math.floor(lat.min() / lado_lat) * lado_lat
+    ix_fino = ((lon - x0) // lado_lon).astype('int64')
+    iy_fino = ((lat - y0) // lado_lat).astype('int64')
+
+    com_preco = np.isfinite(preco)
+    com_m2 = np.isfinite(preco_m2)
+    levels, sizes = {}, {}
+    for zoom in zooms:
+        fator = 2 ** (fino - zoom)
+        ix, iy = ix_fino // fator, iy_fino // fator
+        largura = int(ix.max()) + 1
+        codigos = iy * largura + ix
+
+        # 2. Contagem e soma do preço por célula
+        unicos, inversos, anuncios = np.unique(codigos, return_inverse=True, return_counts=True)
+        celulas = pd.DataFrame({
+            'ix': unicos % largura,
+            'iy': unicos // largura,
+            'anuncios': anuncios,
+            'preco_soma': np.bincount(inversos[com_preco], weights=preco[com_preco], minlength=len(unicos)),
+            'preco_anuncios': np.bincount(inversos[com_preco], minlength=len(unicos)),
+        }, index=unicos)
+
+        # 3. Mediana do preço/m² por célula
+        celulas = celulas.join(_medianas(codigos[com_m2], preco_m2[com_m2]))
+        celulas['m2_anuncios'] = celulas['m2_anuncios'].fillna(0).astype('int64')
+
+        levels[zoom] = celulas.reset_index(drop=True)
+        sizes[zoom] = (lado_lon * fator, lado_lat * fator)
+
+    return PriceGrid(x0, y0, levels, sizes)
@@ -0,0 +1,180 @@
+# core/hedonic.py
+import numpy as np
+import pandas as pd
+
+from .features import build_features
+
+# Atributos do modelo: a área entra em log (elasticidade), as contagens como estão
+ATRIBUTOS = ['usableAreas', 'bedrooms', 'parkingSpaces', 'suites']
+
+# Colunas do dataset lidas pelo modelo
+HEDONIC_COLUMNS = ['price', 'neighborhood'] + ATRIBUTOS
+
+# Bairros com menos anúncios que isto dividem um único efeito fixo
+MIN_ANUNCIOS_BAIRRO = 10
+
+# Nome do grupo que junta os bairros pequenos (e os desconhecidos na previsão)
+OUTROS = '(outros bairros)'
+
+
+def _matriz(df, atributos):
+    """
+    Os atributos como matriz float64 (anúncios x atributos): log da área e
+    as contagens, com as contagens vazias como zero (no CSV, a ausência de
+    suítes ou vagas costuma vir em branco).
+    """
+    colunas = []
+    for atributo in atributos:
+        valores = df[atributo].to_numpy(dtype='float64', na_value=np.nan)
+        if atributo == 'usableAreas':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                valores = np.log(valores)
+        else:
+            valores = np.nan_to_num(valores, nan=0.0)
+        colunas.append(valores)
+    return np.column_stack(colunas) if colunas else np.zeros((len(df), 0))
+
+
+class HedonicModel:
+    """
+    Modelo hedônico do preço: log(preço) = efeito do bairro + b1·log(área)
+    + b2·quartos + b3·vagas + b4·suítes + erro.
+
+    O efeito fixo de cada bairro não vira uma coluna da matriz: as médias
+    por bairro são retiradas dos dados (transformação "within"), as poucas
+    inclinações saem de um sistema p x p (equações normais) e o efeito de
+    cada bairro é a média do resíduo dele. A matriz fica com uma coluna por
+    atributo, mais o código do bairro, com qualquer número de bairros.
+
+    Attributes:
+        coefficients (pd.Series): Atributo -> inclinação.
+        effects (pd.Series): Bairro -> efeito fixo (log do preço); inclui
+            OUTROS, usado também para os bairros fora do ajuste.
+        sigma (float): Desvio padrão dos resíduos (log do preço).
+        r2 (float): Fração da variância do log do preço explicada.
+        n (int): Anúncios usados no ajuste.
+    """
+
+    def __init__(self, coefficients, effects, sigma, r2, n):
+        self.coefficients = coefficients
+        self.effects = effects
+        self.sigma = sigma
+        self.r2 = r2
+        self.n = n
+
+    @property
+    def nbytes(self):
+        return int(self.coefficients.memory_usage(deep=True) + self.effects.memory_usage(deep=True))
+
+    def attribute_effects(self):
+        """
+        A variação do preço (%) para cada atributo, com o bairro e os demais
+        atributos fixos: +10% de área, +1 quarto, +1 vaga, +1 suíte.
+        """
+        passos = pd.Series({atributo: np.log(1.1) if atributo == 'usableAreas' else 1.0
+                            for atributo in self.coefficients.index})
+        return np.expm1(self.coefficients * passos) * 100
+
+    def predict(self, df):
+        """O log do preço estimado de cada anúncio (NaN sem área válida)."""
+        atributos = self.coefficients.index.tolist()
+        colunas_faltando = [col for col in atributos + ['neighborhood'] if col not in df.columns]
+        if colunas_faltando:
+            raise ValueError(f"Colunas necessárias não encontradas: {', '.join(colunas_faltando)}")
+
+        # O código -1 (bairro fora do ajuste) cai no último efeito, o de OUTROS
+        codigos = pd.Categorical(df['neighborhood'], categories=self.effects.index).codes
+        efeitos = np.append(self.effects.to_numpy(), self.effects.get(OUTROS, self.effects.mean()))
+        return efeitos[codigos] + _matriz(df, atributos) @ self.coefficients.to_numpy()
+
+    def score(self, df, chunksize=200_000):
+        """
+        Compara o preço de cada anúncio com o estimado pelo modelo, em
+        blocos vetorizados de `chunksize` linhas.
+
+        Args:
+            df (pd.DataFrame): Os anúncios (HEDONIC_COLUMNS).
+            chunksize (int): Linhas por bloco (limita a memória temporária).
+
+        Returns:
+            pd.DataFrame: Alinhado ao índice de `df`, com 'preco_estimado',
+            'desvio' (log do preço menos o estimado), 'desvio_pct' (o preço
+            acima ou abaixo do estimado, em %) e 'z' (desvio / sigma).
+            Anúncios sem preço ou área plausíveis ficam com NaN.
+        """
+        estimado = np.concatenate([
+            self.predict(df.iloc[inicio:inicio + chunksize]) for inicio in range(0, len(df), chunksize)
+        ]) if len(df) else np.zeros(0)
+        features = build_features(df)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            desvio = np.where(features['m2_valido'], np.log(features['price'].to_numpy()) - estimado, np.nan)
+        return pd.DataFrame({
+            'preco_estimado': np.exp(estimado),
+            'desvio': desvio,
+            'desvio_pct': np.expm1(desvio) * 100,
+            'z': desvio / self.sigma,
+        }, index=df.index)
+
+
+def fit_hedonic(df, features=None, min_anuncios=MIN_ANUNCIOS_BAIRRO):
+    """
+    Ajusta o modelo hedônico com efeitos fixos por bairro.
+
+    Entram no ajuste os anúncios com preço e área plausíveis e sem outlier
+    de preço/m² (as mesmas regras de core.features).
+
+    Args:
+        df (pd.DataFrame): O dataset (HEDONIC_COLUMNS; entre os atributos,
+            só a área é obrigatória).
+        features (pd.DataFrame, opcional): A tabela de core.features.
+        min_anuncios (int): Bairros com menos anúncios entram em OUTROS.
+
+    Returns:
+        HedonicModel: O modelo ajustado.
+    """
+    colunas_faltando = [col for col in ['price', 'usableAreas', 'neighborhood'] if col not in df.columns]
+    if colunas_faltando:
+        raise ValueError(f"Colunas necessárias não encontradas: {', '.join(colunas_faltando)}")
+    if features is None:
+        features = build_features(df)
+    atributos = [atributo for atributo in ATRIBUTOS if atributo in df.columns]
+
+    # 1. Anúncios do ajuste e códigos dos bairros (os pequenos viram OUTROS)
+    validos = (features['m2_sem_outlier'] & df['neighborhood'].notna()).to_numpy()
+    bairros = df['neighborhood'][validos].astype(str)
+    contagens = bairros.value_counts()
+    bairros = bairros.where(bairros.map(contagens).to_numpy() >= min_anuncios, OUTROS)
+    codigos, nomes = pd.factorize(bairros, sort=True)
+    if len(codigos) <= len(atributos) + len(nomes):
+        raise ValueError("Não há anúncios suficientes para ajustar o modelo de preços.")
+
+    y = np.log(features['price'].to_numpy()[validos])
+    X = _matriz(df[validos], atributos)
+
+    # 2. Transformação "within": retira a média de cada bairro
+    n_bairro = np.bincount(codigos, minlength=len(nomes)).astype('float64')
+
+    def media_bairro(valores):
+        return np.bincount(codigos, weights=valores, minlength=len(nomes)) / n_bairro
+
+    media_y = media_bairro(y)
+    medias_X = np.column_stack([media_bairro(X[:, j]) for j in range(X.shape[1])]) \
+        if atributos else np.zeros((len(nomes), 0))
+    y_w = y - media_y[codigos]
+    X_w = X - medias_X[codigos]
+
+    # 3. Equações normais p x p (lstsq: um atributo constante fica com 0)
+    coeficientes = np.linalg.lstsq(X_w.T @ X_w, X_w.T @ y_w, rcond=None)[0]
+
+    # 4. Efeitos fixos e qualidade do ajuste
+    efeitos = media_y - medias_X @ coeficientes
+    residuos = y_w - X_w @ coeficientes
+    graus = max(len(y) - len(atributos) - len(nomes), 1)
+    soma_total = ((y - y.mean()) ** 2).sum()
+    return HedonicModel(
+        coefficients=pd.Series(coeficientes, index=atributos, dtype='float64'),
+        effects=pd.Series(efeitos, index=pd.Index(nomes, name='neighborhood'), dtype='float64'),
+        sigma=float(np.sqrt(residuos @ residuos / graus)),
+        r2=float(1 - residuos @ residuos / soma_total) if soma_total > 0 else 0.0,
+        n=len(y),
+    )
@@ -0,0 +1,181 @@
+# core/incremental.py
+import copy
+import sys
+from collections import ChainMap
+
+import numpy as np
+import pandas as pd
+
+from .cache import DatasetEntry, content_hash
+from .instrumentation import measure
+from .streaming import STREAM_COLUMNS, StreamingSummary
+
+# Colunas que identificam um anúncio entre um envio e outro. O preço fica
+# de fora de propósito: um anúncio com o preço alterado é uma atualização,
+# não um anúncio novo
+IDENTITY_COLUMNS = ['title', 'street', 'usableAreas']
+
+# Camadas do mapa de identidades (uma por atualização) antes de juntá-las
+MAX_CAMADAS = 32
+
+
+def listing_ids(df, columns=IDENTITY_COLUMNS):
+    """
+    Identificador de cada anúncio: o hash (64 bits) das colunas de
+    identidade. Valores iguais dão o mesmo identificador em qualquer
+    arquivo, inclusive com as categorias em outra ordem.
+
+    Args:
+        df (pd.DataFrame): Os anúncios.
+        columns (list): As colunas de identidade (as ausentes são ignoradas).
+
+    Returns:
+        np.ndarray: Um uint64 por linha.
+    """
+    colunas = [col for col in columns if col in df.columns]
+    if not colunas:
+        raise ValueError(f"Colunas de identidade não encontradas no dataset: {', '.join(columns)}")
+    return pd.util.hash_pandas_object(df[colunas], index=False).to_numpy()
+
+
+def version_key(parent_key, delta_key):
+    """Chave da versão que resulta de aplicar a atualização `delta_key` ao dataset `parent_key`."""
+    return content_hash(f'{parent_key}+{delta_key}'.encode())
+
+
+class ListingVersion:
+    """
+    O estado mantido entre as atualizações de um dataset: a posição de cada
+    anúncio no armazenamento colunar (pelo identificador) e o resumo
+    mesclável (core.streaming) das linhas vigentes.
+
+    Aplicar uma atualização (`apply`) custa o tamanho dela, não o do
+    dataset: as linhas novas são gravadas num segmento próprio, as versões
+    antigas dos anúncios atualizados são lidas por posição e retiradas do
+    resumo, e o mapa de identidades ganha uma camada com os anúncios da
+    atualização (as camadas das versões anteriores são compartilhadas).
+
+    Attributes:
+        key (str): A chave da versão no armazenamento.
+        positions (ChainMap): Identificador -> posição da linha vigente.
+        total (int): Linhas gravadas em todos os segmentos (inclusive as
+            substituídas), ou seja, a posição da próxima linha.
+        summary (StreamingSummary): O resumo das linhas vigentes.
+    """
+
+    def __init__(self, key, positions, total, summary):
+        self.key = key
+        self.positions = positions
+        self.total = total
+        self.summary = summary
+
+    @property
+    def nbytes(self):
+        return self.summary.nbytes + sum(sys.getsizeof(camada) for camada in self.positions.maps)
+
+    @classmethod
+    def from_store(cls, store, key, chunksize=100_000):
+        """
+        Monta o estado de um dataset já gravado, lendo as suas colunas de
+        identidade e as do resumo uma única vez.
+        """
+        with measure('versao_inicial') as registro:
+            df = store.read(key, list(dict.fromkeys(IDENTITY_COLUMNS + STREAM_COLUMNS)))
+            ids = listing_ids(df)
+            total = store.total_rows(key)
+            posicoes = np.delete(np.arange(total), store.removed(key))
+
+            resumo = StreamingSummary()
+            for inicio in range(0, len(df), chunksize):
+                bloco = df.iloc[inicio:inicio + chunksize]
+                resumo.update(bloco[[col for col in STREAM_COLUMNS if col in bloco.columns]],
+                              ids=ids[inicio:inicio + chunksize])
+            registro['linhas'] = len(df)
+        return cls(key, ChainMap(dict(zip(ids.tolist(), posicoes.tolist()))), total, resumo)
+
+    def apply(self, store, delta, key, upsert=True):
+        """
+        Aplica uma atualização (anúncios novos ou alterados) e devolve a
+        nova versão; esta continua válida.
+
+        Args:
+            store (ColumnarStore): O armazenamento do dataset.
+            delta (pd.DataFrame): Os anúncios da atualização.
+            key (str): A chave da nova versão (ver `version_key`).
+            upsert (bool): Se True, um anúncio já existente (mesmo
+                identificador) é substituído; se False, é acrescentado de novo.
+
+        Returns:
+            ListingVersion: O estado da nova versão.
+        """
+        with measure('atualizacao_incremental', linhas=len(delta)):
+            # 1. Identificadores (repetidos dentro da atualização: vale o último)
+            ids = listing_ids(delta)
+            unicos = ~pd.Series(ids).duplicated(keep='last').to_numpy()
+            delta = delta[unicos].reset_index(drop=True)
+            ids = ids[unicos]
+
+            # 2. Os anúncios que já existem e passam a ser substituídos
+            antigas = np.array([
+                self.positions.get(identificador, -1) for identificador in ids.tolist()
+            ], dtype='int64') if upsert else np.full(len(ids), -1)
+            existentes = antigas >= 0
+
+            # 3. Armazenamento: só as linhas novas são gravadas
+            store.append(key, self.key, delta, antigas[existentes])
+
+            # 4. Resumo: sai a versão antiga dos anúncios, entram as linhas novas
+            resumo = copy.deepcopy(self.summary)
+            if existentes.any():
+                resumo.remove(store.take(self.key, antigas[existentes], STREAM_COLUMNS), ids=ids[existentes])
+            resumo.update(delta[[col for col in STREAM_COLUMNS if col in delta.columns]], ids=ids)
+
+            # 5. Identidades: uma camada nova com as posições das linhas novas
+            camada = dict(zip(ids.tolist(), range(self.total, self.total + len(delta))))
+            posicoes = self.positions.new_child(camada)
+            if len(posicoes.maps) > MAX_CAMADAS:
+                posicoes = ChainMap(dict(posicoes))
+        return ListingVersion(key, posicoes, self.total + len(delta), resumo)
+
+
+def dataset_version(dataset):
+    """O estado incremental de um dataset gravado, montado uma vez por dataset."""
+    if dataset.store is None:
+        raise ValueError("a atualização incremental precisa do armazenamento colunar (instale o pyarrow).")
+    return dataset.artifact('versao', lambda: ListingVersion.from_store(dataset.store, dataset.key))
+
+
+def maintained_summary(dataset):
+    """
+    O resumo mesclável mantido a cada atualização, se `dataset` for uma
+    versão atualizada: as análises que só precisam dos agregados (as
+    correlações, as somas por quartos e vagas, as contagens e os esboços
+    por bairro) saem dele, sem recalcular o dataset inteiro.
+
+    Returns:
+        StreamingSummary | None: O resumo, ou None para um arquivo sem
+        atualizações ou um recorte dos filtros.
+    """
+    if not isinstance(dataset, DatasetEntry) or dataset.store is None or not dataset.store.is_version(dataset.key):
+        return None
+    return dataset_version(dataset).summary
+
+
+def append_listings(dataset, delta, key, upsert=True):
+    """
+    Aplica uma atualização a um dataset gravado.
+
+    Args:
+        dataset (DatasetEntry): O dataset (ou a versão) de origem.
+        delta (pd.DataFrame): Os anúncios novos ou alterados.
+        key (str): A chave da nova versão (ver `version_key`).
+        upsert (bool): Substitui os anúncios já existentes (ver `ListingVersion.apply`).
+
+    Returns:
+        DatasetEntry: A nova versão, com o estado incremental já pronto (os
+        demais artefatos são calculados quando alguma análise os pedir).
+    """
+    versao = dataset_version(dataset).apply(dataset.store, delta, key, upsert)
+    entrada = DatasetEntry(key, store=dataset.store)
+    entrada.artifact('versao', lambda: versao)
+    return entrada
@@ -0,0 +1,193 @@
+# core/instrumentation.py
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Segundos sem renovar o pedido depois dos quais um dono do tracemalloc é
+# esquecido (uma aba fechada não avisa o app)
+VALIDADE_DONO = 300
+
+
+class StageRecorder:
+    """
+    Registro das etapas do caminho quente (leitura do CSV, agregados,
+    desenho, rasterização, exibição): tempo real, tempo de CPU, pico de
+    memória alocada e número de linhas de cada execução.
+
+    O pico de memória só é medido com o tracemalloc ativo (`enable_memory`),
+    que deixa o Python mais lento; os tempos são sempre medidos. O
+    tracemalloc conta as alocações do processo inteiro, então o pico de
+    etapas que rodam ao mesmo tempo em threads diferentes é aproximado.
+
+    As etapas aninhadas na mesma thread herdam o contexto da etapa de fora
+    (ex: a análise e o número de linhas), e `context()` define esse
+    contexto sem registrar uma etapa. O registro é do processo: com o
+    campo 'sessao' no contexto (ver `set_context`), cada sessão consulta,
+    exporta e apaga só os seus registros.
+    """
+
+    def __init__(self, max_records=2000, owner_ttl=VALIDADE_DONO):
+        self.records = deque(maxlen=max_records)
+        self.owner_ttl = owner_ttl
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._memoria = {}
+
+    @property
+    def memory_enabled(self):
+        return tracemalloc.is_tracing()
+
+    def enable_memory(self, ativo=True, owner=None):
+        """
+        Liga ou desliga o tracemalloc (a medição do pico de memória).
+
+        Com `owner` (ex: a sessão do app), os pedidos são contados por dono:
+        o tracemalloc fica ligado enquanto algum dono o quiser, e um dono
+        que não o pediu nunca o desliga no meio da medição de outro. Cada
+        chamada renova o pedido do dono; os que não o renovam por
+        `owner_ttl` segundos (ex: uma aba fechada) são esquecidos.
+        """
+        with self._lock:
+            if owner is None:
+                querem = ativo
+            else:
+                agora = time.monotonic()
+                if ativo:
+                    self._memoria[owner] = agora
+                else:
+                    self._memoria.pop(owner, None)
+                for dono, visto in list(self._memoria.items()):
+                    if agora - visto > self.owner_ttl:
+                        del self._memoria[dono]
+                querem = bool(self._memoria)
+            if querem and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            elif not querem and tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    def _pilha(self):
+        pilha = getattr(self._local, 'pilha', None)
+        if pilha is None:
+            pilha = self._local.pilha = []
+        return pilha
+
+    def _contexto(self):
+        pilha = self._pilha()
+        return dict(pilha[-1]['contexto']) if pilha else dict(getattr(self._local, 'base', {}))
+
+    def set_context(self, **contexto):
+        """
+        Define o contexto base da thread atual (ex: `sessao=...` no início
+        de cada execução do script), herdado por todas as etapas medidas
+        nela fora de um `context()`.
+        """
+        self._local.base = contexto
+
+    @contextmanager
+    def context(self, **contexto):
+        """Define o contexto (ex: `analise='002'`) das etapas medidas dentro do bloco."""
+        pilha = self._pilha()
+        pilha.append({'contexto': self._contexto() | contexto, 'pico': 0, 'medida': False})
+        try:
+            yield
+        finally:
+            pilha.pop()
+
+    @contextmanager
+    def measure(self, etapa, linhas=None, **contexto):
+        """
+        Mede o bloco como uma etapa. O registro é devolvido para o bloco
+        completar (ex: `registro['linhas'] = len(df)`) e só é guardado no
+        fim, mesmo que o bloco lance uma exceção.
+
+        Args:
+            etapa (str): O nome da etapa (ex: 'leitura_csv', 'render_png').
+            linhas (int, opcional): As linhas processadas na etapa.
+            **contexto: Campos extras do registro (ex: `analise='002'`).
+        """
+        pilha = self._pilha()
+        contexto = self._contexto() | contexto
+        if linhas is None:
+            linhas = contexto.pop('linhas', None)
+        else:
+            contexto.pop('linhas', None)
+        registro = {
+            'etapa': etapa,
+            **contexto,
+            'inicio': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'linhas': linhas,
+            'thread': threading.current_thread().name,
+        }
+
+        # O pico do tracemalloc é zerado no início de cada etapa; o da etapa
+        # de fora é guardado antes para não se perder
+        memoria = tracemalloc.is_tracing()
+        base = 0
+        if memoria:
+            atual, pico = tracemalloc.get_traced_memory()
+            for nivel in pilha:
+                nivel['pico'] = max(nivel['pico'], pico)
+            tracemalloc.reset_peak()
+            base = atual
+        nivel = {'contexto': contexto | {'linhas': linhas}, 'pico': 0, 'medida': True}
+        pilha.append(nivel)
+
+        inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield registro
+        except BaseException as erro:
+            registro['erro'] = type(erro).__name__
+            raise
+        finally:
+            registro['tempo_s'] = time.perf_counter() - inicio
+            registro['cpu_s'] = time.thread_time() - inicio_cpu
+            pilha.pop()
+            registro['pico_bytes'] = None
+            if memoria and tracemalloc.is_tracing():
+                pico = max(nivel['pico'], tracemalloc.get_traced_memory()[1])
+                registro['pico_bytes'] = max(pico - base, 0)
+                for externo in pilha:
+                    externo['pico'] = max(externo['pico'], pico)
+            with self._lock:
+                self.records.append(registro)
+
+    def snapshot(self, sessao=None):
+        """Cópia dos registros (só os da `sessao`, se informada), do mais antigo ao mais recente."""
+        with self._lock:
+            if sessao is None:
+                return list(self.records)
+            return [registro for registro in self.records if registro.get('sessao') == sessao]
+
+    def clear(self, sessao=None):
+        """Apaga os registros (só os da `sessao`, se informada)."""
+        with self._lock:
+            if sessao is None:
+                self.records.clear()
+                return
+            restantes = [registro for registro in self.records if registro.get('sessao') != sessao]
+            self.records.clear()
+            self.records.extend(restantes)
+
+    def to_jsonl(self, sessao=None):
+        """Os registros em JSON lines (um objeto por linha), para acompanhar regressões."""
+        return ''.join(
+            json.dumps(registro, ensure_ascii=False, default=str) + '\n' for registro in self.snapshot(sessao)
+        )
+
+
+# Registro do processo (as etapas medidas pelos módulos do core e pelo app)
+_REGISTRO = StageRecorder()
+
+
+def get_recorder():
+    """O registro de etapas do processo."""
+    return _REGISTRO
+
+
+def measure(etapa, linhas=None, **contexto):
+    """Mede uma etapa no registro do processo (ver `StageRecorder.measure`)."""
+    return _REGISTRO.measure(etapa, linhas, **contexto)
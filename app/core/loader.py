@@ -0,0 +1,154 @@
+# core/loader.py
+import numpy as np
+import pandas as pd
+
+from .instrumentation import measure
+
+# Esquema do dataset de anúncios (ver o "Dicionário de Dados" na Visão Geral).
+# - Textos repetidos (bairro, rua, CEP) viram 'category': cada valor é guardado
+#   uma vez e o groupby('neighborhood') trabalha sobre códigos inteiros.
+# - Contagens (quartos, vagas...) viram inteiros pequenos anuláveis.
+# - Áreas, taxas e coordenadas usam float32 (precisão de ~7 dígitos, suficiente).
+# - O preço continua float64 para não perder centavos em valores altos.
+CATEGORY_COLUMNS = ['neighborhood', 'street', 'zipCode']
+COUNT_COLUMNS = ['suites', 'bathrooms', 'bedrooms', 'parkingSpaces']
+FLOAT32_COLUMNS = ['usableAreas', 'totalAreas', 'lon', 'lat', 'yearlyIptu', 'monthlyCondoFee']
+FLOAT64_COLUMNS = ['price']
+TEXT_COLUMNS = ['amenities', 'description', 'title', 'poisList']
+
+SCHEMA = {
+    **{col: 'category' for col in CATEGORY_COLUMNS},
+    **{col: 'Int16' for col in COUNT_COLUMNS},
+    **{col: 'float32' for col in FLOAT32_COLUMNS},
+    **{col: 'float64' for col in FLOAT64_COLUMNS},
+    **{col: 'object' for col in TEXT_COLUMNS},
+}
+
+# Colunas numéricas do esquema (usadas pela matriz de correlação)
+NUMERIC_COLUMNS = [
+    'price', 'usableAreas', 'totalAreas', 'suites', 'bathrooms',
+    'bedrooms', 'parkingSpaces', 'yearlyIptu', 'monthlyCondoFee', 'lat', 'lon'
+]
+
+
+def _read_dtypes():
+    """Tipos usados durante a leitura do CSV (antes da compactação)."""
+    dtypes = {}
+    for col, dtype in SCHEMA.items():
+        if col in COUNT_COLUMNS:
+            # Lidas como float32 e convertidas depois, para aceitar '1.0'
+            # e detectar valores fora da faixa de um Int16
+            dtypes[col] = 'float32'
+        elif col in TEXT_COLUMNS:
+            continue
+        else:
+            dtypes[col] = dtype
+    return dtypes
+
+
+def _to_small_int(serie):
+    """Converte uma coluna de contagem para Int16 se todos os valores couberem."""
+    valores = serie.to_numpy(dtype='float64', na_value=np.nan)
+    finitos = valores[~np.isnan(valores)]
+    info = np.iinfo(np.int16)
+    if finitos.size and (
+            (finitos != np.round(finitos)).any() or
+            finitos.min() < info.min or finitos.max() > info.max
+    ):
+        return serie
+    return serie.astype('Int16')
+
+
+def apply_schema(df):
+    """
+    Aplica o esquema compacto a um DataFrame já carregado (ex: vindo de
+    outra fonte que não o CSV). Colunas fora do esquema são mantidas.
+
+    Args:
+        df (pd.DataFrame): O DataFrame original.
+
+    Returns:
+        pd.DataFrame: Um novo DataFrame com os tipos compactos.
+    """
+    colunas = {}
+    for col in df.columns:
+        serie = df[col]
+        if col in CATEGORY_COLUMNS:
+            if not isinstance(serie.dtype, pd.CategoricalDtype):
+                serie = serie.astype('str').where(serie.notna()).astype('category')
+        elif col in COUNT_COLUMNS:
+            serie = _to_small_int(pd.to_numeric(serie, errors='coerce').astype('float32'))
+        elif col in FLOAT32_COLUMNS:
+            serie = pd.to_numeric(serie, errors='coerce').astype('float32')
+        elif col in FLOAT64_COLUMNS:
+            serie = pd.to_numeric(serie, errors='coerce').astype('float64')
+        colunas[col] = serie
+    return pd.DataFrame(colunas, index=df.index)
+
+
+def read_listings(source, columns=None, **kwargs):
+    """
+    Lê o CSV de anúncios com o esquema compacto e, opcionalmente, apenas
+    as colunas pedidas (projeção com `usecols`).
+
+    Args:
+        source (str | file-like): Caminho ou buffer do arquivo CSV.
+        columns (list, opcional): Colunas a carregar. Colunas ausentes no
+            arquivo são ignoradas (cada análise valida as suas).
+        **kwargs: Repassados para `pd.read_csv` (ex: `nrows`).
+
+    Returns:
+        pd.DataFrame: O dataset com tipos compactos.
+    """
+    usecols = None
+    if columns is not None:
+        wanted = set(columns)
+        usecols = lambda col: col in wanted  # noqa: E731
+
+    with measure('leitura_csv') as registro:
+        df = _read_csv(source, usecols, **kwargs)
+        registro['linhas'] = len(df)
+    return df
+
+
+def _read_csv(source, usecols, **kwargs):
+    """Leitura com o esquema compacto (ver `read_listings`)."""
+    dtypes = _read_dtypes()
+    try:
+        df = pd.read_csv(source, usecols=usecols, dtype=dtypes, **kwargs)
+    except (ValueError, TypeError):
+        # Alguma coluna numérica tem valores não numéricos: lê sem tipos
+        # e converte coluna a coluna (valores inválidos viram NaN)
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        df = pd.read_csv(source, usecols=usecols, **kwargs)
+        return apply_schema(df)
+
+    for col in COUNT_COLUMNS:
+        if col in df.columns:
+            df[col] = _to_small_int(df[col])
+    return df
+
+
+def iter_listings(source, columns=None, chunksize=100_000):
+    """
+    Lê o CSV de anúncios em blocos de `chunksize` linhas, cada um já com o
+    esquema compacto. A memória usada fica limitada ao tamanho do bloco.
+
+    Args:
+        source (str | file-like): Caminho ou buffer do arquivo CSV.
+        columns (list, opcional): Colunas a carregar.
+        chunksize (int): Número de linhas por bloco.
+
+    Yields:
+        pd.DataFrame: Cada bloco do dataset.
+    """
+    usecols = None
+    if columns is not None:
+        wanted = set(columns)
+        usecols = lambda col: col in wanted  # noqa: E731
+
+    # Os blocos são lidos sem tipos fixos (um bloco com lixo numa coluna não
+    # interrompe a leitura) e convertidos para o esquema um a um
+    for bloco in pd.read_csv(source, usecols=usecols, chunksize=chunksize):
+        yield apply_schema(bloco)
@@ -0,0 +1,137 @@
+# core/quantiles.py
+import math
+
+import numpy as np
+import pandas as pd
+
+from .features import AREA_MINIMA, PRECO_MINIMO
+from .loader import NUMERIC_COLUMNS
+from .sketches import KLLSketch
+
+# Colunas do dataset lidas para montar os esboços
+QUANTILE_COLUMNS = NUMERIC_COLUMNS + ['neighborhood']
+
+# Medidas com um esboço por bairro (o preço/m² é derivado, como em core.features)
+MEDIDAS_BAIRRO = ['price', 'price_per_m2']
+
+# Erro de rank padrão dos esboços (1%)
+ERRO_PADRAO = 0.01
+
+
+class QuantileSketches:
+    """
+    Esboços de quantis (KLL, core.sketches) de cada coluna numérica e, por
+    bairro, do preço e do preço/m², montados numa única passada pelo
+    dataset. Depois disso, cada quantil ou mediana pedido por uma análise
+    (cortes de outliers, faixas de preço, medianas por bairro) sai dos
+    esboços em O(k log n), sem ordenar a coluna de novo.
+
+    Os esboços são mescláveis: o quantil de um conjunto de bairros (ex: o
+    filtro da Análise 8) sai da combinação dos esboços desses bairros.
+
+    Attributes:
+        k (int): O parâmetro de precisão dos esboços.
+        columns (dict): Coluna -> esboço (inclui 'price_per_m2').
+        by_neighborhood (dict): Medida -> {bairro: esboço}.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.columns = {}
+        self.by_neighborhood = {medida: {} for medida in MEDIDAS_BAIRRO}
+
+    @property
+    def epsilon(self):
+        """Erro de rank esperado de cada quantil (ex: 0.01 = 1% das linhas)."""
+        return KLLSketch(self.k).epsilon
+
+    @property
+    def nbytes(self):
+        esbocos = [*self.columns.values(), *(
+            sketch for bairros in self.by_neighborhood.values() for sketch in bairros.values()
+        )]
+        return sum(sketch.nbytes for sketch in esbocos)
+
+    def sketch(self, coluna, bairros=None):
+        """
+        O esboço da coluna, ou a combinação dos esboços dos `bairros` (só
+        para as medidas de MEDIDAS_BAIRRO).
+        """
+        if bairros is None:
+            if coluna not in self.columns:
+                raise ValueError(f"Coluna sem esboço de quantis: {coluna}")
+            return self.columns[coluna]
+        combinado = KLLSketch(self.k, seed=0)
+        for bairro in bairros:
+            if bairro in self.by_neighborhood[coluna]:
+                combinado.merge(self.by_neighborhood[coluna][bairro])
+        return combinado
+
+    def quantile(self, coluna, q, bairros=None, low=-math.inf, high=math.inf):
+        """
+        Quantil(is) aproximado(s) da coluna, opcionalmente só dos valores
+        em [low, high) e só dos `bairros` pedidos.
+        """
+        sketch = self.sketch(coluna, bairros)
+        if low == -math.inf and high == math.inf:
+            return sketch.quantile(q)
+        return sketch.quantile_between(q, low, high)
+
+    def medians(self, colunas):
+        """Medianas aproximadas das colunas (as sem esboço ficam de fora)."""
+        return pd.Series({
+            col: self.columns[col].quantile(0.5) for col in colunas if col in self.columns
+        }, dtype='float64')
+
+
+def build_quantile_sketches(df, epsilon=ERRO_PADRAO, seed=0):
+    """
+    Monta os esboços de quantis de um dataset numa única passada.
+
+    Args:
+        df (pd.DataFrame): O dataset, com as colunas de QUANTILE_COLUMNS
+            (as ausentes são ignoradas).
+        epsilon (float): O erro de rank aceito (ex: 0.01 para 1%).
+        seed (int): Semente das compactações (resultados reprodutíveis).
+
+    Returns:
+        QuantileSketches: Os esboços.
+    """
+    k = KLLSketch.k_for_error(epsilon)
+    esbocos = QuantileSketches(k)
+    rng = np.random.default_rng(seed)
+
+    def novo():
+        return KLLSketch(k, seed=int(rng.integers(2 ** 31)))
+
+    # 1. Um esboço por coluna numérica
+    valores = {
+        col: df[col].to_numpy(dtype='float64', na_value=np.nan)
+        for col in NUMERIC_COLUMNS if col in df.columns
+    }
+    for col, coluna in valores.items():
+        esbocos.columns[col] = novo().update(coluna)
+
+    # 2. Preço/m² com as mesmas regras de core.features
+    if 'price' in valores and 'usableAreas' in valores:
+        price, area = valores['price'], valores['usableAreas']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            valores['price_per_m2'] = np.where((price > PRECO_MINIMO) & (area > AREA_MINIMA), price / area, np.nan)
+        esbocos.columns['price_per_m2'] = novo().update(valores['price_per_m2'])
+    if 'price' in valores:
+        valores['price'] = np.where(valores['price'] > 0, valores['price'], np.nan)
+
+    # 3. Esboços por bairro: as linhas são ordenadas pelo bairro uma vez e
+    # cada bairro vira uma fatia contígua
+    if 'neighborhood' in df.columns:
+        codigos, bairros = pd.factorize(df['neighborhood'], sort=False)
+        ordem = np.argsort(codigos, kind='stable')
+        inicios = np.searchsorted(codigos[ordem], np.arange(len(bairros) + 1))
+        for medida in MEDIDAS_BAIRRO:
+            if medida not in valores:
+                continue
+            ordenados = valores[medida][ordem]
+            for codigo, bairro in enumerate(bairros):
+                fatia = ordenados[inicios[codigo]:inicios[codigo + 1]]
+                esbocos.by_neighborhood[medida][str(bairro)] = novo().update(fatia)
+    return esbocos
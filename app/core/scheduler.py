@@ -0,0 +1,154 @@
+# core/scheduler.py
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Prioridades usadas pelo app (menor = executa antes)
+PRIORIDADE_SELECIONADA = 0
+PRIORIDADE_FUNDO = 10
+
+
+class _Job:
+    def __init__(self, key, fn, priority, owner, generation):
+        self.key = key
+        self.fn = fn
+        self.priority = priority
+        self.owner = owner
+        self.generation = generation
+        self.future = Future()
+        self.started = False
+
+
+class BackgroundScheduler:
+    """
+    Fila de prioridade executada por threads em segundo plano.
+
+    Cada tarefa tem uma chave única (ex: a chave do gráfico no cache): pedir
+    a mesma chave de novo devolve o mesmo `Future` e pode apenas aumentar a
+    prioridade dela. As tarefas pertencem a um dono (a sessão do Streamlit)
+    e a uma geração (o arquivo enviado); ao trocar de arquivo, as tarefas
+    pendentes da geração antiga são canceladas.
+
+    Threads (e não processos) porque as tarefas leem os datasets e
+    artefatos já em memória no processo do app; o pandas/numpy liberam o
+    GIL na maior parte do trabalho pesado.
+
+    Uma tarefa concluída solta a sua função (que prende o dataset) e só as
+    `max_done` concluídas mais recentes são lembradas, então as sessões
+    encerradas não deixam datasets presos ao agendador.
+    """
+
+    def __init__(self, workers=2, max_done=256):
+        self.max_done = max_done
+        self._fila = []
+        self._jobs = {}
+        self._concluidas = OrderedDict()
+        self._ordem = itertools.count()
+        self._lock = threading.Lock()
+        self._disponivel = threading.Condition(self._lock)
+        self._threads = [
+            threading.Thread(target=self._executa, name=f'scheduler-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key, fn, priority=PRIORIDADE_FUNDO, owner=None, generation=None):
+        """
+        Agenda `fn()` (se a chave ainda não estiver agendada ou concluída).
+
+        Args:
+            key: Chave única da tarefa.
+            fn (callable): A função a executar, sem argumentos.
+            priority (int): Prioridade (menor executa antes).
+            owner: Dono da tarefa (ex: o id da sessão).
+            generation: Geração da tarefa (ex: o hash do arquivo).
+
+        Returns:
+            concurrent.futures.Future: O resultado de `fn()`.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.future.cancelled():
+                if not job.started and priority < job.priority:
+                    # Reinsere com a nova prioridade; a entrada antiga é ignorada
+                    job.priority = priority
+                    heapq.heappush(self._fila, (priority, next(self._ordem), job))
+                    self._disponivel.notify()
+                return job.future
+
+            job = _Job(key, fn, priority, owner, generation)
+            self._jobs[key] = job
+            heapq.heappush(self._fila, (priority, next(self._ordem), job))
+            self._disponivel.notify()
+            return job.future
+
+    def cancel_stale(self, owner, generation):
+        """
+        Cancela as tarefas pendentes de `owner` que não são da `generation`
+        atual e esquece as já concluídas (as que estão em execução terminam
+        normalmente).
+
+        Returns:
+            int: O número de tarefas canceladas.
+        """
+        canceladas = 0
+        with self._lock:
+            for key, job in list(self._jobs.items()):
+                if job.owner != owner or job.generation == generation:
+                    continue
+                if not job.started:
+                    job.future.cancel()
+                    canceladas += 1
+                if not job.started or job.future.done():
+                    del self._jobs[key]
+                    self._concluidas.pop(key, None)
+        return canceladas
+
+    def progress(self, keys):
+        """Retorna (concluídas, total) entre as tarefas com as chaves pedidas."""
+        with self._lock:
+            futuros = [self._jobs[key].future for key in keys if key in self._jobs]
+        return sum(futuro.done() for futuro in futuros), len(futuros)
+
+    def _proximo(self):
+        # Próxima tarefa não iniciada e não cancelada (aguarda se não houver)
+        with self._lock:
+            while True:
+                while not self._fila:
+                    self._disponivel.wait()
+                _, _, job = heapq.heappop(self._fila)
+                if job.started or job.future.cancelled():
+                    continue
+                job.started = True
+                return job
+
+    def _executa(self):
+        while True:
+            job = self._proximo()
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                resultado = job.fn()
+            except BaseException as erro:
+                job.fn = None
+                job.future.set_exception(erro)
+            else:
+                job.fn = None
+                job.future.set_result(resultado)
+            self._conclui(job)
+
+    def _conclui(self, job):
+        # Lembra a tarefa entre as concluídas e esquece as mais antigas
+        with self._lock:
+            if self._jobs.get(job.key) is not job:
+                return
+            self._concluidas[job.key] = None
+            self._concluidas.move_to_end(job.key)
+            while len(self._concluidas) > self.max_done:
+                chave, _ = self._concluidas.popitem(last=False)
+                antiga = self._jobs.get(chave)
+                if antiga is not None and antiga.future.done():
+                    del self._jobs[chave]
@@ -0,0 +1,264 @@
+# core/sketches.py
+import math
+
+import numpy as np
+
+
+class RunningMoments:
+    """
+    Contagem, média e variância calculadas de forma incremental (Welford),
+    para uma ou mais colunas. Dois acumuladores podem ser combinados com
+    `merge` (fórmula de Chan), o que permite processar o arquivo em blocos,
+    e valores já somados podem ser retirados com `remove`.
+    """
+
+    def __init__(self, size=1):
+        self.n = np.zeros(size)
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+
+    def update(self, values):
+        """Acrescenta um bloco de valores (vetor ou matriz linhas x colunas)."""
+        return self.merge(self._bloco(values))
+
+    def remove(self, values):
+        """
+        Retira um bloco de valores somados antes (ex: a versão antiga de
+        anúncios atualizados), invertendo a fórmula de Chan.
+        """
+        bloco = self._bloco(values)
+        n = self.n - bloco.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = np.where(n > 0, (self.n * self.mean - bloco.n * bloco.mean) / n, 0)
+            ajuste = np.where(self.n > 0, (bloco.mean - media) ** 2 * n * bloco.n / self.n, 0)
+        self.m2 = np.where(n > 0, np.maximum(self.m2 - bloco.m2 - ajuste, 0), 0)
+        self.mean = media
+        self.n = n
+        return self
+
+    @staticmethod
+    def _bloco(values):
+        # Contagem, média e soma dos quadrados dos desvios de um bloco
+        values = np.asarray(values, dtype='float64')
+        if values.ndim == 1:
+            values = values[:, None]
+        validos = ~np.isnan(values)
+        n = validos.sum(axis=0).astype('float64')
+        soma = np.where(validos, values, 0).sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = np.where(n > 0, soma / n, 0)
+        desvios = np.where(validos, values - media, 0)
+        bloco = RunningMoments(values.shape[1])
+        bloco.n, bloco.mean, bloco.m2 = n, media, (desvios ** 2).sum(axis=0)
+        return bloco
+
+    def merge(self, other):
+        """Combina outro acumulador a este (mesmas colunas)."""
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            peso = np.where(n > 0, other.n / n, 0)
+        self.mean = self.mean + delta * peso
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.n * peso
+        self.n = n
+        return self
+
+    @property
+    def variance(self):
+        """Variância amostral (ddof=1, como no pandas)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > 1, self.m2 / (self.n - 1), np.nan)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+class KLLSketch:
+    """
+    Esboço (sketch) de quantis KLL: guarda uma amostra compactada de
+    tamanho O(k log n) e responde quantis e ranks aproximados, com erro
+    de rank de aproximadamente `epsilon` (cerca de 1,65% para k=200).
+
+    É mesclável: esboços de blocos (ou de bairros) diferentes podem ser
+    combinados com `merge`, sem voltar aos dados originais.
+
+    Valores podem ser retirados com `remove` (ex: anúncios atualizados):
+    eles vão para um segundo esboço, com peso negativo nas consultas. O
+    erro de rank passa a ser relativo ao total de valores inseridos mais
+    os retirados, e `min`/`max` continuam sendo os de tudo o que entrou.
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._niveis = [np.empty(0)]
+        self._removidos = None
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def epsilon(self):
+        """Erro de rank normalizado esperado (aproximação empírica do KLL)."""
+        return 2.296 / self.k ** 0.9444
+
+    @staticmethod
+    def k_for_error(epsilon):
+        """O menor `k` com erro de rank esperado de até `epsilon` (ex: 0.01 para 1%)."""
+        return max(int(math.ceil((2.296 / epsilon) ** (1 / 0.9444))), 8)
+
+    @property
+    def nbytes(self):
+        removidos = self._removidos.nbytes if self._removidos is not None else 0
+        return sum(nivel.nbytes for nivel in self._niveis) + removidos
+
+    def _capacidade(self, nivel):
+        profundidade = len(self._niveis) - nivel - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** profundidade)), 2)
+
+    def update(self, values):
+        """Acrescenta um bloco de valores (NaN são ignorados)."""
+        values = np.asarray(values, dtype='float64').ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.n += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._niveis[0] = np.concatenate([self._niveis[0], values])
+        self._compactar()
+        return self
+
+    def remove(self, values):
+        """Retira um bloco de valores acrescentados antes (NaN são ignorados)."""
+        values = np.asarray(values, dtype='float64').ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        if self._removidos is None:
+            self._removidos = KLLSketch(self.k, seed=int(self._rng.integers(2 ** 31)))
+        self._removidos.update(values)
+        self.n -= values.size
+        return self
+
+    def merge(self, other):
+        """Combina outro esboço a este."""
+        if other._removidos is not None:
+            if self._removidos is None:
+                self._removidos = KLLSketch(self.k, seed=int(self._rng.integers(2 ** 31)))
+            self._removidos.merge(other._removidos)
+        if other.n == 0 and not any(itens.size for itens in other._niveis):
+            return self
+        while len(self._niveis) < len(other._niveis):
+            self._niveis.append(np.empty(0))
+        for nivel, itens in enumerate(other._niveis):
+            self._niveis[nivel] = np.concatenate([self._niveis[nivel], itens])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compactar()
+        return self
+
+    def _compactar(self):
+        # Cada nível acima da capacidade é ordenado e metade dos itens (par
+        # ou ímpar, ao acaso) sobe para o nível seguinte com peso dobrado
+        nivel = 0
+        while nivel < len(self._niveis):
+            itens = self._niveis[nivel]
+            if itens.size >= self._capacidade(nivel):
+                if nivel + 1 == len(self._niveis):
+                    self._niveis.append(np.empty(0))
+                itens = np.sort(itens)
+                sobra = itens[:1] if itens.size % 2 else itens[:0]
+                itens = itens[sobra.size:]
+                promovidos = itens[self._rng.integers(2)::2]
+                self._niveis[nivel] = sobra
+                self._niveis[nivel + 1] = np.concatenate([self._niveis[nivel + 1], promovidos])
+                # As capacidades mudam quando um nível novo é criado
+                nivel = 0
+                continue
+            nivel += 1
+
+    def _itens(self):
+        # Itens guardados e seus pesos (2^nível); os retirados com peso negativo
+        valores = np.concatenate(self._niveis)
+        pesos = np.concatenate([
+            np.full(itens.size, 2.0 ** nivel) for nivel, itens in enumerate(self._niveis)
+        ])
+        if self._removidos is not None and self._removidos.n:
+            removidos, pesos_removidos = self._removidos._itens()
+            valores = np.concatenate([valores, removidos])
+            pesos = np.concatenate([pesos, -pesos_removidos])
+        return valores, pesos
+
+    def _ordenados(self):
+        valores, pesos = self._itens()
+        ordem = np.argsort(valores, kind='stable')
+        # Com valores retirados, o acumulado pode oscilar: fica o máximo até cada ponto
+        acumulado = np.maximum.accumulate(np.cumsum(pesos[ordem]))
+        return valores[ordem], np.maximum(acumulado, 0)
+
+    def quantile(self, q):
+        """
+        Quantil(is) aproximado(s).
+
+        Args:
+            q (float | array): Probabilidade(s) entre 0 e 1.
+
+        Returns:
+            float | np.ndarray: O(s) valor(es) correspondente(s) (NaN se vazio).
+        """
+        escalar = np.ndim(q) == 0
+        q = np.atleast_1d(np.asarray(q, dtype='float64'))
+        if self.n == 0:
+            resultado = np.full(q.shape, np.nan)
+        else:
+            valores, acumulado = self._ordenados()
+            alvo = q * acumulado[-1]
+            posicoes = np.searchsorted(acumulado, alvo, side='left')
+            resultado = valores[np.clip(posicoes, 0, valores.size - 1)]
+            resultado = np.where(q <= 0, self.min, np.where(q >= 1, self.max, resultado))
+        return float(resultado[0]) if escalar else resultado
+
+    def rank(self, x):
+        """Fração aproximada dos valores menores ou iguais a `x`."""
+        escalar = np.ndim(x) == 0
+        x = np.atleast_1d(np.asarray(x, dtype='float64'))
+        if self.n == 0:
+            resultado = np.full(x.shape, np.nan)
+        else:
+            valores, acumulado = self._ordenados()
+            posicoes = np.searchsorted(valores, x, side='right')
+            resultado = np.where(posicoes > 0, acumulado[np.maximum(posicoes - 1, 0)], 0) / acumulado[-1]
+        return float(resultado[0]) if escalar else resultado
+
+    def quantile_between(self, q, low=-math.inf, high=math.inf):
+        """
+        Quantil `q` apenas dos valores em [low, high) (ex: após remover
+        outliers), usando os ranks dos limites.
+        """
+        rank_low, rank_high = self._ranks_intervalo(low, high)
+        q = np.asarray(q, dtype='float64')
+        return self.quantile(rank_low + q * (rank_high - rank_low))
+
+    def count_between(self, low=-math.inf, high=math.inf):
+        """Número aproximado de valores em [low, high)."""
+        rank_low, rank_high = self._ranks_intervalo(low, high)
+        return (rank_high - rank_low) * self.n
+
+    def mean_between(self, low=-math.inf, high=math.inf):
+        """Média aproximada dos valores em [low, high), pelos itens do esboço."""
+        if self.n == 0:
+            return math.nan
+        valores, pesos = self._itens()
+        dentro = (valores >= low) & (valores < high)
+        if not dentro.any():
+            return math.nan
+        return float(np.average(valores[dentro], weights=pesos[dentro]))
+
+    def _ranks_intervalo(self, low, high):
+        # Frações de valores < low e < high
+        rank_low = self.rank(np.nextafter(low, -math.inf)) if low > -math.inf else 0.0
+        rank_high = self.rank(np.nextafter(high, -math.inf)) if high < math.inf else 1.0
+        return rank_low, rank_high
@@ -0,0 +1,269 @@
+# core/spatial.py
+import math
+import os
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from .cache import LRUCache
+from .geometry import load_geometry
+
+# Metros por grau de latitude (aproximação esférica, suficiente na escala de uma cidade)
+METROS_POR_GRAU = 111_320.0
+
+# Índices dos polígonos já montados, por arquivo (compartilhados entre sessões)
+_INDICES = LRUCache(max_entries=4)
+
+
+def normaliza_nome(nome):
+    """Nome de bairro sem acentos, em minúsculas e sem espaços extras."""
+    texto = unicodedata.normalize('NFKD', str(nome))
+    texto = ''.join(letra for letra in texto if not unicodedata.combining(letra))
+    return ' '.join(texto.lower().split())
+
+
+class PolygonIndex:
+    """
+    Índice em grade sobre os polígonos dos bairros, para descobrir em qual
+    bairro cai cada coordenada.
+
+    Cada célula da grade guarda os bairros cujo retângulo envolvente a
+    toca; células inteiramente dentro de um único bairro (nenhuma aresta
+    passa por elas) são resolvidas sem teste algum. Nas demais, o teste do
+    raio (par/ímpar) é feito de forma vetorizada, só contra os candidatos.
+    """
+
+    def __init__(self, geometry, cell_size=0.005):
+        self.names = list(geometry.names)
+        self.cell_size = cell_size
+
+        # 1. Arestas de cada bairro (todos os anéis: buracos e partes de
+        # multipolígonos funcionam pela regra par/ímpar)
+        self._arestas = []
+        caixas = []
+        for poligonos in geometry.polygons:
+            aneis = [anel for poligono in poligonos for anel in poligono]
+            inicio = np.vstack([anel[:-1] for anel in aneis])
+            fim = np.vstack([anel[1:] for anel in aneis])
+            self._arestas.append((inicio[:, 0], inicio[:, 1], fim[:, 0], fim[:, 1]))
+            pontos = np.vstack(aneis)
+            caixas.append((*pontos.min(axis=0), *pontos.max(axis=0)))
+        caixas = np.array(caixas)
+
+        # 2. Grade sobre todos os bairros
+        self.x0, self.y0 = caixas[:, 0].min(), caixas[:, 1].min()
+        self.nx = int(math.ceil((caixas[:, 2].max() - self.x0) / cell_size)) + 1
+        self.ny = int(math.ceil((caixas[:, 3].max() - self.y0) / cell_size)) + 1
+
+        # 3. Candidatos de cada célula e células internas a um único bairro
+        self._candidatos = {}
+        self._interna = {}
+        for bairro, (xmin, ymin, xmax, ymax) in enumerate(caixas):
+            ix0, iy0 = self._celula(xmin, ymin)
+            ix1, iy1 = self._celula(xmax, ymax)
+            for iy in range(iy0, iy1 + 1):
+                for ix in range(ix0, ix1 + 1):
+                    self._candidatos.setdefault(iy * self.nx + ix, []).append(bairro)
+
+        for celula, candidatos in self._candidatos.items():
+            iy, ix = divmod(celula, self.nx)
+            cx0, cy0 = self.x0 + ix * cell_size, self.y0 + iy * cell_size
+            cx1, cy1 = cx0 + cell_size, cy0 + cell_size
+            tocados = [
+                bairro for bairro in candidatos
+                if self._arestas_na_celula(bairro, cx0, cy0, cx1, cy1)
+            ]
+            if tocados:
+                continue
+            # Nenhuma aresta cruza a célula: ela está inteira dentro de um
+            # bairro (o que contém o centro) ou fora de todos
+            centro = np.array([(cx0 + cx1) / 2]), np.array([(cy0 + cy1) / 2])
+            dentro = [bairro for bairro in candidatos if self._contem(bairro, *centro)[0]]
+            self._interna[celula] = dentro[0] if dentro else -1
+
+    def _celula(self, x, y):
+        return int((x - self.x0) // self.cell_size), int((y - self.y0) // self.cell_size)
+
+    def _arestas_na_celula(self, bairro, cx0, cy0, cx1, cy1):
+        # Teste conservador: o retângulo de alguma aresta toca a célula
+        x1, y1, x2, y2 = self._arestas[bairro]
+        return bool(np.any(
+            (np.minimum(x1, x2) <= cx1) & (np.maximum(x1, x2) >= cx0) &
+            (np.minimum(y1, y2) <= cy1) & (np.maximum(y1, y2) >= cy0)
+        ))
+
+    def _contem(self, bairro, px, py):
+        # Teste do raio (par/ímpar), pontos x arestas de uma vez
+        x1, y1, x2, y2 = self._arestas[bairro]
+        px, py = px[:, None], py[:, None]
+        cruza = (y1 > py) != (y2 > py)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_corte = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        return np.count_nonzero(cruza & (px < x_corte), axis=1) % 2 == 1
+
+    def locate(self, lon, lat):
+        """
+        Bairro de cada coordenada.
+
+        Args:
+            lon, lat (array): As coordenadas (NaN = sem localização).
+
+        Returns:
+            np.ndarray: A posição do bairro em `names` (-1 fora de todos).
+        """
+        lon = np.asarray(lon, dtype='float64')
+        lat = np.asarray(lat, dtype='float64')
+        resultado = np.full(lon.shape, -1, dtype='int32')
+
+        ix = np.floor((lon - self.x0) / self.cell_size)
+        iy = np.floor((lat - self.y0) / self.cell_size)
+        na_grade = (ix >= 0) & (ix < self.nx) & (iy >= 0) & (iy < self.ny)
+        posicoes = np.flatnonzero(na_grade)
+        celulas = (iy[posicoes] * self.nx + ix[posicoes]).astype('int64')
+
+        # Pontos agrupados por célula
+        ordem = np.argsort(celulas, kind='stable')
+        posicoes, celulas = posicoes[ordem], celulas[ordem]
+        unicas, inicios = np.unique(celulas, return_index=True)
+        fins = np.append(inicios[1:], len(celulas))
+
+        for celula, inicio, fim in zip(unicas.tolist(), inicios, fins):
+            if celula in self._interna:
+                resultado[posicoes[inicio:fim]] = self._interna[celula]
+                continue
+            pendentes = posicoes[inicio:fim]
+            for bairro in self._candidatos.get(celula, []):
+                dentro = self._contem(bairro, lon[pendentes], lat[pendentes])
+                resultado[pendentes[dentro]] = bairro
+                pendentes = pendentes[~dentro]
+                if pendentes.size == 0:
+                    break
+        return resultado
+
+
+def load_polygon_index(geojson_path, name_property='NOME'):
+    """
+    Monta o índice dos polígonos do GeoJSON uma única vez (enquanto o
+    arquivo não mudar).
+
+    Returns:
+        PolygonIndex: O índice dos bairros do arquivo.
+    """
+    geometria = load_geometry(geojson_path, name_property)
+    chave = (os.path.realpath(geojson_path), os.stat(geojson_path).st_mtime_ns, name_property)
+
+    indice = _INDICES.get(chave)
+    if indice is None:
+        indice = PolygonIndex(geometria)
+        _INDICES.put(chave, indice)
+    return indice
+
+
+def assign_neighborhoods(df, polygon_index):
+    """
+    Bairro do mapa (propriedade NOME do GeoJSON) de cada anúncio: pelas
+    coordenadas quando existem e caem em um polígono; senão, pelo texto de
+    'neighborhood' comparado sem acentos e sem diferenciar maiúsculas.
+
+    Args:
+        df (pd.DataFrame): O dataset, com 'lat', 'lon' e/ou 'neighborhood'.
+        polygon_index (PolygonIndex): O índice dos polígonos.
+
+    Returns:
+        pd.Series: Categórica, alinhada ao índice de `df` (NaN sem bairro).
+    """
+    nomes = np.array(polygon_index.names, dtype=object)
+    codigos = np.full(len(df), -1, dtype='int32')
+
+    if 'lat' in df.columns and 'lon' in df.columns:
+        codigos = polygon_index.locate(
+            df['lon'].to_numpy(dtype='float64', na_value=np.nan),
+            df['lat'].to_numpy(dtype='float64', na_value=np.nan),
+        )
+
+    if 'neighborhood' in df.columns:
+        por_nome = {normaliza_nome(nome): posicao for posicao, nome in enumerate(nomes)}
+        # A normalização é feita uma vez por bairro distinto, não por linha
+        textos = df['neighborhood'].astype('category')
+        mapa = np.array(
+            [por_nome.get(normaliza_nome(nome), -1) for nome in textos.cat.categories] + [-1], dtype='int32'
+        )
+        pelo_nome = mapa[textos.cat.codes.to_numpy()]
+        codigos = np.where(codigos >= 0, codigos, pelo_nome)
+
+    return pd.Series(
+        pd.Categorical.from_codes(codigos, categories=nomes), index=df.index, name='neighborhood'
+    )
+
+
+class PointIndex:
+    """
+    Índice em grade sobre as coordenadas dos anúncios, para consultas do
+    tipo "anúncios a até R metros de um ponto".
+
+    As posições são ordenadas por célula (linha a linha da grade), então os
+    candidatos de cada linha de células formam um único intervalo contínuo.
+    Só as células ocupadas são guardadas (código da célula e início do seu
+    intervalo, como em core.grid): uma coordenada isolada longe da cidade,
+    como (0, 0), não faz o índice crescer com a área do retângulo envolvente.
+    """
+
+    def __init__(self, lon, lat, cell_m=250.0):
+        lon = np.asarray(lon, dtype='float64')
+        lat = np.asarray(lat, dtype='float64')
+        validos = np.flatnonzero(np.isfinite(lon) & np.isfinite(lat))
+
+        # Mediana: uma coordenada isolada não desloca a latitude de referência
+        self.lat_ref = float(np.median(lat[validos])) if validos.size else 0.0
+        self.cell_lat = cell_m / METROS_POR_GRAU
+        self.cell_lon = cell_m / (METROS_POR_GRAU * math.cos(math.radians(self.lat_ref)))
+        self.x0 = float(lon[validos].min()) if validos.size else 0.0
+        self.y0 = float(lat[validos].min()) if validos.size else 0.0
+        ix = ((lon[validos] - self.x0) // self.cell_lon).astype('int64')
+        iy = ((lat[validos] - self.y0) // self.cell_lat).astype('int64')
+        self.nx = int(ix.max()) + 1 if validos.size else 1
+        self.ny = int(iy.max()) + 1 if validos.size else 1
+
+        celulas = iy * self.nx + ix
+        ordem = np.argsort(celulas, kind='stable')
+        self.positions = validos[ordem]
+        self.lon = lon[self.positions]
+        self.lat = lat[self.positions]
+        # Células ocupadas (em ordem) e o início do intervalo de cada uma
+        self.cells, inicios = np.unique(celulas[ordem], return_index=True)
+        self.starts = np.append(inicios, len(ordem))
+
+    @property
+    def nbytes(self):
+        return int(self.positions.nbytes + self.lon.nbytes + self.lat.nbytes + self.cells.nbytes + self.starts.nbytes)
+
+    def within(self, lon, lat, raio_m):
+        """
+        Anúncios a até `raio_m` metros do ponto (lon, lat).
+
+        Returns:
+            np.ndarray: As posições (linhas do dataset), em ordem crescente.
+        """
+        dlat = raio_m / METROS_POR_GRAU
+        dlon = raio_m / (METROS_POR_GRAU * math.cos(math.radians(lat)))
+        ix0 = max(int((lon - dlon - self.x0) // self.cell_lon), 0)
+        ix1 = min(int((lon + dlon - self.x0) // self.cell_lon), self.nx - 1)
+        iy0 = max(int((lat - dlat - self.y0) // self.cell_lat), 0)
+        iy1 = min(int((lat + dlat - self.y0) // self.cell_lat), self.ny - 1)
+        if ix0 > ix1 or iy0 > iy1:
+            return np.empty(0, dtype=self.positions.dtype)
+
+        # Um intervalo contínuo por linha de células: das células ocupadas
+        # entre ix0 e ix1 da linha (busca binária nos códigos das células)
+        primeiras = np.arange(iy0, iy1 + 1) * self.nx + ix0
+        de = self.starts[np.searchsorted(self.cells, primeiras, side='left')]
+        ate = self.starts[np.searchsorted(self.cells, primeiras + (ix1 - ix0), side='right')]
+        fatias = [np.arange(inicio, fim) for inicio, fim in zip(de, ate)]
+        candidatos = np.concatenate(fatias)
+
+        # Distância equiretangular (erro desprezível para alguns km)
+        dx = (self.lon[candidatos] - lon) * METROS_POR_GRAU * math.cos(math.radians(lat))
+        dy = (self.lat[candidatos] - lat) * METROS_POR_GRAU
+        dentro = candidatos[dx * dx + dy * dy <= raio_m * raio_m]
+        return np.sort(self.positions[dentro])
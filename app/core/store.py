@@ -0,0 +1,253 @@
+# core/store.py
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from .instrumentation import measure
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow é opcional: sem ele o dataset fica só em memória
+    pa = feather = None
+
+
+def default_store_dir():
+    """Pasta do armazenamento colunar (pode ser trocada com DATASET_STORE_DIR)."""
+    return os.environ.get(
+        'DATASET_STORE_DIR',
+        os.path.join(tempfile.gettempdir(), 'curitiba_dataset_store')
+    )
+
+
+class ColumnarStore:
+    """
+    Armazenamento em disco dos datasets enviados, no formato Arrow IPC
+    (Feather v2, sem compressão), com um arquivo por hash de conteúdo.
+
+    O CSV é convertido uma única vez; depois cada análise lê apenas as
+    colunas de que precisa, com o arquivo mapeado em memória (mmap), sem
+    passar pelos campos de texto grandes ('description', 'poisList').
+
+    Um dataset também pode ser uma versão de outro (`append`): só as linhas
+    novas são gravadas, num segmento próprio, junto com um manifesto que
+    lista os segmentos anteriores e as posições das linhas substituídas.
+    A leitura junta os segmentos sem copiá-los (mmap) e descarta essas
+    linhas.
+    """
+
+    def __init__(self, root=None, max_files=8):
+        self.root = root or default_store_dir()
+        self.max_files = max_files
+        # Função que devolve as chaves ainda em uso (ex: as do DatasetCache),
+        # que nunca são apagadas, por mais antigas que sejam
+        self.in_use = None
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def available():
+        """Indica se o pyarrow está instalado."""
+        return feather is not None
+
+    def path(self, key):
+        return os.path.join(self.root, f'{key}.arrow')
+
+    def _caminho_manifesto(self, key):
+        return os.path.join(self.root, f'{key}.json')
+
+    def _caminho_removidos(self, key):
+        return os.path.join(self.root, f'{key}.removidos.npy')
+
+    def _manifesto(self, key):
+        # Manifesto das versões: {'segmentos': [...], 'removidos': [...]}; None para um dataset simples
+        try:
+            with open(self._caminho_manifesto(key), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _segmentos(self, key):
+        manifesto = self._manifesto(key)
+        return manifesto['segmentos'] if manifesto else [key]
+
+    def removed(self, key):
+        """Posições (em `total_rows`) das linhas substituídas ou apagadas nas versões."""
+        manifesto = self._manifesto(key)
+        if not manifesto or not manifesto['removidos']:
+            return np.empty(0, dtype='int64')
+        return np.concatenate([np.load(self._caminho_removidos(versao)) for versao in manifesto['removidos']])
+
+    def total_rows(self, key):
+        """Número de linhas de todos os segmentos, incluindo as substituídas."""
+        return sum(feather.read_table(self.path(segmento), memory_map=True).num_rows
+                   for segmento in self._segmentos(key))
+
+    def _tabela(self, key, columns=None, filtrar=True):
+        # Os segmentos de uma versão, juntados sem cópia (e sem as linhas removidas)
+        segmentos = self._segmentos(key)
+        tabelas = []
+        for segmento in segmentos:
+            caminho = self.path(segmento)
+            colunas = columns
+            if columns is not None and len(segmentos) > 1:
+                existentes = set(feather.read_table(caminho, memory_map=True).column_names)
+                colunas = [col for col in columns if col in existentes]
+            tabelas.append(feather.read_table(caminho, columns=colunas, memory_map=True))
+        tabela = tabelas[0] if len(tabelas) == 1 else pa.concat_tables(tabelas, promote_options='permissive')
+        removidas = self.removed(key) if filtrar else None
+        if removidas is not None and len(removidas):
+            mantidas = np.ones(tabela.num_rows, dtype=bool)
+            mantidas[removidas] = False
+            tabela = tabela.filter(pa.array(mantidas))
+        return tabela
+
+    def has(self, key):
+        return os.path.exists(self.path(key))
+
+    def is_version(self, key):
+        """Indica se o dataset é uma versão de outro (gravada com `append`)."""
+        return self._manifesto(key) is not None
+
+    def ingest(self, key, df):
+        """
+        Grava o DataFrame no armazenamento (uma única vez por hash).
+
+        A escrita é feita num arquivo temporário e renomeada no final, para
+        que outra sessão nunca leia um arquivo pela metade.
+        """
+        if self.has(key):
+            return
+        destino = self.path(key)
+        temporario = f'{destino}.{os.getpid()}.tmp'
+        with measure('gravacao_arrow', linhas=len(df)):
+            feather.write_feather(df, temporario, compression='uncompressed')
+        os.replace(temporario, destino)
+        self._prune()
+
+    def append(self, key, parent, df, removed=()):
+        """
+        Grava uma nova versão do dataset `parent`: as linhas de `df` são
+        acrescentadas no fim e as das posições `removed` (em `total_rows`
+        do pai) deixam de ser lidas. Só as linhas novas são escritas, então
+        o custo é proporcional ao tamanho da atualização.
+
+        Args:
+            key (str): A chave da nova versão.
+            parent (str): A chave do dataset (ou versão) de origem.
+            df (pd.DataFrame): As linhas novas (anúncios novos ou atualizados).
+            removed (array): Posições das linhas substituídas ou apagadas.
+        """
+        if self.has(key):
+            return
+        manifesto = self._manifesto(parent) or {'segmentos': [parent], 'removidos': []}
+        manifesto = {
+            'segmentos': manifesto['segmentos'] + [key],
+            'removidos': manifesto['removidos'] + ([key] if len(removed) else []),
+        }
+        if len(removed):
+            np.save(self._caminho_removidos(key), np.asarray(removed, dtype='int64'))
+
+        # O manifesto vai antes do segmento: `has(key)` só fica verdadeiro
+        # quando a versão inteira já pode ser lida
+        destino = self.path(key)
+        temporario = f'{destino}.{os.getpid()}.tmp'
+        with measure('gravacao_arrow', linhas=len(df)):
+            with open(f'{temporario}.json', 'w', encoding='utf-8') as f:
+                json.dump(manifesto, f)
+            os.replace(f'{temporario}.json', self._caminho_manifesto(key))
+            feather.write_feather(df, temporario, compression='uncompressed')
+        os.replace(temporario, destino)
+        self._prune()
+
+    def columns(self, key):
+        """Lista as colunas disponíveis no dataset gravado."""
+        colunas = {}
+        for segmento in self._segmentos(key):
+            colunas.update(dict.fromkeys(feather.read_table(self.path(segmento), memory_map=True).column_names))
+        return list(colunas)
+
+    def numeric_columns(self, key):
+        """As colunas numéricas do dataset gravado (pelo esquema, sem ler os dados)."""
+        colunas = {}
+        for segmento in self._segmentos(key):
+            esquema = feather.read_table(self.path(segmento), memory_map=True).schema
+            colunas.update(dict.fromkeys(
+                campo.name for campo in esquema
+                if pa.types.is_integer(campo.type) or pa.types.is_floating(campo.type)
+            ))
+        return list(colunas)
+
+    def rows(self, key):
+        """Número de linhas do dataset gravado (lido dos metadados, sem carregar as colunas)."""
+        return self.total_rows(key) - len(self.removed(key))
+
+    def take(self, key, positions, columns=None):
+        """
+        Lê só as linhas nas posições `positions` (em `total_rows`, incluindo
+        as substituídas), ex: a versão antiga dos anúncios atualizados.
+        """
+        if columns is not None:
+            existentes = set(self.columns(key))
+            columns = [col for col in columns if col in existentes]
+        tabela = self._tabela(key, columns, filtrar=False)
+        return tabela.take(pa.array(np.asarray(positions, dtype='int64'))).to_pandas()
+
+    def read(self, key, columns=None):
+        """
+        Lê o dataset (ou só as colunas pedidas) com mmap.
+
+        Args:
+            key (str): O hash do dataset.
+            columns (list, opcional): Colunas desejadas; as que não existem
+                no arquivo são ignoradas.
+
+        Returns:
+            pd.DataFrame: O DataFrame com os tipos originais (categorias, Int16...).
+        """
+        if columns is not None:
+            existentes = set(self.columns(key))
+            columns = [col for col in columns if col in existentes]
+        tabela = self._tabela(key, columns)
+        for segmento in self._segmentos(key):
+            self._touch(self.path(segmento))
+        return tabela.to_pandas()
+
+    def head(self, key, n=5):
+        """Lê apenas as primeiras `n` linhas (para a Visão Geral)."""
+        removidas = self.removed(key)
+        if not len(removidas):
+            return self._tabela(key).slice(0, n).to_pandas()
+        removidas = np.unique(removidas)
+        # As primeiras `n` posições que não foram removidas
+        candidatas = np.arange(n + len(removidas))
+        posicoes = candidatas[~np.isin(candidatas, removidas)][:n]
+        return self.take(key, posicoes[posicoes < self.total_rows(key)])
+
+    def _touch(self, caminho):
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+
+    def _prune(self):
+        # Mantém apenas os `max_files` datasets usados mais recentemente, os
+        # ainda em uso (`in_use`) e os segmentos de que eles dependem
+        chaves = [nome[:-len('.arrow')] for nome in os.listdir(self.root) if nome.endswith('.arrow')]
+        chaves.sort(key=lambda chave: os.path.getmtime(self.path(chave)), reverse=True)
+        mantidas = set(chaves[:self.max_files])
+        if self.in_use is not None:
+            mantidas.update(chave for chave in self.in_use() if self.has(chave))
+        usados = set()
+        for chave in mantidas:
+            manifesto = self._manifesto(chave) or {'segmentos': [chave], 'removidos': []}
+            usados.update(manifesto['segmentos'], manifesto['removidos'])
+        for chave in chaves[self.max_files:]:
+            if chave in usados:
+                continue
+            for caminho in (self.path(chave), self._caminho_manifesto(chave), self._caminho_removidos(chave)):
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    pass
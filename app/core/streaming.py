@@ -0,0 +1,267 @@
+# core/streaming.py
+import math
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import QUANTIS, NeighborhoodCube
+from .correlation import CorrelationStats
+from .features import AREA_MINIMA, PRECO_MINIMO, QUANTIL_M2, Z_SCORE_PRECO
+from .instrumentation import measure
+from .loader import NUMERIC_COLUMNS, iter_listings
+from .sketches import KLLSketch, RunningMoments
+
+# Colunas lidas no modo streaming (os campos de texto nunca são carregados)
+STREAM_COLUMNS = NUMERIC_COLUMNS + ['neighborhood']
+
+# Contagens com preço médio disponível (análises 5 e 6)
+COLUNAS_CONTAGEM = ['bedrooms', 'parkingSpaces']
+
+
+class StreamingSummary:
+    """
+    Resumo mesclável de um dataset lido em blocos, para arquivos que não
+    cabem na memória. Nenhuma linha é guardada, exceto uma amostra de
+    tamanho fixo para o gráfico de dispersão:
+
+    - correlações: estatísticas suficientes (core.correlation);
+    - média e desvio do preço: Welford (core.sketches.RunningMoments);
+    - medianas e quantis (global, por coluna e por bairro): esbocos KLL;
+    - preço médio por quartos/vagas e contagens por bairro: somas.
+
+    Os filtros de outliers dependem de estatísticas globais (Z-score do
+    preço, quantil 99% do m²), então são aplicados na consulta, a partir
+    dos ranks dos esbocos, e não durante a leitura.
+
+    Linhas já resumidas podem ser retiradas com `remove` (anúncios
+    atualizados ou apagados, ver core.incremental): as somas e contagens
+    são subtraídas e os esboços guardam os valores retirados à parte. Com
+    os identificadores dos anúncios (`ids`), a amostra também os descarta.
+    """
+
+    def __init__(self, k=200, sample_size=20_000, seed=0):
+        self.k = k
+        self.sample_size = sample_size
+        self.rows = 0
+        self.correlation = None
+        self.price_moments = RunningMoments(1)
+        self.column_sketches = {}
+        self.m2_sketch = KLLSketch(k, seed=seed)
+        self.price_by_neighborhood = {}
+        self.m2_by_neighborhood = {}
+        self.listings_by_neighborhood = pd.Series(dtype='float64')
+        self.counts_by_neighborhood = {col: pd.DataFrame() for col in COLUNAS_CONTAGEM}
+        self.price_sums = {col: pd.DataFrame({'sum': [], 'count': []}, dtype='float64') for col in COLUNAS_CONTAGEM}
+        self.sample = pd.DataFrame(columns=['price', 'usableAreas', '_u', '_id'])
+        self._versao = 0
+        self._cubo = None
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def nbytes(self):
+        esbocos = [*self.column_sketches.values(), *self.price_by_neighborhood.values(),
+                   *self.m2_by_neighborhood.values(), self.m2_sketch]
+        return sum(sketch.nbytes for sketch in esbocos) + int(self.sample.memory_usage().sum())
+
+    def _sketch(self, tabela, chave):
+        if chave not in tabela:
+            tabela[chave] = KLLSketch(self.k, seed=int(self._rng.integers(2 ** 31)))
+        return tabela[chave]
+
+    def update(self, chunk, ids=None):
+        """
+        Acrescenta um bloco de linhas ao resumo.
+
+        Args:
+            chunk (pd.DataFrame): As linhas.
+            ids (np.ndarray, opcional): O identificador de cada linha (ver
+                core.incremental.listing_ids), guardado na amostra.
+        """
+        return self._aplica(chunk, 1, ids)
+
+    def remove(self, chunk, ids=None):
+        """
+        Retira do resumo um bloco de linhas acrescentado antes (com os
+        mesmos valores). Com `ids`, as linhas saem também da amostra.
+        """
+        return self._aplica(chunk, -1, ids)
+
+    def _aplica(self, chunk, sinal, ids):
+        # sinal = 1 acrescenta as linhas; sinal = -1 as retira
+        self.rows += sinal * len(chunk)
+        self._versao += 1
+        numericas = [col for col in NUMERIC_COLUMNS if col in chunk.columns]
+        metodo = 'update' if sinal > 0 else 'remove'
+
+        def esboco(tabela, chave, valores):
+            getattr(self._sketch(tabela, chave), metodo)(valores)
+
+        # 1. Correlações e quantis de cada coluna numérica
+        if self.correlation is None:
+            self.correlation = CorrelationStats(numericas)
+        getattr(self.correlation, metodo)(chunk)
+        for col in numericas:
+            esboco(self.column_sketches, col, chunk[col].to_numpy(dtype='float64', na_value=np.nan))
+
+        if 'price' not in chunk.columns:
+            return self
+        price = chunk['price'].to_numpy(dtype='float64', na_value=np.nan)
+        price = np.where(price > 0, price, np.nan)
+        getattr(self.price_moments, metodo)(price)
+
+        # 2. Preço/m² (mesmas regras de core.features; o corte do quantil 99%
+        # é aplicado só na consulta)
+        if 'usableAreas' in chunk.columns:
+            area = chunk['usableAreas'].to_numpy(dtype='float64', na_value=np.nan)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                preco_m2 = np.where((price > PRECO_MINIMO) & (area > AREA_MINIMA), price / area, np.nan)
+        else:
+            preco_m2 = np.full(len(chunk), np.nan)
+        getattr(self.m2_sketch, metodo)(preco_m2)
+
+        # 3. Esboços por bairro
+        if 'neighborhood' in chunk.columns:
+            bairros = chunk['neighborhood'].astype('object')
+            com_bairro = bairros.notna().to_numpy()
+            self.listings_by_neighborhood = self.listings_by_neighborhood.add(
+                sinal * bairros[com_bairro].value_counts(), fill_value=0
+            )
+            blocos = pd.DataFrame({'bairro': bairros, 'price': price, 'm2': preco_m2})[com_bairro]
+            for bairro, grupo in blocos.groupby('bairro', sort=False):
+                esboco(self.price_by_neighborhood, bairro, grupo['price'].to_numpy())
+                esboco(self.m2_by_neighborhood, bairro, grupo['m2'].to_numpy())
+
+            for col in COLUNAS_CONTAGEM:
+                if col in chunk.columns:
+                    validos = com_bairro & chunk[col].notna().to_numpy()
+                    tabela = pd.crosstab(bairros[validos], chunk.loc[validos, col].astype(int))
+                    self.counts_by_neighborhood[col] = self.counts_by_neighborhood[col].add(
+                        sinal * tabela, fill_value=0
+                    )
+
+        # 4. Somas de preço por número de quartos/vagas
+        for col in COLUNAS_CONTAGEM:
+            if col in chunk.columns:
+                validos = ~np.isnan(price) & chunk[col].notna().to_numpy()
+                somas = pd.Series(price[validos]).groupby(
+                    chunk.loc[validos, col].astype(int).to_numpy()
+                ).agg(['sum', 'count'])
+                self.price_sums[col] = (sinal * somas).add(self.price_sums[col], fill_value=0)
+
+        # 5. Amostra uniforme de tamanho fixo (reservatório com chaves
+        # aleatórias); as linhas retiradas saem dela pelos identificadores
+        if sinal < 0:
+            if ids is not None and len(self.sample):
+                self.sample = self.sample[~self.sample['_id'].isin(ids)].reset_index(drop=True)
+        elif 'usableAreas' in chunk.columns:
+            bloco = pd.DataFrame({
+                'price': price,
+                'usableAreas': chunk['usableAreas'].to_numpy(dtype='float64', na_value=np.nan),
+                '_u': self._rng.random(len(chunk)),
+                '_id': ids if ids is not None else np.zeros(len(chunk), dtype='uint64'),
+            })
+            amostra = pd.concat([self.sample, bloco], ignore_index=True) if len(self.sample) else bloco
+            if len(amostra) > self.sample_size:
+                manter = np.argpartition(amostra['_u'].to_numpy(), self.sample_size)[:self.sample_size]
+                amostra = amostra.iloc[np.sort(manter)].reset_index(drop=True)
+            self.sample = amostra
+
+        return self
+
+    # --- Consultas ---
+
+    def correlation_matrix(self):
+        """Matriz de correlação entre as colunas numéricas (pares completos)."""
+        return self.correlation.corr()
+
+    def median(self, coluna):
+        """Mediana aproximada de uma coluna numérica."""
+        sketch = self.column_sketches.get(coluna)
+        return sketch.quantile(0.5) if sketch is not None else math.nan
+
+    def medians(self, colunas):
+        """Medianas aproximadas de várias colunas (ex: para preencher nulos)."""
+        return pd.Series({col: self.median(col) for col in colunas}, dtype='float64')
+
+    def mean_price_by(self, coluna, minimo, maximo):
+        """Preço médio por valor de `coluna` (ex: quartos) entre `minimo` e `maximo`."""
+        somas = self.price_sums[coluna]
+        somas = somas[(somas.index >= minimo) & (somas.index <= maximo) & (somas['count'] > 0)]
+        return (somas['sum'] / somas['count']).sort_index()
+
+    def scatter_sample(self):
+        """Amostra uniforme das linhas (preço e área) para o gráfico de dispersão."""
+        return self.sample[['price', 'usableAreas']]
+
+    def _estatisticas(self, esbocos, low, high):
+        linhas = {}
+        for bairro, sketch in esbocos.items():
+            q1, q3 = sketch.quantile_between([QUANTIS['q1'], QUANTIS['q3']], low, high)
+            iqr = q3 - q1
+            lim_inf = max(low, q1 - 1.5 * iqr)
+            lim_sup = min(high, q3 + 1.5 * iqr)
+            linhas[bairro] = {
+                'count': sketch.count_between(low, high),
+                'mean': sketch.mean_between(low, high),
+                'median': sketch.quantile_between(0.5, low, high),
+                **dict(zip(QUANTIS, sketch.quantile_between(list(QUANTIS.values()), low, high))),
+                'whislo': sketch.quantile_between(0.0, lim_inf, high),
+                'whishi': sketch.quantile_between(1.0, low, np.nextafter(lim_sup, math.inf)),
+            }
+        return pd.DataFrame.from_dict(linhas, orient='index')
+
+    def neighborhood_cube(self):
+        """
+        As estatísticas por bairro no mesmo formato de core.aggregates,
+        com quantis aproximados. Os outliers individuais do boxplot não são
+        guardados no modo streaming.
+        """
+        # O cubo é reaproveitado enquanto nenhum bloco for acrescentado ou retirado
+        if self._cubo is not None and self._cubo[0] == self._versao:
+            return self._cubo[1]
+
+        media = float(self.price_moments.mean[0])
+        desvio = float(self.price_moments.std[0])
+        limite_m2 = self.m2_sketch.quantile(QUANTIL_M2)
+
+        stats = pd.concat([
+            self.listings_by_neighborhood.rename('anuncios'),
+            self._estatisticas(
+                self.price_by_neighborhood,
+                media - Z_SCORE_PRECO * desvio,
+                np.nextafter(media + Z_SCORE_PRECO * desvio, math.inf)
+            ).add_prefix('price_'),
+            self._estatisticas(self.m2_by_neighborhood, -math.inf, limite_m2).add_prefix('m2_'),
+        ], axis=1)
+        stats.index = stats.index.astype(str)
+        stats.index.name = 'neighborhood'
+
+        def distribuicao(col):
+            tabela = self.counts_by_neighborhood[col]
+            tabela.index = tabela.index.astype(str)
+            return tabela.reindex(stats.index, fill_value=0).astype(int)
+
+        cubo = NeighborhoodCube(stats, distribuicao('bedrooms'), distribuicao('parkingSpaces'), {})
+        self._cubo = (self._versao, cubo)
+        return cubo
+
+
+def summarize_csv(source, chunksize=100_000, k=200):
+    """
+    Lê o CSV em blocos e devolve o resumo mesclável (memória limitada ao
+    tamanho do bloco mais os esbocos).
+
+    Args:
+        source (str | file-like): Caminho ou buffer do arquivo CSV.
+        chunksize (int): Linhas por bloco.
+        k (int): Parâmetro de precisão dos esbocos KLL.
+
+    Returns:
+        StreamingSummary: O resumo do dataset.
+    """
+    resumo = StreamingSummary(k=k)
+    with measure('resumo_streaming') as registro:
+        for bloco in iter_listings(source, columns=STREAM_COLUMNS, chunksize=chunksize):
+            resumo.update(bloco)
+        registro['linhas'] = resumo.rows
+    return resumo
@@ -0,0 +1,193 @@
+# core/text_index.py
+import numpy as np
+import pandas as pd
+
+# Mesma regra de palavras do WordCloud (letras/dígitos, com apóstrofo interno)
+TOKEN_PATTERN = r"\w[\w']*"
+
+# Stopwords em português e termos imobiliários genéricos
+STOPWORDS_PT = frozenset([
+    "de", "da", "do", "das", "dos", "em", "no", "na", "nos", "nas", "que", "e", "com", "para", "por",
+    "um", "uma", "uns", "umas", "ao", "à", "a", "os", "as", "se", "nao", "não", "ou", "mais", "também",
+    "apartamento", "apto", "imovel", "imóvel", "condominio", "condomínio", "m2", "m²", "area", "área",
+    "quartos", "quarto", "dormitórios", "dormitório", "suite", "suíte", "banheiro", "banheiros",
+    "vaga", "vagas", "andar", "sala", "cozinha", "metragem", "valor", "novo", "completamente",
+    "m", "x", "r$", "ser", "localizado", "proximo", "próximo", "regiao", "região", "curitiba"
+])
+
+
+def tokeniza(textos):
+    """
+    Quebra os textos em palavras, de forma vetorizada (pandas .str).
+
+    Remove as tags HTML, converte para minúsculas, tira o "'s" final e
+    descarta números puros, como o WordCloud faz.
+
+    Args:
+        textos (pd.Series): Os textos (NaN são ignorados).
+
+    Returns:
+        pd.Series: Uma palavra por linha, indexada pela linha do texto.
+    """
+    textos = textos.astype('string')
+    textos = textos.str.replace(r'<[^>]+>', ' ', regex=True).str.lower()  # Remove tags HTML (ex: <br>)
+    palavras = textos.str.findall(TOKEN_PATTERN).explode().dropna().astype('string')
+    palavras = palavras.str.replace(r"'s$", '', regex=True)
+    return palavras[~palavras.str.isdigit().astype(bool)]
+
+
+def normaliza_plurais(frequencias):
+    """
+    Junta o plural ao singular quando os dois aparecem (ex: 'sacadas' em
+    'sacada'), exceto palavras terminadas em 'ss' — a mesma regra do
+    WordCloud.
+    """
+    resultado = dict(frequencias)
+    for palavra in list(resultado):
+        if palavra.endswith('s') and not palavra.endswith('ss') and palavra[:-1] in resultado:
+            resultado[palavra[:-1]] += resultado.pop(palavra)
+    return resultado
+
+
+class TextIndex:
+    """
+    Contagem de palavras por anúncio, no formato esparso (CSR): para cada
+    anúncio, os ids das palavras e quantas vezes cada uma aparece.
+
+    É montado uma vez por dataset; as frequências de qualquer recorte de
+    anúncios (ex: os 10% mais caros) saem de um `np.bincount`, sem
+    tokenizar os textos de novo.
+
+    Attributes:
+        vocabulary (np.ndarray): As palavras, na ordem dos ids.
+        indptr (np.ndarray): Início das entradas de cada anúncio (n + 1).
+        doc_ids, term_ids, counts (np.ndarray): As entradas (anúncio,
+            palavra, contagem), ordenadas por anúncio.
+    """
+
+    def __init__(self, vocabulary, doc_ids, term_ids, counts, n_docs):
+        self.vocabulary = vocabulary
+        self.doc_ids = doc_ids
+        self.term_ids = term_ids
+        self.counts = counts
+        self.n_docs = n_docs
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(doc_ids, minlength=n_docs))])
+
+    @property
+    def nbytes(self):
+        return int(
+            self.doc_ids.nbytes + self.term_ids.nbytes + self.counts.nbytes + self.indptr.nbytes +
+            sum(len(palavra) for palavra in self.vocabulary) + self.vocabulary.nbytes
+        )
+
+    def _entradas(self, mask):
+        if mask is None:
+            return slice(None)
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (self.n_docs,):
+            raise ValueError("A máscara precisa ter uma posição por anúncio do índice.")
+        return mask[self.doc_ids]
+
+    def term_counts(self, mask=None):
+        """Total de ocorrências de cada palavra nos anúncios da máscara."""
+        entradas = self._entradas(mask)
+        return np.bincount(
+            self.term_ids[entradas], weights=self.counts[entradas], minlength=len(self.vocabulary)
+        ).astype('int64')
+
+    def document_counts(self, mask=None):
+        """Número de anúncios da máscara em que cada palavra aparece."""
+        entradas = self._entradas(mask)
+        return np.bincount(self.term_ids[entradas], minlength=len(self.vocabulary))
+
+    def frequencies(self, mask=None, normalize_plurals=True):
+        """
+        Frequência de cada palavra nos anúncios da máscara, pronta para
+        `WordCloud.generate_from_frequencies`.
+
+        Args:
+            mask (np.ndarray, opcional): Um booleano por anúncio (todos se None).
+            normalize_plurals (bool): Junta plurais ao singular.
+
+        Returns:
+            dict: {palavra: ocorrências}, apenas as palavras presentes.
+        """
+        contagens = self.term_counts(mask)
+        presentes = np.flatnonzero(contagens)
+        frequencias = dict(zip(self.vocabulary[presentes].tolist(), contagens[presentes].tolist()))
+        return normaliza_plurais(frequencias) if normalize_plurals else frequencias
+
+    def log_odds(self, mask, reference, prior=500.0):
+        """
+        Palavras super-representadas em um grupo de anúncios em relação a
+        outro: log-odds com priori de Dirichlet informativa (Monroe et al.,
+        2008), em Z-score. Valores altos indicam palavras típicas de `mask`.
+
+        Args:
+            mask (np.ndarray): O grupo de interesse (ex: a faixa de luxo).
+            reference (np.ndarray): O grupo de comparação (ex: o resto).
+            prior (float): Peso total da priori (frequências de todo o
+                dataset), que suaviza palavras raras.
+
+        Returns:
+            pd.Series: O Z-score de cada palavra do vocabulário.
+        """
+        y_a = self.term_counts(mask).astype('float64')
+        y_b = self.term_counts(reference).astype('float64')
+        fundo = self.term_counts().astype('float64')
+        alfa = prior * fundo / max(fundo.sum(), 1.0)
+        n_a, n_b = y_a.sum(), y_b.sum()
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = (
+                np.log((y_a + alfa) / (n_a + prior - y_a - alfa)) -
+                np.log((y_b + alfa) / (n_b + prior - y_b - alfa))
+            )
+            z = delta / np.sqrt(1 / (y_a + alfa) + 1 / (y_b + alfa))
+        return pd.Series(z, index=self.vocabulary, name='z')
+
+
+def build_text_index(textos, stopwords=STOPWORDS_PT, block_rows=50_000):
+    """
+    Tokeniza os textos uma única vez e monta o índice de contagens.
+
+    Args:
+        textos (pd.Series): Os textos (ex: a coluna 'description'); a
+            posição de cada linha é o id do anúncio no índice.
+        stopwords (set): Palavras ignoradas (em minúsculas).
+        block_rows (int): Textos tokenizados por vez (limita a memória).
+
+    Returns:
+        TextIndex: O índice de contagens por anúncio.
+    """
+    stopwords = pd.Index(sorted({palavra.lower() for palavra in stopwords}))
+    vocabulario = {}
+    docs, termos, contagens = [], [], []
+
+    for inicio in range(0, len(textos), block_rows):
+        bloco = pd.Series(
+            textos.iloc[inicio:inicio + block_rows].to_numpy(),
+            index=np.arange(inicio, min(inicio + block_rows, len(textos)))
+        )
+        palavras = tokeniza(bloco)
+        palavras = palavras[~palavras.isin(stopwords)]
+        if palavras.empty:
+            continue
+
+        # Ids globais das palavras (o laço é só sobre o vocabulário do bloco)
+        codigos, unicas = pd.factorize(palavras)
+        ids = np.array([vocabulario.setdefault(palavra, len(vocabulario)) for palavra in unicas], dtype='int64')
+
+        # Contagem de cada par (anúncio, palavra)
+        chave = palavras.index.to_numpy(dtype='int64') * len(vocabulario) + ids[codigos]
+        pares, n = np.unique(chave, return_counts=True)
+        docs.append((pares // len(vocabulario)).astype('int32'))
+        termos.append((pares % len(vocabulario)).astype('int32'))
+        contagens.append(n.astype('int32'))
+
+    def junta(partes):
+        return np.concatenate(partes) if partes else np.empty(0, dtype='int32')
+
+    return TextIndex(
+        np.array(list(vocabulario), dtype=object), junta(docs), junta(termos), junta(contagens), len(textos)
+    )
@@ -0,0 +1,356 @@
+# app/relatorio.py
+"""
+Gera o relatório estático de todas as análises (PNGs, mapas em HTML e um
+index.html) lendo o CSV uma única vez.
+
+Os agregados (atributos derivados, cubo por bairro, correlação, índice de
+palavras...) são calculados uma vez e compartilhados entre as análises; os
+gráficos são desenhados em paralelo, em processos separados.
+
+Com `--streaming`, o CSV é lido em blocos e só o resumo mesclável fica em
+memória (core.streaming), como no modo streaming do app; as saídas que
+precisam das linhas (nuvem de palavras, mapas de pontos...) ficam de fora.
+
+Uso:
+    python app/relatorio.py curitiba_apartment_real_estate_data.csv --saida relatorio
+    python app/relatorio.py curitiba_apartment_real_estate_data.csv --streaming
+"""
+import argparse
+import html
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')  # Sem janelas: as figuras só são salvas em arquivo
+
+from matplotlib.figure import Figure
+
+from core.aggregates import CUBE_COLUMNS, build_neighborhood_cube
+from core.cache import DatasetEntry
+from core.correlation import CorrelationStats
+from core.features import FEATURE_COLUMNS, build_features
+from core.figure_cache import render_png
+from core.loader import read_listings
+from core.quantiles import QUANTILE_COLUMNS, build_quantile_sketches
+from core.streaming import summarize_csv
+
+from analyses.analysis_001 import prepara_dados_001, gera_grafico_001, COLUMNS as COLUMNS_001
+from analyses.analysis_heatmap import gera_grafico_heatmap, COLUMNS as COLUMNS_HEATMAP
+from analyses.analysis_002 import prepara_dados_002, gera_grafico_002
+from analyses.analysis_003 import (
+    prepara_dados_003, prepara_densidade_003, gera_grafico_003, gera_grafico_003_densidade,
+    LIMITE_PONTOS as LIMITE_PONTOS_003, COLUMNS as COLUMNS_003,
+)
+from analyses.analysis_004 import prepara_dados_004, gera_grafico_004
+from analyses.analysis_005 import prepara_dados_005, gera_grafico_005, COLUMNS as COLUMNS_005
+from analyses.analysis_006 import prepara_dados_006, gera_grafico_006, COLUMNS as COLUMNS_006
+from analyses.analysis_007 import prepara_bairros_mapa, prepara_dados_preco_m2, gera_mapa_007, COLUMNS as COLUMNS_007
+from analyses.analysis_008 import prepara_indice_textos, prepara_frequencias, gera_grafico_008, COLUMNS as COLUMNS_008
+from analyses.analysis_009 import ROTULOS, prepara_bitset, prepara_dados_009, gera_grafico_009
+from analyses.analysis_010 import (
+    prepara_grade, prepara_celulas, gera_mapa_010, prepara_dados_calor, gera_mapa_calor, COLUMNS as COLUMNS_010
+)
+from analyses.analysis_011 import gera_mapa_011
+from analyses.analysis_012 import (
+    prepara_modelo_012, prepara_desvios_012, prepara_dados_012, gera_grafico_012, COLUMNS as COLUMNS_012
+)
+
+# Conforme o app, o geojson fica na pasta de onde o relatório é gerado
+GEOJSON_PATH = 'curitiba_bairros.geojson'
+
+# Saídas do relatório, na ordem do index.html: id -> (arquivo, título)
+SAIDAS = {
+    'heatmap': ('matriz_correlacao.png', "Matriz de Correlação"),
+    '001': ('analise_001_correlacao_preco.png', "Análise 1: Correlação com Preço"),
+    '002': ('analise_002_preco_por_bairro.png', "Análise 2: Preço por Bairro"),
+    '003': ('analise_003_preco_vs_area.png', "Análise 3: Preço vs. Área Útil"),
+    '004': ('analise_004_preco_m2_top10.png', "Análise 4: Preço por m² (Top 10)"),
+    '005': ('analise_005_preco_por_vagas.png', "Análise 5: Preço por Vagas de Garagem"),
+    '006': ('analise_006_preco_por_quartos.png', "Análise 6: Preço por Número de Quartos"),
+    '007': ('analise_007_mapa_bairros.html', "Análise 7: Mapa de Preços por Bairro"),
+    'calor': ('analise_007_mapa_de_calor.html', "Mapa de Calor dos Preços"),
+    '008': ('analise_008_nuvem_de_palavras.png', "Análise 8: Nuvem de Palavras (Luxo)"),
+    '009': ('analise_009_premio_comodidades.png', "Análise 9: Prêmio por Comodidade"),
+    '010': ('analise_010_mapa_grade.html', "Análise 10: Mapa em Grade (Preço/m²)"),
+    '011': ('analise_011_mapa_ranking.html', "Análise 11: Mapa com Ranking por Bairro"),
+    '012': ('analise_012_preco_justo.png', "Análise 12: Preço Justo (Modelo Hedônico)"),
+}
+
+# Colunas lidas do CSV para cada saída (o CSV é lido uma vez, só com a união;
+# None: todas as colunas do arquivo)
+COLUNAS = {
+    'heatmap': COLUMNS_HEATMAP,
+    '001': COLUMNS_001,
+    '002': CUBE_COLUMNS,
+    '003': COLUMNS_003,
+    '004': CUBE_COLUMNS,
+    '005': COLUMNS_005,
+    '006': COLUMNS_006,
+    '007': CUBE_COLUMNS + COLUMNS_007,
+    'calor': ['price', 'lat', 'lon'],
+    '008': COLUMNS_008,
+    '009': FEATURE_COLUMNS + ['amenities'],
+    '010': COLUMNS_010,
+    '011': CUBE_COLUMNS + COLUMNS_007,
+    '012': COLUMNS_012,
+}
+
+
+def prepara_tarefas(dataset, geojson_path, erro_quantis=None):
+    """
+    Para cada saída: uma função que calcula no processo principal os
+    agregados de que ela precisa (os compartilhados, uma vez só) e devolve
+    `(funcao, kwargs)` para o desenho em um processo separado.
+
+    Os processos recebem só esses agregados (séries, tabelas por bairro,
+    frequências de palavras, células da grade), nunca o dataset: só a
+    Análise 3 recebe linhas, os pontos já filtrados do gráfico de dispersão,
+    e só até LIMITE_PONTOS_003 (acima disso, recebe a grade de densidade).
+
+    Com `erro_quantis`, os quantis e as medianas (cortes de outliers,
+    medianas por bairro, faixa de preço da Análise 8) saem de esboços
+    KLL com esse erro de rank (core.quantiles), montados uma vez.
+    """
+    def quantis():
+        if erro_quantis is None:
+            return None
+        return dataset.artifact('quantis', lambda: build_quantile_sketches(
+            dataset.frame(QUANTILE_COLUMNS), erro_quantis
+        ))
+
+    def quantis_mapa():
+        if erro_quantis is None:
+            return None
+        return dataset.artifact('quantis_mapa', lambda: build_quantile_sketches(
+            prepara_bairros_mapa(dataset.frame(QUANTILE_COLUMNS), geojson_path), erro_quantis
+        ))
+
+    def medianas():
+        if erro_quantis is None:
+            return dataset.frame(COLUMNS_001).median()
+        return quantis().medians(COLUMNS_001)
+
+    def features():
+        return dataset.artifact('features', lambda: build_features(dataset.frame(FEATURE_COLUMNS), quantis()))
+
+    def cube():
+        return dataset.artifact('cube', lambda: build_neighborhood_cube(
+            dataset.frame(CUBE_COLUMNS), features(), quantis()
+        ))
+
+    def correlacao():
+        return dataset.artifact('correlacao', lambda: CorrelationStats.from_frame(dataset.frame(COLUMNS_HEATMAP)))
+
+    def cube_mapa():
+        return dataset.artifact('cube_mapa', lambda: build_neighborhood_cube(
+            prepara_bairros_mapa(dataset.frame(CUBE_COLUMNS + ['lat', 'lon']), geojson_path), features(), quantis_mapa()
+        ))
+
+    def tarefa_003():
+        df_filtrado = prepara_dados_003(dataset.frame(COLUMNS_003), quantis())
+        if len(df_filtrado) > LIMITE_PONTOS_003:
+            return gera_grafico_003_densidade, prepara_densidade_003(df_filtrado)
+        return gera_grafico_003, {'df_filtrado': df_filtrado}
+
+    def tarefa_012():
+        df = dataset.frame(COLUMNS_012)
+        modelo = prepara_modelo_012(df, features())
+        return gera_grafico_012, prepara_dados_012(df, modelo, prepara_desvios_012(df, modelo))
+
+    return {
+        'heatmap': lambda: (gera_grafico_heatmap, {'matriz_correlacao': correlacao().corr()}),
+        '001': lambda: (gera_grafico_001, {'correlacao_com_preco': prepara_dados_001(
+            None, correlacao(), medianas()
+        )}),
+        '002': lambda: (gera_grafico_002, {'estatisticas': prepara_dados_002(None, cube())}),
+        '003': tarefa_003,
+        '004': lambda: (gera_grafico_004, {'top_10_caros': prepara_dados_004(None, cube())}),
+        '005': lambda: (gera_grafico_005, {'preco_medio_por_vaga': prepara_dados_005(dataset.frame(COLUMNS_005))}),
+        '006': lambda: (gera_grafico_006, {'preco_medio_por_quarto': prepara_dados_006(dataset.frame(COLUMNS_006))}),
+        '007': lambda: (gera_mapa_007, {
+            'df_precos': prepara_dados_preco_m2(None, cube_mapa()), 'geojson_path': geojson_path
+        }),
+        'calor': lambda: (gera_mapa_calor, {'dados_heatmap': prepara_dados_calor(dataset.frame(['price', 'lat', 'lon']))}),
+        '008': lambda: (gera_grafico_008, {'frequencias': prepara_frequencias(
+            dataset.frame(COLUMNS_008), prepara_indice_textos(dataset.frame(COLUMNS_008)), quantis=quantis()
+        )}),
+        '009': lambda: (gera_grafico_009, {
+            'tabela': prepara_dados_009(None, prepara_bitset(dataset.frame(['amenities'])), features()),
+            'rotulo': ROTULOS['amenities'],
+        }),
+        '010': lambda: (gera_mapa_010, {
+            'celulas': prepara_celulas(None, prepara_grade(dataset.frame(COLUMNS_010), features()))
+        }),
+        '011': lambda: (gera_mapa_011, {
+            'df_precos': prepara_dados_preco_m2(None, cube_mapa()), 'geojson_path': geojson_path
+        }),
+        '012': tarefa_012,
+    }
+
+
+def prepara_tarefas_streaming(resumo, geojson_path):
+    """
+    As tarefas das saídas que o modo streaming consegue gerar, a partir do
+    resumo mesclável do CSV (ver `prepara_tarefas`); as demais precisam das
+    linhas do dataset.
+    """
+    return {
+        'heatmap': lambda: (gera_grafico_heatmap, {'matriz_correlacao': resumo.correlation_matrix()}),
+        '001': lambda: (gera_grafico_001, {'correlacao_com_preco': prepara_dados_001(
+            None, resumo.correlation, resumo.medians(COLUMNS_001)
+        )}),
+        '002': lambda: (gera_grafico_002, {'estatisticas': prepara_dados_002(None, resumo.neighborhood_cube())}),
+        '003': lambda: (gera_grafico_003, {'df_filtrado': prepara_dados_003(resumo.scatter_sample())}),
+        '004': lambda: (gera_grafico_004, {'top_10_caros': prepara_dados_004(None, resumo.neighborhood_cube())}),
+        '005': lambda: (gera_grafico_005, {'preco_medio_por_vaga': resumo.mean_price_by('parkingSpaces', 0, 5)}),
+        '006': lambda: (gera_grafico_006, {'preco_medio_por_quarto': resumo.mean_price_by('bedrooms', 1, 6)}),
+        '007': lambda: (gera_mapa_007, {
+            'df_precos': prepara_dados_preco_m2(None, resumo.neighborhood_cube()), 'geojson_path': geojson_path
+        }),
+        '011': lambda: (gera_mapa_011, {
+            'df_precos': prepara_dados_preco_m2(None, resumo.neighborhood_cube()), 'geojson_path': geojson_path
+        }),
+    }
+
+
+def renderiza(funcao, kwargs, dpi=100):
+    """
+    Executa a análise e devolve o resultado já codificado: PNG para as
+    figuras do matplotlib, HTML para os mapas do folium. Roda nos processos
+    do pool, então nenhuma figura volta para o processo principal.
+
+    Returns:
+        tuple: (bytes, segundos gastos).
+    """
+    inicio = time.perf_counter()
+    resultado = funcao(**kwargs)
+    if isinstance(resultado, Figure):
+        conteudo = render_png(resultado, dpi)
+    else:
+        conteudo = resultado.get_root().render().encode('utf-8')
+    return conteudo, time.perf_counter() - inicio
+
+
+def escreve_indice(saida, gerados, erros):
+    """Escreve o index.html do relatório, com as imagens e os mapas gerados."""
+    partes = ['<!DOCTYPE html>', '<html lang="pt-BR"><head><meta charset="utf-8">',
+              '<title>Análise de Mercado Imobiliário</title></head><body>',
+              '<h1>📊 Análise de Mercado Imobiliário</h1>']
+    for analysis_id, (arquivo, titulo) in SAIDAS.items():
+        if analysis_id in gerados:
+            partes.append(f'<h2>{html.escape(titulo)}</h2>')
+            if arquivo.endswith('.png'):
+                partes.append(f'<img src="{arquivo}" style="max-width: 100%">')
+            else:
+                partes.append(f'<iframe src="{arquivo}" style="width: 100%; height: 600px; border: 0"></iframe>')
+        elif analysis_id in erros:
+            partes.append(f'<h2>{html.escape(titulo)}</h2><p>Não gerada: {html.escape(erros[analysis_id])}</p>')
+    partes.append('</body></html>')
+
+    with open(os.path.join(saida, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(partes))
+
+
+def gera_relatorio(caminho_csv, saida='relatorio', geojson_path=GEOJSON_PATH, analises=None,
+                   workers=None, nomes=None, indice=True, erro_quantis=None, streaming=False):
+    """
+    Gera o relatório: lê o CSV uma vez, calcula os agregados compartilhados
+    e desenha as análises em paralelo.
+
+    Args:
+        caminho_csv (str): O caminho do arquivo CSV do dataset.
+        saida (str): A pasta do relatório (criada se não existir).
+        geojson_path (str): O GeoJSON dos bairros (mapas).
+        analises (list, opcional): Os ids das saídas (todas se None).
+        workers (int, opcional): Processos de desenho (um por núcleo se None).
+        nomes (dict, opcional): Nomes de arquivo no lugar dos de SAIDAS.
+        indice (bool): Escreve o index.html.
+        erro_quantis (float, opcional): Usa quantis aproximados, com esse
+            erro de rank (ex: 0.01), em vez dos exatos.
+        streaming (bool): Lê o CSV em blocos e gera as saídas a partir do
+            resumo mesclável, sem manter o dataset em memória.
+
+    Returns:
+        dict: {id: caminho do arquivo gerado}.
+    """
+    analises = list(SAIDAS) if analises is None else list(analises)
+    nomes = {analysis_id: SAIDAS[analysis_id][0] for analysis_id in analises} | (nomes or {})
+    os.makedirs(saida, exist_ok=True)
+
+    # 1. Uma única leitura do CSV, só com as colunas das saídas pedidas (ou,
+    # no modo streaming, em blocos, guardando só o resumo)
+    inicio = time.perf_counter()
+    if streaming:
+        resumo = summarize_csv(caminho_csv)
+        print(f"Dataset resumido em {time.perf_counter() - inicio:.1f}s ({resumo.rows:,} linhas, modo streaming).")
+        tarefas = prepara_tarefas_streaming(resumo, geojson_path)
+    else:
+        if any(COLUNAS[analysis_id] is None for analysis_id in analises):
+            colunas = None  # A matriz de correlação usa todas as colunas numéricas do arquivo
+        else:
+            colunas = list(dict.fromkeys(col for analysis_id in analises for col in COLUNAS[analysis_id]))
+        if erro_quantis is not None and colunas is not None:
+            colunas = list(dict.fromkeys(colunas + QUANTILE_COLUMNS))
+        dataset = DatasetEntry(caminho_csv, df=read_listings(caminho_csv, columns=colunas))
+        print(f"Dataset lido em {time.perf_counter() - inicio:.1f}s ({len(dataset.frame()):,} linhas).")
+        tarefas = prepara_tarefas(dataset, geojson_path, erro_quantis)
+
+    # 2. Agregados no processo principal; cada desenho vai para o pool assim
+    # que os seus agregados ficam prontos
+    workers = workers or min(os.cpu_count() or 1, len(analises))
+    gerados, erros, futuros, entradas = {}, {}, {}, {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for analysis_id in analises:
+            if analysis_id not in tarefas:
+                erros[analysis_id] = "não disponível no modo streaming"
+                continue
+            try:
+                funcao, kwargs = tarefas[analysis_id]()
+            except Exception as e:
+                erros[analysis_id] = str(e)
+                continue
+            entradas[analysis_id] = len(pickle.dumps(kwargs))
+            futuros[analysis_id] = pool.submit(renderiza, funcao, kwargs)
+
+        # 3. Arquivos gravados na ordem do relatório
+        for analysis_id, futuro in futuros.items():
+            try:
+                conteudo, segundos = futuro.result()
+            except Exception as e:
+                erros[analysis_id] = str(e)
+                continue
+            caminho = os.path.join(saida, nomes[analysis_id])
+            with open(caminho, 'wb') as f:
+                f.write(conteudo)
+            gerados[analysis_id] = caminho
+            print(f"  {SAIDAS[analysis_id][1]}: {caminho} ({segundos:.1f}s, entrada de {entradas[analysis_id] / 1024:,.0f} KB)")
+
+    for analysis_id, erro in erros.items():
+        print(f"  {SAIDAS[analysis_id][1]}: não gerada ({erro})")
+    if indice:
+        escreve_indice(saida, gerados, erros)
+    print(f"Relatório gerado em {time.perf_counter() - inicio:.1f}s com {workers} processo(s).")
+    return gerados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o relatório estático das análises a partir do CSV.")
+    parser.add_argument('csv', help="O arquivo CSV do dataset")
+    parser.add_argument('--saida', default='relatorio', help="A pasta do relatório (padrão: relatorio)")
+    parser.add_argument('--geojson', default=GEOJSON_PATH, help=f"O GeoJSON dos bairros (padrão: {GEOJSON_PATH})")
+    parser.add_argument('--analises', nargs='+', choices=list(SAIDAS), help="Gera só estas saídas")
+    parser.add_argument('--workers', type=int, help="Processos de desenho (padrão: um por núcleo)")
+    parser.add_argument('--quantis', type=float, metavar='ERRO',
+                        help="Quantis e medianas aproximados (esboços KLL) com este erro de rank, ex: 0.01")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Lê o CSV em blocos, com memória limitada (só as saídas que saem do resumo)")
+    args = parser.parse_args()
+
+    gera_relatorio(args.csv, args.saida, args.geojson, args.analises, args.workers,
+                   erro_quantis=args.quantis, streaming=args.streaming)
+
+
+if __name__ == '__main__':
+    main()
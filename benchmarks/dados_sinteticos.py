@@ -0,0 +1,319 @@
+# benchmarks/dados_sinteticos.py
+"""
+Gera anúncios sintéticos de apartamentos em Curitiba, com todas as colunas
+do dicionário de dados, para medir o desempenho das análises em qualquer
+escala sem depender do dataset original.
+
+- As coordenadas caem dentro dos polígonos de `curitiba_bairros.geojson`
+  (sorteio no retângulo do bairro, conferido com o índice de polígonos).
+- Cada bairro tem um preço/m² próprio, maior perto do centro; o preço final
+  tem cauda longa (log-normal) e alguns erros de digitação (outliers).
+- Descrições, comodidades e pontos de interesse seguem o formato do CSV
+  original (listas serializadas pelo Python, `<br>` nas descrições) e os
+  imóveis mais caros usam mais termos de luxo.
+- Há valores faltando em várias colunas, como no dataset real.
+
+A geração é feita em blocos (memória limitada ao bloco) e é reprodutível:
+o mesmo `seed` gera o mesmo CSV, com qualquer tamanho de bloco (cada lote
+fixo de LOTE_SORTEIO linhas tem o seu próprio gerador aleatório).
+
+Uso:
+    python benchmarks/dados_sinteticos.py 1000000 --saida anuncios_1m.csv
+"""
+import argparse
+import math
+import os
+import sys
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from core.geometry import load_geometry  # noqa: E402
+from core.spatial import load_polygon_index  # noqa: E402
+
+# O GeoJSON dos bairros que acompanha o repositório
+GEOJSON_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'curitiba_bairros.geojson')
+
+# Linhas de cada lote com o seu próprio gerador aleatório (a unidade do
+# sorteio: os blocos gravados são sempre lotes inteiros)
+LOTE_SORTEIO = 100_000
+
+# Colunas na ordem do CSV original
+COLUNAS = [
+    'usableAreas', 'totalAreas', 'suites', 'bathrooms', 'bedrooms', 'parkingSpaces', 'amenities',
+    'description', 'title', 'zipCode', 'lon', 'lat', 'street', 'neighborhood', 'poisList',
+    'yearlyIptu', 'monthlyCondoFee', 'price',
+]
+
+# Centro de Curitiba (Praça Tiradentes): o preço/m² cai com a distância
+CENTRO = (-49.2713, -25.4284)
+
+# Comodidades e a chance de cada uma num imóvel comum e num de luxo
+COMODIDADES = {
+    'GATED_COMMUNITY': (0.45, 0.90), 'ELEVATOR': (0.55, 0.95), 'PARTY_HALL': (0.40, 0.85),
+    'BARBECUE_GRILL': (0.35, 0.80), 'PLAYGROUND': (0.30, 0.60), 'POOL': (0.12, 0.70),
+    'GYM': (0.15, 0.75), 'SAUNA': (0.05, 0.45), 'FURNISHED': (0.10, 0.35), 'BALCONY': (0.35, 0.80),
+    'SPORTS_COURT': (0.08, 0.40), 'GOURMET_SPACE': (0.10, 0.65), 'LAUNDRY': (0.40, 0.55),
+    'AIR_CONDITIONING': (0.08, 0.50), 'CONCIERGE_24H': (0.15, 0.80), 'PETS_ALLOWED': (0.30, 0.45),
+}
+
+# Pontos de interesse próximos (prefixo do tipo, como no CSV original) e a chance de cada um
+PONTOS_INTERESSE = {
+    'BS:Estação Tubo': 0.55, 'BS:Ponto de Ônibus': 0.85, 'SM:Supermercado': 0.80, 'SC:Escola': 0.70,
+    'PH:Farmácia': 0.65, 'PA:Parque': 0.30, 'HO:Hospital': 0.20, 'SH:Shopping': 0.15,
+}
+
+# Pedaços das descrições: comuns a todos e típicos dos imóveis de luxo
+TERMOS_COMUNS = [
+    'ótima localização', 'próximo ao comércio', 'sol da manhã', 'prédio com elevador', 'portaria',
+    'cozinha planejada', 'área de serviço', 'piso laminado', 'perto de escolas', 'fácil acesso',
+    'aceita financiamento', 'documentação em dia', 'condomínio baixo', 'bem iluminado', 'reformado',
+]
+TERMOS_LUXO = [
+    'cobertura', 'vista panorâmica', 'mobiliado', 'design assinado', 'porcelanato', 'piscina aquecida',
+    'espaço gourmet', 'automação', 'pé direito duplo', 'acabamento de alto padrão', 'churrasqueira a carvão',
+    'closet', 'lareira', 'adega climatizada', 'hall privativo',
+]
+ABERTURAS = ['Lindo apartamento', 'Apartamento', 'Excelente apartamento', 'Oportunidade', 'Vende-se apartamento']
+TIPOS_RUA = ['Rua', 'Avenida', 'Alameda', 'Travessa']
+
+
+def _sem_acentos(texto):
+    return ''.join(letra for letra in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(letra))
+
+
+class GeradorAnuncios:
+    """
+    Gerador de anúncios sintéticos sobre os bairros de um GeoJSON.
+
+    Os atributos de cada bairro (peso na amostra, preço/m² de referência,
+    CEP base) dependem só de `seed`; cada lote de LOTE_SORTEIO linhas usa o
+    seu próprio gerador aleatório, derivado de `seed` e do número do lote.
+    """
+
+    def __init__(self, geojson_path=GEOJSON_PATH, seed=0):
+        self.geojson_path = geojson_path
+        self.seed = seed
+        geometria = load_geometry(geojson_path)
+        self.indice = load_polygon_index(geojson_path)
+        self.nomes = np.array(geometria.names, dtype=object)
+
+        # 1. Retângulo envolvente e centro de cada bairro
+        caixas = []
+        for poligonos in geometria.polygons:
+            pontos = np.vstack([anel for poligono in poligonos for anel in poligono])
+            caixas.append((*pontos.min(axis=0), *pontos.max(axis=0)))
+        self.caixas = np.array(caixas)
+        centros = (self.caixas[:, :2] + self.caixas[:, 2:]) / 2
+
+        # 2. Atributos fixos dos bairros: os centrais são mais caros e os
+        # pesos (número de anúncios) são bem desiguais, como no dataset real
+        rng = np.random.default_rng([seed, 0])
+        distancia_km = np.hypot(
+            (centros[:, 0] - CENTRO[0]) * math.cos(math.radians(CENTRO[1])), centros[:, 1] - CENTRO[1]
+        ) * 111.32
+        self.preco_m2 = (4_500 + 9_000 * np.exp(-distancia_km / 4)) * rng.lognormal(0, 0.15, len(self.nomes))
+        self.pesos = rng.lognormal(0, 0.8, len(self.nomes)) * np.exp(-distancia_km / 12)
+
+        # Alguns polígonos do GeoJSON ficam inteiramente sob outros (o
+        # índice devolve o primeiro que contém o ponto): esses bairros não
+        # recebem anúncios, senão o sorteio por rejeição não terminaria
+        for bairro, (xmin, ymin, xmax, ymax) in enumerate(self.caixas):
+            x, y = rng.uniform(xmin, xmax, 2_000), rng.uniform(ymin, ymax, 2_000)
+            if not (self.indice.locate(x, y) == bairro).any():
+                self.pesos[bairro] = 0
+        self.pesos /= self.pesos.sum()
+        self.cep_base = rng.integers(80_010, 82_990, len(self.nomes)) * 1_000
+
+        # Variantes dos nomes sem acento e em maiúsculas (bairro escrito de outra forma)
+        self.variantes = np.array([
+            nome.upper() if i % 2 else _sem_acentos(nome) for i, nome in enumerate(self.nomes)
+        ], dtype=object)
+
+    def _coordenadas(self, rng, bairros):
+        """Um ponto dentro do polígono de cada bairro sorteado (amostragem por rejeição)."""
+        lon = np.empty(len(bairros))
+        lat = np.empty(len(bairros))
+        pendentes = np.arange(len(bairros))
+        while pendentes.size:
+            caixas = self.caixas[bairros[pendentes]]
+            x = rng.uniform(caixas[:, 0], caixas[:, 2])
+            y = rng.uniform(caixas[:, 1], caixas[:, 3])
+            aceitos = self.indice.locate(x, y) == bairros[pendentes]
+            lon[pendentes[aceitos]] = x[aceitos]
+            lat[pendentes[aceitos]] = y[aceitos]
+            pendentes = pendentes[~aceitos]
+        return lon, lat
+
+    @staticmethod
+    def _listas(rng, probabilidades, itens):
+        """
+        Listas serializadas (ex: "['POOL', 'GYM']") a partir de uma matriz
+        de probabilidades (anúncios x itens). Cada combinação de itens vira
+        texto uma única vez.
+        """
+        presentes = rng.random(probabilidades.shape) < probabilidades
+        mascaras = presentes @ (1 << np.arange(len(itens), dtype='int64'))
+        unicas, inversos = np.unique(mascaras, return_inverse=True)
+        textos = np.array([
+            str([item for j, item in enumerate(itens) if mascara >> j & 1]) for mascara in unicas.tolist()
+        ], dtype=object)
+        return textos[inversos]
+
+    def _descricoes(self, rng, luxo, bairros):
+        """Descrições com `<br>`, termos comuns e, nos imóveis de luxo, termos de luxo."""
+        n = len(luxo)
+        # Um conjunto fixo de modelos (a variedade vem da combinação com o
+        # bairro); montar um texto por linha em Python seria o gargalo
+        modelos = 400
+        rng_modelos = np.random.default_rng([self.seed, 1])
+        textos = {}
+        for tipo, termos_extra in (('comum', []), ('luxo', TERMOS_LUXO)):
+            lista = []
+            for _ in range(modelos):
+                termos = list(rng_modelos.choice(TERMOS_COMUNS, 3, replace=False))
+                if termos_extra:
+                    termos += list(rng_modelos.choice(termos_extra, 4, replace=False))
+                    rng_modelos.shuffle(termos)
+                abertura = ABERTURAS[rng_modelos.integers(len(ABERTURAS))]
+                lista.append(f"{abertura} <br> com {', '.join(termos)}")
+            textos[tipo] = np.array(lista, dtype=object)
+
+        escolhas = rng.integers(0, modelos, n)
+        base = np.where(luxo, textos['luxo'][escolhas], textos['comum'][escolhas])
+        return pd.Series(base) + ' em ' + pd.Series(self.nomes[bairros])
+
+    def gera(self, n, bloco=0):
+        """
+        Gera `n` anúncios.
+
+        Args:
+            n (int): O número de anúncios.
+            bloco (int): O número do lote (muda a semente aleatória).
+
+        Returns:
+            pd.DataFrame: Os anúncios, com as colunas de `COLUNAS`.
+        """
+        rng = np.random.default_rng([self.seed, 2, bloco])
+
+        # 1. Bairro e coordenadas dentro do polígono
+        bairros = rng.choice(len(self.nomes), size=n, p=self.pesos)
+        lon, lat = self._coordenadas(rng, bairros)
+
+        # 2. Tamanho: área útil log-normal e cômodos proporcionais a ela
+        area_util = np.clip(rng.lognormal(math.log(72), 0.45, n), 18, 1_200).round()
+        area_total = (area_util * rng.uniform(1.05, 1.45, n)).round(1)
+        quartos = np.clip(np.round(area_util / 32 + rng.normal(0, 0.6, n)), 1, 6)
+        suites = np.minimum(np.floor(rng.beta(1.2, 3, n) * (quartos + 1)), quartos)
+        banheiros = np.clip(suites + rng.integers(1, 3, n), 1, 8)
+        vagas = np.clip(np.round(area_util / 60 + rng.normal(0, 0.7, n)), 0, 6)
+
+        # 3. Preço: preço/m² do bairro, com ruído log-normal e prêmio por vaga
+        preco_m2 = self.preco_m2[bairros] * rng.lognormal(0, 0.28, n) * (1 + 0.04 * vagas)
+        preco = np.round(area_util * preco_m2, -3)
+        erros = rng.random(n)
+        preco = np.where(erros < 0.004, preco * rng.uniform(8, 20, n), preco)  # zeros a mais
+        preco = np.where((erros >= 0.004) & (erros < 0.007), np.round(rng.uniform(800, 9_000, n)), preco)  # aluguel
+        luxo = preco_m2 > np.quantile(self.preco_m2, 0.75) * 1.2
+
+        # 4. Listas (comodidades e pontos de interesse) e textos
+        chances = np.array(list(COMODIDADES.values()))
+        probabilidades = np.where(luxo[:, None], chances[:, 1], chances[:, 0])
+        comodidades = self._listas(rng, probabilidades, list(COMODIDADES))
+        pontos = self._listas(
+            rng, np.broadcast_to(np.array(list(PONTOS_INTERESSE.values())), (n, len(PONTOS_INTERESSE))),
+            list(PONTOS_INTERESSE),
+        )
+        descricoes = self._descricoes(rng, luxo, bairros)
+        titulos = pd.Series(np.array(['Apartamento', 'Apto', 'Cobertura', 'Studio'], dtype=object)[
+            np.where(luxo & (rng.random(n) < 0.3), 2, np.where(area_util < 35, 3, rng.integers(0, 2, n)))
+        ]) + ' com ' + pd.Series(quartos.astype('int64')).astype(str) + ' quartos'
+        ruas = pd.Series(np.array(TIPOS_RUA, dtype=object)[rng.integers(0, len(TIPOS_RUA), n)]) + \
+            ' ' + pd.Series(rng.integers(1, 400, n)).astype(str)
+
+        # 5. Custos fixos proporcionais ao preço
+        iptu = np.round(preco * rng.uniform(0.002, 0.006, n))
+        condominio = np.round(area_util * rng.uniform(6, 14, n) * np.where(luxo, 1.6, 1.0))
+
+        df = pd.DataFrame({
+            'usableAreas': area_util,
+            'totalAreas': area_total,
+            'suites': suites,
+            'bathrooms': banheiros,
+            'bedrooms': quartos,
+            'parkingSpaces': vagas,
+            'amenities': comodidades,
+            'description': descricoes,
+            'title': titulos,
+            'zipCode': self.cep_base[bairros] + rng.integers(0, 999, n),
+            'lon': lon,
+            'lat': lat,
+            'street': ruas,
+            'neighborhood': self.nomes[bairros],
+            'poisList': pontos,
+            'yearlyIptu': iptu,
+            'monthlyCondoFee': condominio,
+            'price': preco,
+        })
+
+        # 6. Valores faltando e bairros escritos de outra forma
+        faltando = {
+            'totalAreas': 0.20, 'suites': 0.08, 'parkingSpaces': 0.05, 'yearlyIptu': 0.25,
+            'monthlyCondoFee': 0.10, 'description': 0.01, 'price': 0.002,
+        }
+        for coluna, fracao in faltando.items():
+            df.loc[rng.random(n) < fracao, coluna] = np.nan
+        sem_local = rng.random(n) < 0.01
+        df.loc[sem_local, ['lon', 'lat']] = np.nan
+        variantes = rng.random(n) < 0.03
+        df.loc[variantes, 'neighborhood'] = self.variantes[bairros[variantes]]
+
+        # Contagens e valores inteiros sem o '.0' no CSV
+        for coluna in ['usableAreas', 'suites', 'bathrooms', 'bedrooms', 'parkingSpaces', 'yearlyIptu', 'monthlyCondoFee']:
+            df[coluna] = df[coluna].astype('Int64')
+        return df[COLUNAS]
+
+    def escreve_csv(self, caminho, n, tamanho_bloco=500_000):
+        """
+        Grava `n` anúncios em CSV, bloco a bloco.
+
+        Os anúncios são sorteados em lotes de LOTE_SORTEIO linhas, cada um
+        com a sua semente; `tamanho_bloco` só define quantos lotes são
+        gravados de cada vez (arredondado para lotes inteiros), então o
+        arquivo é o mesmo com qualquer tamanho de bloco.
+
+        Returns:
+            str: O caminho do arquivo.
+        """
+        temporario = f'{caminho}.{os.getpid()}.tmp'
+        lotes = list(enumerate(range(0, n, LOTE_SORTEIO)))
+        por_bloco = max(1, tamanho_bloco // LOTE_SORTEIO)
+        for primeiro in range(0, len(lotes), por_bloco):
+            df = pd.concat([
+                self.gera(min(LOTE_SORTEIO, n - inicio), lote) for lote, inicio in lotes[primeiro:primeiro + por_bloco]
+            ], ignore_index=True)
+            df.to_csv(temporario, mode='w' if primeiro == 0 else 'a', header=primeiro == 0, index=False)
+        os.replace(temporario, caminho)
+        return caminho
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um CSV de anúncios sintéticos de Curitiba.")
+    parser.add_argument('linhas', type=int, help="O número de anúncios")
+    parser.add_argument('--saida', help="O arquivo CSV (padrão: anuncios_<linhas>.csv)")
+    parser.add_argument('--geojson', default=GEOJSON_PATH, help="O GeoJSON dos bairros")
+    parser.add_argument('--seed', type=int, default=0, help="A semente aleatória (padrão: 0)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    caminho = args.saida or f'anuncios_{args.linhas}.csv'
+    GeradorAnuncios(args.geojson, args.seed).escreve_csv(caminho, args.linhas)
+    print(f"{args.linhas:,} anúncios gravados em {caminho} ({time.perf_counter() - inicio:.1f}s).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+# benchmarks/executa.py
+"""
+Mede a leitura do CSV e cada análise em várias escalas de dados sintéticos
+(ver dados_sinteticos.py): tempo real, tempo de CPU, pico de memória
+(tracemalloc) e vazão em linhas por segundo. Roda sem internet.
+
+Cada análise é executada a partir do DataFrame, sem os agregados
+compartilhados do app, e o resultado é codificado como no relatório (PNG
+para os gráficos, HTML para os mapas). Os CSVs gerados ficam em `--dados`
+e são reaproveitados nas próximas execuções.
+
+Uso:
+    python benchmarks/executa.py --linhas 10000 100000 --saida resultados.jsonl
+    python benchmarks/executa.py --base resultados.jsonl --tolerancia 0.25
+
+Com `--base`, o script termina com código 1 se alguma etapa ficar mais
+lenta que na execução de referência além da tolerância.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')  # Sem janelas: as figuras só são rasterizadas
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from core.figure_cache import render_png  # noqa: E402
+from core.instrumentation import get_recorder, measure  # noqa: E402
+from core.loader import read_listings  # noqa: E402
+from core.streaming import summarize_csv  # noqa: E402
+
+from analyses.analysis_001 import run_analysis_001  # noqa: E402
+from analyses.analysis_heatmap import run_heatmap  # noqa: E402
+from analyses.analysis_002 import run_analysis_002  # noqa: E402
+from analyses.analysis_003 import run_analysis_003  # noqa: E402
+from analyses.analysis_004 import run_analysis_004  # noqa: E402
+from analyses.analysis_005 import run_analysis_005  # noqa: E402
+from analyses.analysis_006 import run_analysis_006  # noqa: E402
+from analyses.analysis_007 import run_analysis_007  # noqa: E402
+from analyses.analysis_008 import run_analysis_008  # noqa: E402
+from analyses.analysis_009 import run_analysis_009  # noqa: E402
+from analyses.analysis_010 import run_analysis_010, run_mapa_calor  # noqa: E402
+from analyses.analysis_011 import run_analysis_011  # noqa: E402
+from analyses.analysis_012 import run_analysis_012  # noqa: E402
+
+from dados_sinteticos import GEOJSON_PATH, GeradorAnuncios  # noqa: E402
+
+# Escalas padrão (1 milhão e 10 milhões de linhas precisam de alguns GB de memória)
+ESCALAS = [10_000, 100_000]
+
+# Cada análise como o app a chama, a partir do DataFrame: id -> funcao(df, geojson_path)
+ANALISES = {
+    'heatmap': lambda df, geojson_path: run_heatmap(df),
+    '001': lambda df, geojson_path: run_analysis_001(df),
+    '002': lambda df, geojson_path: run_analysis_002(df),
+    '003': lambda df, geojson_path: run_analysis_003(df),
+    '004': lambda df, geojson_path: run_analysis_004(df),
+    '005': lambda df, geojson_path: run_analysis_005(df),
+    '006': lambda df, geojson_path: run_analysis_006(df),
+    '007': lambda df, geojson_path: run_analysis_007(df, geojson_path),
+    'calor': lambda df, geojson_path: run_mapa_calor(df),
+    '008': lambda df, geojson_path: run_analysis_008(df),
+    '009': lambda df, geojson_path: run_analysis_009(df),
+    '010': lambda df, geojson_path: run_analysis_010(df),
+    '011': lambda df, geojson_path: run_analysis_011(df, geojson_path),
+    '012': lambda df, geojson_path: run_analysis_012(df),
+}
+
+# Diferença mínima (em segundos) para uma etapa contar como regressão: abaixo
+# disso, a variação é ruído da medição
+RUIDO_S = 0.05
+
+
+def prepara_csv(linhas, pasta, seed=0, geojson_path=GEOJSON_PATH):
+    """O CSV sintético com `linhas` anúncios, gerado só na primeira vez."""
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, f'anuncios_{linhas}_s{seed}.csv')
+    if not os.path.exists(caminho):
+        inicio = time.perf_counter()
+        GeradorAnuncios(geojson_path, seed).escreve_csv(caminho, linhas)
+        print(f"  CSV sintético gerado em {time.perf_counter() - inicio:.1f}s: {caminho}")
+    return caminho
+
+
+def codifica(resultado):
+    """PNG para as figuras do matplotlib, HTML para os mapas do folium."""
+    if isinstance(resultado, Figure):
+        return render_png(resultado)
+    return resultado.get_root().render().encode('utf-8')
+
+
+def mede_escala(caminho_csv, linhas, analises, geojson_path=GEOJSON_PATH, repeticoes=1):
+    """
+    Mede a leitura, o resumo do modo streaming e cada análise sobre um CSV.
+
+    Returns:
+        list: Os registros das etapas (ver core.instrumentation), com a
+        escala em 'escala'.
+    """
+    registro = get_recorder()
+    registro.clear()
+    with registro.context(escala=linhas):
+        for repeticao in range(repeticoes):
+            # 1. Leitura do CSV completo (a etapa 'leitura_csv' é medida pelo loader)
+            df = read_listings(caminho_csv)
+            summarize_csv(caminho_csv)
+
+            # 2. Cada análise, do DataFrame ao arquivo final
+            for analysis_id in analises:
+                try:
+                    with measure('analise', analise=analysis_id, linhas=len(df)):
+                        resultado = ANALISES[analysis_id](df, geojson_path)
+                    with measure('codificacao', analise=analysis_id, linhas=len(df)):
+                        codifica(resultado)
+                except Exception as e:
+                    if repeticao == 0:
+                        print(f"  {analysis_id}: erro ({type(e).__name__}: {e})")
+            del df
+    return registro.snapshot()
+
+
+def resume(registros):
+    """
+    Uma linha por (escala, análise, etapa), com o menor tempo entre as
+    repetições, o pico de memória e a vazão.
+    """
+    tabela = pd.DataFrame(registros)
+    if 'analise' not in tabela.columns:
+        tabela['analise'] = None
+    tabela['analise'] = tabela['analise'].fillna('-')
+    if 'erro' in tabela.columns:
+        tabela = tabela[tabela['erro'].isna()]
+    resumo = tabela.groupby(['escala', 'analise', 'etapa'], sort=False).agg(
+        tempo_s=('tempo_s', 'min'), cpu_s=('cpu_s', 'min'),
+        pico_mb=('pico_bytes', lambda pico: pico.max() / 1024 ** 2), linhas=('linhas', 'max'),
+    ).reset_index()
+    resumo['linhas_por_s'] = resumo['linhas'] / resumo['tempo_s'].where(resumo['tempo_s'] > 0)
+    return resumo
+
+
+def compara(resumo, base, tolerancia=0.25):
+    """
+    As etapas mais lentas que na execução de referência: tempo acima de
+    `(1 + tolerancia)` vezes o da base e mais de RUIDO_S segundos a mais.
+
+    Args:
+        resumo (pd.DataFrame): A saída de `resume` desta execução.
+        base (pd.DataFrame): A saída de `resume` da execução de referência.
+        tolerancia (float): A piora relativa aceita.
+
+    Returns:
+        pd.DataFrame: As regressões, com os tempos das duas execuções.
+    """
+    chaves = ['escala', 'analise', 'etapa']
+    juntos = resumo.merge(base[chaves + ['tempo_s']], on=chaves, suffixes=('', '_base'))
+    piorou = (juntos['tempo_s'] > juntos['tempo_s_base'] * (1 + tolerancia)) & \
+        (juntos['tempo_s'] - juntos['tempo_s_base'] > RUIDO_S)
+    return juntos.loc[piorou, chaves + ['tempo_s_base', 'tempo_s']]
+
+
+def le_jsonl(caminho):
+    with open(caminho, encoding='utf-8') as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a leitura e as análises em dados sintéticos.")
+    parser.add_argument('--linhas', type=int, nargs='+', default=ESCALAS,
+                        help="As escalas, em número de anúncios (padrão: 10000 100000)")
+    parser.add_argument('--analises', nargs='+', choices=list(ANALISES), help="Mede só estas análises")
+    parser.add_argument('--repeticoes', type=int, default=1, help="Execuções por escala (vale a mais rápida)")
+    parser.add_argument('--dados', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dados'),
+                        help="A pasta dos CSVs sintéticos (padrão: benchmarks/dados)")
+    parser.add_argument('--seed', type=int, default=0, help="A semente dos dados sintéticos")
+    parser.add_argument('--geojson', default=GEOJSON_PATH, help="O GeoJSON dos bairros")
+    parser.add_argument('--sem-memoria', action='store_true', help="Não mede o pico de memória (mais rápido)")
+    parser.add_argument('--saida', help="Grava os registros de todas as etapas em JSON lines")
+    parser.add_argument('--base', help="JSON lines de uma execução de referência, para comparar")
+    parser.add_argument('--tolerancia', type=float, default=0.25, help="Piora relativa aceita (padrão: 0.25)")
+    args = parser.parse_args()
+
+    analises = args.analises or list(ANALISES)
+    ambiente = {
+        'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+        'plataforma': platform.platform(), 'cpus': os.cpu_count(), 'seed': args.seed,
+    }
+
+    # Os CSVs são gerados antes de ligar o tracemalloc, que deixaria a geração mais lenta
+    caminhos = {linhas: prepara_csv(linhas, args.dados, args.seed, args.geojson) for linhas in args.linhas}
+    get_recorder().enable_memory(not args.sem_memoria)
+
+    registros = []
+    for linhas, caminho in caminhos.items():
+        print(f"Escala: {linhas:,} linhas")
+        registros += mede_escala(caminho, linhas, analises, args.geojson, args.repeticoes)
+
+    resumo = resume(registros)
+    with pd.option_context('display.width', 160, 'display.max_rows', None, 'display.float_format', '{:,.3f}'.format):
+        print(resumo.to_string(index=False))
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            for registro in registros:
+                f.write(json.dumps(registro | ambiente, ensure_ascii=False, default=str) + '\n')
+        print(f"Registros gravados em {args.saida}.")
+
+    if args.base:
+        regressoes = compara(resumo, resume(le_jsonl(args.base)), args.tolerancia)
+        if len(regressoes):
+            print(f"Etapas mais lentas que a referência (tolerância de {args.tolerancia:.0%}):")
+            print(regressoes.to_string(index=False))
+            sys.exit(1)
+        print("Nenhuma regressão em relação à referência.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# tests/conftest.py
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# O app importa os seus módulos como `core.x` e `analyses.x` (a partir de app/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from core.loader import read_listings  # noqa: E402
+
+BAIRROS = ['Batel', 'Centro', 'Água Verde', 'Bigorrilho', 'Portão', 'Cajuru']
+
+
+def gera_anuncios(n, seed=0):
+    """
+    Anúncios pequenos e variados (com nulos, bairros repetidos e preços de
+    cauda longa), lidos pelo mesmo loader do app para ter os mesmos tipos.
+    """
+    rng = np.random.default_rng(seed)
+    area = rng.integers(25, 300, n).astype('float64')
+    df = pd.DataFrame({
+        'title': [f'Apartamento {i % (n // 2 or 1)}' for i in range(n)],
+        'street': rng.choice(['Rua A', 'Rua B', 'Av. C'], n),
+        'neighborhood': rng.choice(BAIRROS, n),
+        'price': np.round(area * rng.lognormal(8.8, 0.4, n), -3),
+        'usableAreas': area,
+        'totalAreas': area * 1.2,
+        'bedrooms': rng.integers(1, 5, n),
+        'parkingSpaces': rng.integers(0, 4, n),
+        'suites': rng.integers(0, 3, n),
+        'bathrooms': rng.integers(1, 4, n),
+        'monthlyCondoFee': rng.normal(800, 200, n).round(),
+    })
+    for coluna in ['suites', 'parkingSpaces', 'monthlyCondoFee']:
+        df.loc[rng.random(n) < 0.1, coluna] = np.nan
+    return read_listings(io.StringIO(df.to_csv(index=False)))
+
+
+@pytest.fixture
+def anuncios():
+    return gera_anuncios(5_000)
+
+
+@pytest.fixture(scope='session')
+def muitos_anuncios():
+    # Grande o bastante para os esboços de quantis compactarem de verdade
+    return gera_anuncios(60_000, seed=1)
@@ -0,0 +1,51 @@
+# tests/test_correlation.py
+import numpy as np
+
+from core.correlation import CorrelationStats
+
+
+def _numericas(df):
+    return df.select_dtypes(include=['number']).astype('float64')
+
+
+def test_blocos_iguais_ao_corr_do_pandas(anuncios):
+    df = _numericas(anuncios)
+    stats = CorrelationStats.from_frame(df, block_rows=333)
+
+    np.testing.assert_allclose(stats.corr().to_numpy(), df.corr().to_numpy(), atol=1e-10)
+
+
+def test_merge_com_deslocamentos_diferentes(anuncios):
+    df = _numericas(anuncios)
+    # As metades têm médias diferentes, então cada uma usa outro deslocamento
+    ordem = df.sort_values('price')
+    stats = CorrelationStats.from_frame(ordem.iloc[:2_000])
+    stats.merge(CorrelationStats.from_frame(ordem.iloc[2_000:]))
+
+    assert stats.rows == len(df)
+    np.testing.assert_allclose(stats.corr().to_numpy(), df.corr().to_numpy(), atol=1e-10)
+
+
+def test_corr_com_nulos_preenchidos(anuncios):
+    df = _numericas(anuncios)
+    medianas = df.median()
+    stats = CorrelationStats.from_frame(df)
+
+    esperada = df.fillna(medianas).corr()
+    np.testing.assert_allclose(stats.corr(fill=medianas).to_numpy(), esperada.to_numpy(), atol=1e-10)
+    linha = stats.price_row(fill=medianas)
+    np.testing.assert_allclose(linha.to_numpy(), esperada['price'].drop('price')[linha.index].to_numpy(), atol=1e-10)
+    assert linha.is_monotonic_decreasing
+
+
+def test_remove_igual_a_recalcular(anuncios):
+    df = _numericas(anuncios)
+    retirados = np.random.default_rng(5).random(len(df)) < 0.25
+    stats = CorrelationStats.from_frame(df)
+    stats.remove(df[retirados])
+
+    restante = df[~retirados]
+    assert stats.rows == len(restante)
+    np.testing.assert_allclose(stats.corr().to_numpy(), restante.corr().to_numpy(), atol=1e-9)
+    np.testing.assert_allclose(stats.corr(fill=restante.median()).to_numpy(),
+                               restante.fillna(restante.median()).corr().to_numpy(), atol=1e-9)
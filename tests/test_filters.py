@@ -0,0 +1,46 @@
+# tests/test_filters.py
+import numpy as np
+import pytest
+
+from core.cache import DatasetEntry
+from core.filters import (FILTER_COLUMNS, BitmapIndex, SortedIndex, _desempacota, _empacota,
+                          build_filter_index, filtered_view)
+
+
+@pytest.mark.parametrize('n', [0, 1, 63, 64, 65, 1_000])
+def test_empacota_e_desempacota(n):
+    mascara = np.random.default_rng(n).random(n) < 0.3
+    bitmap = _empacota(mascara)
+
+    assert bitmap.dtype == np.uint64 and len(bitmap) == (n + 63) // 64
+    np.testing.assert_array_equal(_desempacota(bitmap, n), mascara)
+
+
+def test_mascara_igual_ao_filtro_do_pandas(anuncios):
+    indice = build_filter_index(anuncios)
+    assert isinstance(indice.indices['bedrooms'], BitmapIndex)
+    assert isinstance(indice.indices['price'], SortedIndex)
+
+    casos = [
+        ({'bedrooms': [2, 3]}, anuncios['bedrooms'].isin([2, 3])),
+        ({'suites': (1, 2)}, anuncios['suites'].between(1, 2)),
+        ({'neighborhood': ['Batel', 'Centro']}, anuncios['neighborhood'].isin(['Batel', 'Centro'])),
+        # Faixa estreita (marca as linhas de dentro) e larga (marca as de fora)
+        ({'price': (200_000, 400_000)}, anuncios['price'].between(200_000, 400_000)),
+        ({'price': (0, 2_000_000), 'parkingSpaces': [0]},
+         anuncios['price'].between(0, 2_000_000) & (anuncios['parkingSpaces'] == 0)),
+    ]
+    for filtros, esperado in casos:
+        np.testing.assert_array_equal(indice.mask(filtros), esperado.fillna(False).to_numpy(dtype=bool))
+
+
+def test_visoes_contam_no_tamanho_do_dataset(anuncios):
+    dataset = DatasetEntry('teste', df=anuncios)
+    indice = build_filter_index(dataset.frame(FILTER_COLUMNS))
+    antes = dataset.nbytes
+
+    visao = filtered_view(dataset, indice, {'bedrooms': [1]})
+    recorte = visao.frame(['price', 'usableAreas'])
+
+    assert len(recorte) == int((anuncios['bedrooms'] == 1).sum())
+    assert dataset.nbytes >= antes + recorte.memory_usage(deep=True).sum()
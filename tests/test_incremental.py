@@ -0,0 +1,81 @@
+# tests/test_incremental.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.cache import DatasetEntry
+from core.incremental import (IDENTITY_COLUMNS, ListingVersion, append_listings, listing_ids,
+                              maintained_summary, version_key)
+from core.store import ColumnarStore
+from core.streaming import STREAM_COLUMNS, StreamingSummary
+
+pytestmark = pytest.mark.skipif(not ColumnarStore.available(), reason="requer o pyarrow")
+
+
+def _resumo(df):
+    return StreamingSummary().update(df[[col for col in STREAM_COLUMNS if col in df.columns]], ids=listing_ids(df))
+
+
+def test_upsert_igual_a_recalcular(anuncios, tmp_path):
+    base = anuncios.drop_duplicates(IDENTITY_COLUMNS).reset_index(drop=True)
+    store = ColumnarStore(str(tmp_path))
+    store.ingest('base', base)
+    versao = ListingVersion.from_store(store, 'base')
+
+    # Atualização: 300 anúncios existentes com preço novo e 200 anúncios novos
+    alterados = base.iloc[::10].head(300).copy()
+    alterados['price'] = alterados['price'] * 1.1
+    novos = base.tail(200).copy()
+    novos['title'] = novos['title'] + ' (novo)'
+    delta = pd.concat([alterados, novos], ignore_index=True)
+
+    chave = version_key('base', 'delta')
+    nova = versao.apply(store, delta, chave)
+
+    # O dataset esperado: as linhas não alteradas, na ordem, e depois a atualização
+    esperado = pd.concat([base.drop(alterados.index), delta], ignore_index=True)
+    lido = store.read(chave)
+    pd.testing.assert_frame_equal(lido, esperado[lido.columns], check_dtype=False, check_categorical=False)
+
+    # O resumo atualizado bate com o resumo montado do zero
+    refeito = _resumo(esperado)
+    assert nova.summary.rows == refeito.rows == len(esperado)
+    np.testing.assert_allclose(nova.summary.price_moments.mean, refeito.price_moments.mean, rtol=1e-12)
+    np.testing.assert_allclose(nova.summary.price_moments.m2, refeito.price_moments.m2, rtol=1e-9)
+    pd.testing.assert_series_equal(nova.summary.mean_price_by('bedrooms', 1, 6),
+                                   refeito.mean_price_by('bedrooms', 1, 6), rtol=1e-12)
+    np.testing.assert_allclose(nova.summary.correlation_matrix().to_numpy(),
+                               refeito.correlation_matrix().to_numpy(), atol=1e-9)
+    assert nova.summary.listings_by_neighborhood.to_dict() == refeito.listings_by_neighborhood.to_dict()
+
+    # As posições vigentes são as mesmas de um estado montado a partir do disco
+    assert nova.total == len(base) + len(delta)
+    assert dict(nova.positions) == dict(ListingVersion.from_store(store, chave).positions)
+    # A versão anterior continua válida
+    assert versao.summary.rows == len(base)
+
+
+def test_sem_upsert_acrescenta_as_repetidas(anuncios, tmp_path):
+    base = anuncios.drop_duplicates(IDENTITY_COLUMNS).reset_index(drop=True)
+    store = ColumnarStore(str(tmp_path))
+    store.ingest('base', base)
+
+    delta = base.head(50)
+    nova = ListingVersion.from_store(store, 'base').apply(store, delta, 'repetidas', upsert=False)
+
+    assert nova.summary.rows == store.rows('repetidas') == len(base) + len(delta)
+
+
+def test_versao_atualizada_usa_o_resumo_mantido(anuncios, tmp_path):
+    base = anuncios.drop_duplicates(IDENTITY_COLUMNS).reset_index(drop=True)
+    store = ColumnarStore(str(tmp_path))
+    store.ingest('base', base)
+    dataset = DatasetEntry('base', store=store)
+    assert maintained_summary(dataset) is None
+
+    atualizado = append_listings(dataset, base.head(100).assign(price=lambda df: df['price'] * 2), 'v1')
+    resumo = maintained_summary(atualizado)
+    assert resumo is atualizado.artifacts['versao'].summary
+    assert resumo.rows == len(base)
+    # Outra sessão (sem o estado em memória) remonta o mesmo resumo do disco
+    assert maintained_summary(DatasetEntry('v1', store=store)).rows == len(base)
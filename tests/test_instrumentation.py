@@ -0,0 +1,37 @@
+# tests/test_instrumentation.py
+import tracemalloc
+
+from core.instrumentation import StageRecorder
+
+
+def test_dono_que_nao_renova_o_pedido_expira():
+    registro = StageRecorder(owner_ttl=60)
+    try:
+        registro.enable_memory(True, owner='aba fechada')
+        assert tracemalloc.is_tracing()
+
+        # A sessão fechada não volta a chamar; depois do prazo, a chamada de
+        # qualquer outra sessão a esquece
+        registro._memoria['aba fechada'] -= 120
+        registro.enable_memory(False, owner='outra')
+        assert not tracemalloc.is_tracing()
+    finally:
+        registro.enable_memory(False)
+
+
+def test_registros_separados_por_sessao():
+    registro = StageRecorder()
+    registro.set_context(sessao='a')
+    with registro.measure('leitura_csv', linhas=10):
+        pass
+    with registro.context(analise='002', sessao='b'):
+        with registro.measure('render_png'):
+            pass
+
+    assert [r['etapa'] for r in registro.snapshot('a')] == ['leitura_csv']
+    assert [(r['etapa'], r['analise']) for r in registro.snapshot('b')] == [('render_png', '002')]
+    assert registro.to_jsonl('a').count('\n') == 1
+
+    # Limpar os registros de uma sessão não apaga os das outras
+    registro.clear('a')
+    assert registro.snapshot('a') == [] and len(registro.snapshot()) == 1
@@ -0,0 +1,17 @@
+# tests/test_maps.py
+import pandas as pd
+import pytest
+
+from analyses.analysis_007 import prepara_propriedades
+
+
+def test_propriedades_sem_precos_lancam_value_error():
+    with pytest.raises(ValueError, match="nenhum bairro"):
+        prepara_propriedades(pd.Series(dtype='float64'), ['Batel', 'Centro'])
+
+
+def test_propriedades_marcam_bairros_sem_anuncios():
+    escala, propriedades = prepara_propriedades(pd.Series({'Batel': 12_000.0, 'Centro': 8_000.0}),
+                                                ['Batel', 'Centro', 'Cajuru'])
+    assert propriedades['Cajuru'] == {'cor': 'black', 'preco_m2': 'Sem anúncios'}
+    assert propriedades['Batel']['cor'] != propriedades['Centro']['cor']
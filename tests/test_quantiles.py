@@ -0,0 +1,46 @@
+# tests/test_quantiles.py
+import numpy as np
+import pytest
+
+from core.quantiles import build_quantile_sketches
+from core.sketches import KLLSketch
+
+
+def _rank(valores, x):
+    valores = valores[~np.isnan(valores)]
+    return (valores <= x).mean()
+
+
+@pytest.mark.parametrize('epsilon', [0.005, 0.01, 0.05])
+def test_k_for_error_respeita_o_erro(epsilon):
+    k = KLLSketch.k_for_error(epsilon)
+    assert KLLSketch(k).epsilon <= epsilon
+    assert KLLSketch(k - 1).epsilon > epsilon or k == 8
+
+
+def test_quantis_dentro_do_erro(muitos_anuncios):
+    esbocos = build_quantile_sketches(muitos_anuncios, epsilon=0.01)
+    precos = muitos_anuncios['price'].to_numpy(dtype='float64')
+
+    for q in [0.01, 0.25, 0.5, 0.75, 0.99]:
+        assert abs(_rank(precos, esbocos.quantile('price', q)) - q) <= 2 * esbocos.epsilon
+    mediana = esbocos.medians(['usableAreas'])['usableAreas']
+    assert abs(_rank(muitos_anuncios['usableAreas'].to_numpy(dtype='float64'), mediana) - 0.5) <= 2 * esbocos.epsilon
+
+
+def test_quantil_de_uma_faixa_e_de_varios_bairros(muitos_anuncios):
+    esbocos = build_quantile_sketches(muitos_anuncios, epsilon=0.01)
+    precos = muitos_anuncios['price'].to_numpy(dtype='float64')
+
+    # Só os valores em [low, high), como nos cortes de outliers
+    low, high = np.quantile(precos, [0.1, 0.9])
+    faixa = precos[(precos >= low) & (precos < high)]
+    mediana = esbocos.quantile('price', 0.5, low=low, high=high)
+    assert abs(_rank(faixa, mediana) - 0.5) <= 4 * esbocos.epsilon * len(precos) / len(faixa)
+
+    # A combinação dos esboços de dois bairros responde pelo conjunto deles
+    bairros = ['Batel', 'Centro']
+    dos_bairros = precos[muitos_anuncios['neighborhood'].isin(bairros).to_numpy()]
+    q90 = esbocos.quantile('price', 0.9, bairros=bairros)
+    assert esbocos.sketch('price', bairros).n == len(dos_bairros)
+    assert abs(_rank(dos_bairros, q90) - 0.9) <= 2 * esbocos.epsilon
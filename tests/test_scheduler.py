@@ -0,0 +1,21 @@
+# tests/test_scheduler.py
+import time
+
+from core.scheduler import BackgroundScheduler
+
+
+def test_concluidas_soltam_a_funcao_e_sao_esquecidas():
+    agendador = BackgroundScheduler(workers=1, max_done=3)
+    futuros = [agendador.submit(i, lambda i=i: i * 2, owner='sessao', generation='a') for i in range(6)]
+
+    assert [futuro.result(timeout=5) for futuro in futuros] == [0, 2, 4, 6, 8, 10]
+    # A tarefa é registrada como concluída logo depois do resultado
+    agendador.submit('fim', lambda: None).result(timeout=5)
+    limite = time.monotonic() + 5
+    while 'fim' not in agendador._concluidas and time.monotonic() < limite:
+        time.sleep(0.01)
+
+    assert len(agendador._jobs) == 3
+    assert all(job.fn is None for job in agendador._jobs.values())
+    # Pedir de novo uma tarefa esquecida executa a função outra vez
+    assert agendador.submit(0, lambda: 'de novo').result(timeout=5) == 'de novo'
@@ -0,0 +1,78 @@
+# tests/test_sketches.py
+import numpy as np
+
+from core.sketches import KLLSketch, RunningMoments
+
+
+def _erro_de_rank(valores, quantis, probabilidades):
+    # Distância (fração das linhas) entre o rank de cada quantil e o pedido
+    ordenados = np.sort(valores)
+    ranks = np.searchsorted(ordenados, quantis, side='right') / len(ordenados)
+    return np.abs(ranks - probabilidades).max()
+
+
+def test_running_moments_em_blocos_igual_ao_calculo_direto():
+    rng = np.random.default_rng(1)
+    valores = rng.lognormal(13, 0.6, (3_000, 2))
+    valores[rng.random(valores.shape) < 0.05] = np.nan
+
+    # Blocos de tamanhos diferentes, somados com update e com merge
+    momentos = RunningMoments(2)
+    for bloco in np.array_split(valores[:2_000], 7):
+        momentos.update(bloco)
+    outro = RunningMoments(2).update(valores[2_000:])
+    momentos.merge(outro)
+
+    np.testing.assert_array_equal(momentos.n, (~np.isnan(valores)).sum(axis=0))
+    np.testing.assert_allclose(momentos.mean, np.nanmean(valores, axis=0), rtol=1e-12)
+    np.testing.assert_allclose(momentos.std, np.nanstd(valores, axis=0, ddof=1), rtol=1e-9)
+
+
+def test_kll_mesclado_dentro_do_erro():
+    rng = np.random.default_rng(2)
+    valores = rng.lognormal(8, 0.8, 60_000)
+    probabilidades = np.array([0.01, 0.25, 0.5, 0.75, 0.99])
+
+    esbocos = [KLLSketch(200, seed=i).update(bloco) for i, bloco in enumerate(np.array_split(valores, 6))]
+    combinado = esbocos[0]
+    for esboco in esbocos[1:]:
+        combinado.merge(esboco)
+
+    assert combinado.n == len(valores)
+    assert (combinado.min, combinado.max) == (valores.min(), valores.max())
+    assert _erro_de_rank(valores, combinado.quantile(probabilidades), probabilidades) <= 2 * combinado.epsilon
+
+
+def test_running_moments_remove_igual_ao_restante():
+    rng = np.random.default_rng(3)
+    valores = rng.normal(500_000, 150_000, (4_000, 2))
+    valores[rng.random(valores.shape) < 0.05] = np.nan
+    retirados = rng.random(len(valores)) < 0.3
+
+    momentos = RunningMoments(2).update(valores)
+    momentos.remove(valores[retirados])
+    restante = valores[~retirados]
+
+    np.testing.assert_array_equal(momentos.n, (~np.isnan(restante)).sum(axis=0))
+    np.testing.assert_allclose(momentos.mean, np.nanmean(restante, axis=0), rtol=1e-10)
+    np.testing.assert_allclose(momentos.std, np.nanstd(restante, axis=0, ddof=1), rtol=1e-8)
+
+
+def test_kll_remove_dentro_do_erro():
+    rng = np.random.default_rng(4)
+    valores = rng.lognormal(8, 0.8, 50_000)
+    retirados = valores > np.quantile(valores, 0.8)
+    probabilidades = np.array([0.1, 0.5, 0.9])
+
+    esboco = KLLSketch(200, seed=0).update(valores)
+    esboco.remove(valores[retirados])
+    # Mesclar com um esboço que também tem remoções mantém as duas partes
+    outro = KLLSketch(200, seed=1).update(valores[:1_000])
+    outro.remove(valores[:1_000])
+    esboco.merge(outro)
+
+    restante = valores[~retirados]
+    assert esboco.n == len(restante)
+    # O erro de rank é relativo a tudo o que entrou mais o que foi retirado
+    tolerancia = 2 * esboco.epsilon * (len(valores) + retirados.sum() + 2_000) / len(restante)
+    assert _erro_de_rank(restante, esboco.quantile(probabilidades), probabilidades) <= tolerancia
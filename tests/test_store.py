@@ -0,0 +1,26 @@
+# tests/test_store.py
+import pytest
+
+from core.cache import DatasetCache
+from core.incremental import IDENTITY_COLUMNS, append_listings
+from core.store import ColumnarStore
+
+pytestmark = pytest.mark.skipif(not ColumnarStore.available(), reason="requer o pyarrow")
+
+
+def test_arquivos_em_uso_nao_sao_apagados(anuncios, tmp_path):
+    store = ColumnarStore(str(tmp_path), max_files=1)
+    cache = DatasetCache(max_entries=2, store=store)
+    partes = [anuncios.iloc[inicio:inicio + 1_000] for inicio in range(0, 4_000, 1_000)]
+
+    # Um dataset em cache e a versão atualizada dele, e depois outros dois
+    # arquivos: só o último usado caberia no limite do armazenamento
+    base = cache.load(b'base', lambda _: partes[0].drop_duplicates(IDENTITY_COLUMNS))
+    versao = append_listings(base, partes[1].drop_duplicates(IDENTITY_COLUMNS), 'v1')
+    cache.put('v1', versao)
+    cache.put(base.key, base)
+    for i, parte in enumerate(partes[2:]):
+        store.ingest(f'outro{i}', parte)
+
+    assert store.has(base.key) and store.has('v1') and not store.has('outro0')
+    assert len(versao.frame(['price'])) == store.rows('v1')
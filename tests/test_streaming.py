@@ -0,0 +1,65 @@
+# tests/test_streaming.py
+import io
+
+import numpy as np
+import pandas as pd
+
+from core.streaming import STREAM_COLUMNS, StreamingSummary, summarize_csv
+
+
+def _resumo_em_blocos(df, tamanho):
+    resumo = StreamingSummary()
+    colunas = [col for col in STREAM_COLUMNS if col in df.columns]
+    for inicio in range(0, len(df), tamanho):
+        resumo.update(df.iloc[inicio:inicio + tamanho][colunas])
+    return resumo
+
+
+def test_resumo_em_blocos_igual_ao_dataset_inteiro(anuncios):
+    resumo = _resumo_em_blocos(anuncios, 700)
+
+    assert resumo.rows == len(anuncios)
+    np.testing.assert_allclose(resumo.price_moments.mean[0], anuncios['price'].mean(), rtol=1e-12)
+
+    # Contagens e somas exatas
+    assert resumo.listings_by_neighborhood.astype(int).to_dict() == \
+        anuncios['neighborhood'].value_counts().to_dict()
+    esperado = anuncios.groupby(anuncios['bedrooms'].astype(int))['price'].mean()
+    np.testing.assert_allclose(resumo.mean_price_by('bedrooms', 1, 6).to_numpy(), esperado.to_numpy(), rtol=1e-12)
+
+    # Correlações (pares completos) iguais às do pandas
+    colunas = resumo.correlation.columns
+    esperada = anuncios[colunas].astype('float64').corr()
+    np.testing.assert_allclose(resumo.correlation_matrix().to_numpy(), esperada.to_numpy(), atol=1e-10)
+
+
+def test_summarize_csv_nao_depende_do_tamanho_do_bloco(anuncios):
+    csv = anuncios.to_csv(index=False)
+    resumos = [summarize_csv(io.StringIO(csv), chunksize=tamanho) for tamanho in (500, 5_000)]
+
+    assert resumos[0].rows == resumos[1].rows == len(anuncios)
+    pd.testing.assert_series_equal(resumos[0].mean_price_by('parkingSpaces', 0, 5),
+                                   resumos[1].mean_price_by('parkingSpaces', 0, 5))
+    # A mediana do esboço fica a menos do erro de rank da mediana exata
+    precos = anuncios['price'].to_numpy()
+    for resumo in resumos:
+        rank = (precos <= resumo.median('price')).mean()
+        assert abs(rank - 0.5) <= 2 * resumo.m2_sketch.epsilon
+
+
+def test_remove_igual_ao_resumo_sem_as_linhas(anuncios):
+    colunas = [col for col in STREAM_COLUMNS if col in anuncios.columns]
+    ids = np.arange(len(anuncios), dtype='uint64')
+    retirados = np.random.default_rng(6).random(len(anuncios)) < 0.2
+
+    resumo = StreamingSummary().update(anuncios[colunas], ids=ids)
+    resumo.remove(anuncios.loc[retirados, colunas], ids=ids[retirados])
+    refeito = StreamingSummary().update(anuncios.loc[~retirados, colunas], ids=ids[~retirados])
+
+    assert resumo.rows == refeito.rows
+    assert not resumo.sample['_id'].isin(ids[retirados]).any()
+    pd.testing.assert_series_equal(resumo.mean_price_by('bedrooms', 1, 6), refeito.mean_price_by('bedrooms', 1, 6),
+                                   rtol=1e-12)
+    assert resumo.listings_by_neighborhood.to_dict() == refeito.listings_by_neighborhood.to_dict()
+    np.testing.assert_allclose(resumo.correlation_matrix().to_numpy(), refeito.correlation_matrix().to_numpy(),
+                               atol=1e-9)